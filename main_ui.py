@@ -48,7 +48,10 @@ KNOWN LIMITS / ROUGH EDGES
 - Planner “exclude_keywords” are treated as soft phrase-level penalties only in the fallback scoring shim.
   If your `phase1_lib` scoring is present, ensure it mirrors this behavior (recall-first).
 - No query budget guard yet beyond the preview estimate; large grids × many keywords can be slow.
-- De-duplication is currently Places-ID based (Google often dedups for us), not name+distance clustering.
+- De-duplication is Places-ID based. A soft name+distance pass (same normalized name within
+  `soft_dedup_m` meters, e.g. 150, keeps the listing with most reviews) only runs when the project sets
+  `soft_dedup_m` (off by default); different names are only merged when `soft_dedup_fuzzy` (token-set
+  similarity cutoff, e.g. 90) is also set.
 - No per-industry special heuristics beyond the guardrailed defaults (by design); we rely on LLM+tokens.
 
 NEAR-TERM TODO (SMALL, TESTABLE STEPS)
@@ -7,6 +7,7 @@ from __future__ import annotations
 
 import os
 import json
+from functools import lru_cache
 from typing import Any, Dict, List
 
 from dotenv import load_dotenv
@@ -15,11 +16,11 @@ from supabase import create_client, Client
 try:
     # when imported as a package: import modules.Phase1_apply
     from .Phase1_rubric import build_taxonomy
-    from .Phase1_tiering import extract_evidence, choose_tier
+    from .Phase1_tiering import extract_evidence, choose_tier, compile_taxonomy
 except ImportError:
     # when run directly as a script: python modules/Phase1_apply.py ...
     from Phase1_rubric import build_taxonomy
-    from Phase1_tiering import extract_evidence, choose_tier
+    from Phase1_tiering import extract_evidence, choose_tier, compile_taxonomy
 
 
 # -----------------------
@@ -42,7 +43,9 @@ CANDIDATE_COLS = [
 ]
 
 
+@lru_cache(maxsize=1)
 def _get_client() -> Client:
+    # built once per process: .env parse + client setup are not repeated per apply
     load_dotenv()
     url = os.getenv("SUPABASE_URL")
     key = os.getenv("SUPABASE_SERVICE_ROLE_KEY") or os.getenv("SUPABASE_ANON_KEY")
@@ -115,6 +118,7 @@ def apply_phase1_to_project(
     taxonomy = build_taxonomy(industry, focus=None, provider=provider, model=model)
     # Tag for traceability
     taxonomy["_industry"] = industry
+    tax_matchers = compile_taxonomy(taxonomy, industry)
 
     # 3) Load candidates
     rows = _fetch_candidates(supabase, project_id, limit=limit)
@@ -124,7 +128,7 @@ def apply_phase1_to_project(
         rid = row.get("id")
         cand = _mk_candidate(row)
 
-        ev = extract_evidence(taxonomy, candidate=cand)
+        ev = extract_evidence(taxonomy, candidate=cand, matchers=tax_matchers)
         # Pass extra context so expanded primary combos can leverage the industry
         decision = choose_tier(industry, taxonomy, ev, provider=provider, model=model)
 
@@ -5,16 +5,36 @@
 
 from __future__ import annotations
 import os, time, requests
+import numpy as np
 from math import cos, radians
 from typing import Any, Dict, List, Optional, Tuple
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
+
+try:  # optional: faster parse of the Places JSON bodies
+    import orjson
+except Exception:
+    orjson = None
 
 GOOGLE_API_KEY = os.getenv("GOOGLE_PLACES_API_KEY")
 
+def _json(r: requests.Response) -> Dict[str, Any]:
+    # orjson parses the raw bytes directly (no str decode); same dicts/lists as r.json()
+    return orjson.loads(r.content) if orjson is not None else r.json()
+
+# One pooled session: TCP/TLS to maps.googleapis.com is set up once, not per call
+_SESSION = requests.Session()
+_SESSION.mount("https://", HTTPAdapter(
+    pool_connections=4, pool_maxsize=20,
+    max_retries=Retry(total=3, backoff_factor=0.3, status_forcelist=[500, 502, 503, 504],
+                      allowed_methods=frozenset(["GET"]), raise_on_status=False),
+))
+
 def geocode_location(location: str) -> Tuple[float, float]:
     url = "https://maps.googleapis.com/maps/api/geocode/json"
     params = {"address": location, "key": GOOGLE_API_KEY}
-    r = requests.get(url, params=params, timeout=20)
-    data = r.json()
+    r = _SESSION.get(url, params=params, timeout=20)
+    data = _json(r)
     results = data.get("results", [])
     if not results:
         raise ValueError(f"Unable to geocode: {data.get('status')}")
@@ -22,25 +42,21 @@ def geocode_location(location: str) -> Tuple[float, float]:
     return float(loc["lat"]), float(loc["lng"])
 
 def generate_grid(center_lat: float, center_lng: float, max_radius_km: float, step_km: float = 2.5) -> List[Tuple[float,float]]:
-    pts = [(center_lat, center_lng)]
+    # Square rings around the center in one array op: every (dx, dy) offset of the (2*steps+1)^2
+    # block, ordered ring by ring (center first), dx-major within a ring -- same order as the ring loop
     steps = int(max_radius_km / step_km)
     dlat = step_km / 110.574
     dlng = step_km / (111.320 * max(1e-9, cos(radians(center_lat))))
-    seen = {(center_lat, center_lng)}
-    for ring in range(1, steps + 1):
-        for dx in range(-ring, ring + 1):
-            for dy in range(-ring, ring + 1):
-                if abs(dx) != ring and abs(dy) != ring:
-                    continue
-                lat = center_lat + dy * dlat
-                lng = center_lng + dx * dlng
-                if (lat, lng) not in seen:
-                    pts.append((lat, lng)); seen.add((lat, lng))
-    return pts
+    idx = np.arange(-steps, steps + 1)
+    dx, dy = (a.ravel() for a in np.meshgrid(idx, idx, indexing="ij"))
+    order = np.argsort(np.maximum(np.abs(dx), np.abs(dy)), kind="stable")
+    lats = center_lat + dy[order] * dlat
+    lngs = center_lng + dx[order] * dlng
+    return list(dict.fromkeys(zip(lats.tolist(), lngs.tolist())))
 
 def _nearby_once(params: Dict[str, Any], timeout=30):
     url = "https://maps.googleapis.com/maps/api/place/nearbysearch/json"
-    return requests.get(url, params=params, timeout=timeout)
+    return _SESSION.get(url, params=params, timeout=timeout)
 
 def google_nearby_search(keyword: str, lat: float, lng: float, radius_km: float, type_hint: Optional[str]=None) -> List[Dict[str,Any]]:
     """Recall-first: keyword only. Robust retry/backoff on timeouts & OVER_QUERY_LIMIT."""
@@ -66,7 +82,7 @@ def google_nearby_search(keyword: str, lat: float, lng: float, radius_km: float,
             time.sleep(1.5 * attempts)
             continue
 
-        data = r.json()
+        data = _json(r)
         if data.get("status") == "OVER_QUERY_LIMIT":
             time.sleep(2.0)
             attempts += 1
@@ -98,7 +114,7 @@ def get_place_details(place_id: str) -> Dict[str, Any]:
         "fields": "address_components,types,formatted_phone_number,opening_hours,editorial_summary,website,rating,user_ratings_total",
     }
     try:
-        r = requests.get(url, params=params, timeout=30)
-        return r.json().get("result", {}) or {}
+        r = _SESSION.get(url, params=params, timeout=30)
+        return _json(r).get("result", {}) or {}
     except Exception:
         return {}
@@ -1,16 +1,62 @@
 # ================================
 # FILE: modules/Phase1_scoring.py
 # PURPOSE: Numeric score used for ranking *within* tiers
+# Plain Python, kept mypyc-clean so it can be compiled in place for large runs:
+#   mypyc --ignore-missing-imports modules/Phase1_scoring.py
+# The built .so sits next to this file and wins the import; delete it to go back.
 # ================================
 
 from __future__ import annotations
-from typing import Any, Dict, List, Set, Tuple
+from functools import lru_cache
+from typing import Any, Dict, FrozenSet, List, Tuple
 
-def _text_hits(text: str, tokens: Set[str]) -> int:
+try:  # optional: one linear pass over page text for all tokens
+    import ahocorasick  # type: ignore
+except Exception:
+    ahocorasick = None
+
+@lru_cache(maxsize=256)
+def _lowered(tokens: FrozenSet[str]) -> Tuple[str, ...]:
+    # Settings sets are frozen once per run; lowercase them once, not per candidate
+    return tuple(t.lower() for t in tokens if t)
+
+@lru_cache(maxsize=256)
+def _automaton(lowered: Tuple[str, ...]) -> Any:
+    if ahocorasick is None or not lowered:
+        return None
+    A = ahocorasick.Automaton()
+    for t in lowered:
+        A.add_word(t, t)
+    A.make_automaton()
+    return A
+
+# Google types -> one bit each, assigned on first sight; type sets become ints and overlap is one `&`
+_TYPE_BITS: Dict[str, int] = {}
+
+@lru_cache(maxsize=1024)
+def _type_mask(types: FrozenSet[str]) -> int:
+    m = 0
+    for t in types:
+        b = _TYPE_BITS.get(t)
+        if b is None:
+            b = _TYPE_BITS[t] = 1 << len(_TYPE_BITS)
+        m |= b
+    return m
+
+def _frozen(tokens: Any) -> FrozenSet[str]:
+    return tokens if isinstance(tokens, frozenset) else frozenset(tokens or ())
+
+def _text_hits(text: str, tokens: Any) -> int:
+    """Count tokens that occur (substring, case-insensitive) in text. `text` may be pre-lowered."""
     tx = (text or "").lower()
-    return sum(1 for t in tokens if t and t.lower() in tx)
+    lowered = _lowered(_frozen(tokens))
+    A = _automaton(lowered)
+    if A is None:
+        return sum(1 for t in lowered if t in tx)
+    seen = {t for _, t in A.iter(tx)}
+    return sum(1 for t in lowered if t in seen)
 
-def score_candidate(cand: Dict[str, Any], settings) -> Tuple[int, Any]:
+def score_candidate(cand: Dict[str, Any], settings: Any) -> Tuple[int, Dict[str, Any]]:
     """
     Simple, transparent scoring used for intra-tier ranking.
     Returns (score 0..100, reasons (dict or str))
@@ -18,24 +64,29 @@ def score_candidate(cand: Dict[str, Any], settings) -> Tuple[int, Any]:
     score = 0.0
     reasons: Dict[str, Any] = {}
 
-    # allow / deny by Google types (light)
-    types = set((cand.get("types") or []))
-    allow_hit = types & getattr(settings, "allow_types", set())
-    if allow_hit:
+    # allow / deny by Google types (light); frozen once per candidate for threshold re-scores
+    types = cand.get("_types_set")
+    if types is None:
+        types = cand["_types_set"] = frozenset(cand.get("types") or ())
+    tmask = cand.get("_types_mask")
+    if tmask is None:
+        tmask = cand["_types_mask"] = _type_mask(types)
+    allow = _frozen(getattr(settings, "allow_types", set()))
+    if tmask & _type_mask(allow):
         w = settings.weights.get("allow_types", 20.0); score += w
-        reasons[f"allow_types(+{int(w)})"] = sorted(allow_hit)
+        reasons[f"allow_types(+{int(w)})"] = sorted(types & allow)
 
-    deny_hit = types & getattr(settings, "soft_deny_types", set())
-    if deny_hit:
+    deny = _frozen(getattr(settings, "soft_deny_types", set()))
+    if tmask & _type_mask(deny):
         w = settings.weights.get("soft_deny_types", -15.0); score += w
-        reasons[f"soft_deny({int(w)})"] = sorted(deny_hit)
+        reasons[f"soft_deny({int(w)})"] = sorted(types & deny)
 
     blob = " ".join([
         str(cand.get("page_title","")),
         str(cand.get("headers","")),
         str(cand.get("text","")),
         str(cand.get("name","")),
-    ])
+    ]).lower()
     pos_hits = _text_hits(blob, getattr(settings, "name_positive", set()))
     neg_hits = _text_hits(blob, getattr(settings, "name_negative", set()))
     if pos_hits:
@@ -9,6 +9,9 @@
 #   choose_tier(industry: str, taxonomy: dict, evidence: dict,
 #               provider: str = 'ollama', model: str | None = None,
 #               bias: str | None = None, **kwargs) -> dict
+#   choose_tiers_batch(industry: str, taxonomy: dict, evidences: list[dict],
+#                      snippets_list: list[dict] | None = None, ...,
+#                      batch_size: int = 20) -> list[dict]
 #
 # Notes
 # - Still industry‑agnostic. We bias behavior by rules & rubric structure, not hardcoded domains.
@@ -29,6 +32,11 @@ import unicodedata
 from urllib.parse import urlparse
 from typing import Any, Dict, List, Tuple
 
+try:  # optional: pyahocorasick gives a single-pass literal prefilter over the evidence blob
+    import ahocorasick  # type: ignore
+except Exception:
+    ahocorasick = None
+
 # ---- Env defaults ----
 OLLAMA_BIN   = os.getenv("OLLAMA_BIN", "ollama")
 LLM_MODEL    = os.getenv("LLM_MODEL", "llama3")
@@ -115,6 +123,112 @@ def _find_hits_relaxed(terms: List[str], text: str) -> List[str]:
             hits.append(t)
     return hits
 
+# -------------------------------------------------
+# Precompiled taxonomy matchers
+# -------------------------------------------------
+
+class _TermMatcher:
+    """Strict/relaxed matching for one term list, compiled once per taxonomy.
+
+    Same results as _find_hits_strict/_find_hits_relaxed. When pyahocorasick is
+    installed, one automaton walk over the text picks the candidate terms, and only
+    those are verified with their (precompiled) word-boundary regex.
+    """
+
+    def __init__(self, terms: List[str]):
+        self.terms = [t for t in terms if t]
+        self._rx = [re.compile(rf"(?i)(?:\b|_){re.escape(t)}(?:\b|_)") for t in self.terms]
+        self._canon = [_canon(t) for t in self.terms]
+        self._ac_raw = self._ac_canon = None
+        if ahocorasick is not None and self.terms:
+            self._ac_raw = self._automaton(self.terms)
+            self._ac_canon = self._automaton([ct if len(ct) >= 4 else "" for ct in self._canon])
+
+    @staticmethod
+    def _automaton(words: List[str]):
+        A = ahocorasick.Automaton()
+        for i, w in enumerate(words):
+            if not w:
+                continue
+            if w in A:
+                A.get(w).append(i)
+            else:
+                A.add_word(w, [i])
+        if not len(A):
+            return None
+        A.make_automaton()
+        return A
+
+    @staticmethod
+    def _scan(A, text: str) -> List[int]:
+        idx = set()
+        for _, ids in A.iter(text):
+            idx.update(ids)
+        return sorted(idx)
+
+    def strict(self, text: str) -> List[str]:
+        if not self.terms or not text:
+            return []
+        if self._ac_raw is not None:
+            return [self.terms[i] for i in self._scan(self._ac_raw, text) if self._rx[i].search(text)]
+        return [t for t, rx in zip(self.terms, self._rx) if rx.search(text)]
+
+    def relaxed(self, text: str, canon_text: str | None = None) -> List[str]:
+        if not self.terms or not text:
+            return []
+        canon_text = _canon(text) if canon_text is None else canon_text
+        if self._ac_raw is not None:
+            if self._ac_canon is None:
+                return []
+            return [self.terms[i] for i in self._scan(self._ac_canon, canon_text)]
+        return [t for t, ct in zip(self.terms, self._canon) if len(ct) >= 4 and ct in canon_text]
+
+
+def compile_taxonomy(taxonomy: Dict[str, Any], industry: str = "") -> Dict[str, _TermMatcher]:
+    """Normalize + compile all taxonomy term lists once. Pass the result to
+    extract_evidence(..., matchers=...) when scoring many candidates with one taxonomy."""
+    prim_terms  = _norm_list(taxonomy.get("primary_terms") or taxonomy.get("primary_evidence"))
+    adj_terms   = _norm_list(taxonomy.get("adjacent_terms") or taxonomy.get("near_archetypes"))
+    disq_terms  = _norm_list(taxonomy.get("disqualifiers") or taxonomy.get("off_target"))
+    tax_venue   = set(_norm_list(taxonomy.get("venue_terms")))
+    fb_venue    = FALLBACK_VENUE_TERMS | CONTEXT_MODIFIERS
+    brand_terms = _norm_list(taxonomy.get("exemplar_brands"))
+    syn_terms   = _norm_list(taxonomy.get("industry_synonyms"))
+
+    # Expand primary with industry synonyms + modifier-based combos from the declared industry
+    expanded_primary = set(prim_terms) | set(syn_terms)
+    for s in _stems_from_phrase(taxonomy.get("_industry", "") or industry):
+        for m in CONTEXT_MODIFIERS:
+            expanded_primary.add(f"{m} {s}")
+            expanded_primary.add(f"{s} {m}")
+
+    return {
+        "primary": _TermMatcher(list(expanded_primary)),
+        "adjacent": _TermMatcher(adj_terms),
+        "disqualifier": _TermMatcher(disq_terms),
+        "venue_taxonomy": _TermMatcher(list(tax_venue)),
+        "venue_fallback": _TermMatcher(list(fb_venue)),
+        "brand": _TermMatcher(brand_terms),
+    }
+
+# Callers that don't pass matchers= (one-off extract_evidence calls) reuse the last few compiled
+# taxonomies by content instead of rebuilding every regex/automaton per candidate
+_COMPILED_CACHE: Dict[Tuple[str, str], Dict[str, _TermMatcher]] = {}
+_COMPILED_CACHE_MAX = 8
+
+
+def _compiled_for(taxonomy: Dict[str, Any], industry: str = "") -> Dict[str, _TermMatcher]:
+    try:
+        key = (json.dumps(taxonomy, sort_keys=True, default=str), industry or "")
+    except (TypeError, ValueError):
+        return compile_taxonomy(taxonomy, industry)
+    m = _COMPILED_CACHE.get(key)
+    if m is None:
+        if len(_COMPILED_CACHE) >= _COMPILED_CACHE_MAX:
+            _COMPILED_CACHE.pop(next(iter(_COMPILED_CACHE)), None)
+        m = _COMPILED_CACHE[key] = compile_taxonomy(taxonomy, industry)
+    return m
+
 # -------------------------------------------------
 # Evidence extraction
 # -------------------------------------------------
@@ -155,35 +269,23 @@ def extract_evidence(taxonomy: Dict[str, Any], candidate: Dict[str, Any] | None
     ]
     text_blob = (" \n ".join(p for p in blob_parts if p)).lower()
 
-    # Taxonomy terms
-    prim_terms  = _norm_list(taxonomy.get("primary_terms") or taxonomy.get("primary_evidence"))
-    adj_terms   = _norm_list(taxonomy.get("adjacent_terms") or taxonomy.get("near_archetypes"))
-    disq_terms  = _norm_list(taxonomy.get("disqualifiers") or taxonomy.get("off_target"))
-    tax_venue   = set(_norm_list(taxonomy.get("venue_terms")))
-    fb_venue    = FALLBACK_VENUE_TERMS | CONTEXT_MODIFIERS
-    brand_terms = _norm_list(taxonomy.get("exemplar_brands"))
-    syn_terms   = _norm_list(taxonomy.get("industry_synonyms"))  # NEW
+    # Taxonomy terms (compiled once per taxonomy when the caller passes matchers=)
+    matchers = kwargs.get("matchers") or _compiled_for(taxonomy, kwargs.get("industry", ""))
+    canon_blob = _canon(text_blob)
 
-    # Expand primary with industry synonyms
-    expanded_primary = set(prim_terms) | set(syn_terms)
-
-    # Also include modifier-based combos from the declared industry if present
-    stems = _stems_from_phrase(taxonomy.get("_industry", "") or kwargs.get("industry", ""))
-    for s in stems:
-        for m in CONTEXT_MODIFIERS:
-            expanded_primary.add(f"{m} {s}")
-            expanded_primary.add(f"{s} {m}")
-    expanded_primary = list(expanded_primary)
+    def _both(kind: str) -> List[str]:
+        mt = matchers[kind]
+        return list({*mt.strict(text_blob), *mt.relaxed(text_blob, canon_blob)})
 
     # Strict + relaxed for primary/venue/brand
-    primary_hits = list({* _find_hits_strict(expanded_primary, text_blob), * _find_hits_relaxed(expanded_primary, text_blob)})
-    venue_hits_tax = list({* _find_hits_strict(list(tax_venue), text_blob), * _find_hits_relaxed(list(tax_venue), text_blob)})
-    venue_hits_fb  = list({* _find_hits_strict(list(fb_venue),  text_blob), * _find_hits_relaxed(list(fb_venue),  text_blob)})
-    brand_hits   = list({* _find_hits_strict(brand_terms, text_blob), * _find_hits_relaxed(brand_terms, text_blob)})
+    primary_hits = _both("primary")
+    venue_hits_tax = _both("venue_taxonomy")
+    venue_hits_fb  = _both("venue_fallback")
+    brand_hits   = _both("brand")
 
     # Keep disqualifiers/adjacent strict
-    adjacent_hits = _find_hits_strict(adj_terms, text_blob)
-    disqualifier_hits = _find_hits_strict(disq_terms, text_blob)
+    adjacent_hits = matchers["adjacent"].strict(text_blob)
+    disqualifier_hits = matchers["disqualifier"].strict(text_blob)
 
     return {
         "primary_hits": primary_hits,
@@ -229,11 +331,25 @@ def _ollama_json(prompt: str, model: str | None = None, timeout_s: int = 60) ->
         return {}
 
 
+_OPENAI_SESSION = None
+
+
+def _openai_session():
+    """Keep-alive session for the per-candidate chat calls (one TLS handshake, not one per row)."""
+    global _OPENAI_SESSION
+    if _OPENAI_SESSION is None:
+        import requests
+        from requests.adapters import HTTPAdapter
+        s = requests.Session()
+        s.mount("https://", HTTPAdapter(pool_connections=2, pool_maxsize=20))
+        _OPENAI_SESSION = s
+    return _OPENAI_SESSION
+
+
 def _openai_json(prompt: str, model: str = "gpt-4o-mini", timeout_s: int = 60) -> Dict[str, Any]:
     if not OPENAI_API_KEY:
         return {}
     try:
-        import requests
         body = {
             "model": model,
             "messages": [
@@ -243,7 +359,34 @@ def _openai_json(prompt: str, model: str = "gpt-4o-mini", timeout_s: int = 60) -
             "temperature": 0.2,
         }
         headers = {"Authorization": f"Bearer {OPENAI_API_KEY}", "Content-Type": "application/json"}
-        r = requests.post("https://api.openai.com/v1/chat/completions", json=body, headers=headers, timeout=timeout_s)
+        r = _openai_session().post("https://api.openai.com/v1/chat/completions", json=body, headers=headers, timeout=timeout_s)
+        data = r.json()
+        content = data.get("choices", [{}])[0].get("message", {}).get("content", "")
+        if not content:
+            return {}
+        try:
+            return json.loads(_strip_json_block(content))
+        except Exception:
+            return {}
+    except Exception:
+        return {}
+
+def _openai_json_messages(system: str, user: str, model: str = "gpt-4o-mini", timeout_s: int = 120) -> Dict[str, Any]:
+    """Chat completion with JSON mode; used by the batched tier path (one taxonomy per request)."""
+    if not OPENAI_API_KEY:
+        return {}
+    try:
+        body = {
+            "model": model,
+            "messages": [
+                {"role": "system", "content": system},
+                {"role": "user", "content": user},
+            ],
+            "response_format": {"type": "json_object"},
+            "temperature": 0.2,
+        }
+        headers = {"Authorization": f"Bearer {OPENAI_API_KEY}", "Content-Type": "application/json"}
+        r = _openai_session().post("https://api.openai.com/v1/chat/completions", json=body, headers=headers, timeout=timeout_s)
         data = r.json()
         content = data.get("choices", [{}])[0].get("message", {}).get("content", "")
         if not content:
@@ -259,12 +402,12 @@ def _openai_json(prompt: str, model: str = "gpt-4o-mini", timeout_s: int = 60) -
 # Signals & flags
 # -------------------------------------------------
 
-def _industry_flags(industry: str, evidence: Dict[str, Any]) -> Dict[str, bool]:
+def _industry_flags(industry: str, evidence: Dict[str, Any], stems: List[str] | None = None) -> Dict[str, bool]:
     blob = evidence.get("text_blob", "")
     name = (evidence.get("_source_fields", {}) or {}).get("name", "")
     website = (evidence.get("_source_fields", {}) or {}).get("website", "")
 
-    stems = _stems_from_phrase(industry)
+    stems = _stems_from_phrase(industry) if stems is None else stems
     canon_blob = _canon(blob)
     canon_name = _canon(name)
     domain = urlparse(website).netloc.split(":")[0].lower() if website else ""
@@ -285,7 +428,7 @@ def _industry_flags(industry: str, evidence: Dict[str, Any]) -> Dict[str, bool]:
 # Core rule engines (balanced vs high‑recall)
 # -------------------------------------------------
 
-def _rules_balanced(industry: str, taxonomy: Dict[str, Any], ev: Dict[str, Any]) -> Tuple[int, str, float]:
+def _rules_balanced(industry: str, taxonomy: Dict[str, Any], ev: Dict[str, Any], flags: Dict[str, bool] | None = None) -> Tuple[int, str, float]:
     prim = len(ev.get("primary_hits", []))
     adj  = len(ev.get("adjacent_hits", []))
     disq = len(ev.get("disqualifier_hits", []))
@@ -293,7 +436,7 @@ def _rules_balanced(industry: str, taxonomy: Dict[str, Any], ev: Dict[str, Any])
     ven_fb  = len(ev.get("venue_hits_fallback", []))
     brand = len(ev.get("brand_hits", []))
 
-    flags = _industry_flags(industry, ev)
+    flags = flags or _industry_flags(industry, ev)
 
     # Strict disqualifier handling
     if disq > 0 and prim == 0:
@@ -318,7 +461,7 @@ def _rules_balanced(industry: str, taxonomy: Dict[str, Any], ev: Dict[str, Any])
     return 3, "No convincing evidence for core venue.", 0.4
 
 
-def _rules_high_recall(industry: str, taxonomy: Dict[str, Any], ev: Dict[str, Any]) -> Tuple[int, str, float]:
+def _rules_high_recall(industry: str, taxonomy: Dict[str, Any], ev: Dict[str, Any], flags: Dict[str, bool] | None = None) -> Tuple[int, str, float]:
     # Mirrors v8 overboost behavior
     prim = len(ev.get("primary_hits", []))
     adj  = len(ev.get("adjacent_hits", []))
@@ -326,7 +469,7 @@ def _rules_high_recall(industry: str, taxonomy: Dict[str, Any], ev: Dict[str, An
     ven = len(ev.get("venue_hits_taxonomy", [])) + len(ev.get("venue_hits_fallback", []))
     brand = len(ev.get("brand_hits", []))
 
-    flags = _industry_flags(industry, ev)
+    flags = flags or _industry_flags(industry, ev)
 
     if disq > 0 and prim == 0:
         return 3, "Disqualifier terms present without primary evidence.", 0.35
@@ -378,7 +521,11 @@ def _llm_decide(industry: str, taxonomy: Dict[str, Any], evidence: Dict[str, Any
         js = _openai_json(prompt, model=model or "gpt-4o-mini")
     else:
         js = {}
+    return _coerce_llm_decision(js)
+
 
+def _coerce_llm_decision(js: Any) -> Dict[str, Any]:
+    """Validate a raw LLM {tier, reason, confidence} object; {} when unusable."""
     if not isinstance(js, dict):
         return {}
     tier = js.get("tier")
@@ -395,6 +542,65 @@ def _llm_decide(industry: str, taxonomy: Dict[str, Any], evidence: Dict[str, Any
     return {"tier": tier, "reason": reason, "confidence": conf}
 
 
+def _llm_decide_batch(industry: str, taxonomy: Dict[str, Any], evidences: List[Dict[str, Any]], provider: str, model: str | None) -> Dict[int, Dict[str, Any]]:
+    """One LLM call for many candidates. Returns {idx: decision}; missing/invalid idx are omitted."""
+    system = (
+        "You classify businesses into one of 3 tiers using the given taxonomy and per-candidate evidence.\n"
+        "Return STRICT JSON only: {\"decisions\": [{\"idx\": int, \"tier\": 1|2|3, \"reason\": short, \"confidence\": 0..1}]}\n"
+        "Return exactly one decision per input idx.\n\n"
+        f"Industry: {industry}\n\n"
+        f"Taxonomy primary_terms: {taxonomy.get('primary_terms')}\n"
+        f"adjacent_terms: {taxonomy.get('adjacent_terms')}\n"
+        f"disqualifiers: {taxonomy.get('disqualifiers')}\n"
+        f"venue_terms: {taxonomy.get('venue_terms')}\n"
+        f"exemplar_brands: {taxonomy.get('exemplar_brands')}\n"
+    )
+    items = []
+    for idx, ev in enumerate(evidences):
+        items.append({
+            "idx": idx,
+            "name": (ev.get("_source_fields", {}) or {}).get("name", ""),
+            "evidence": {
+                "text": ev.get("text_blob", "")[:1500],
+                "primary_hits": ev.get("primary_hits"),
+                "adjacent_hits": ev.get("adjacent_hits"),
+                "disqualifier_hits": ev.get("disqualifier_hits"),
+                "venue_hits_taxonomy": ev.get("venue_hits_taxonomy"),
+                "venue_hits_fallback": ev.get("venue_hits_fallback"),
+                "brand_hits": ev.get("brand_hits"),
+            },
+        })
+    user = json.dumps(items, ensure_ascii=False)
+
+    if provider == "ollama":
+        js = _ollama_json(system + "\nCandidates:\n" + user, model=model or LLM_MODEL, timeout_s=180)
+    elif provider == "openai":
+        js = _openai_json_messages(system, user, model=model or "gpt-4o-mini")
+    else:
+        js = {}
+
+    rows = js.get("decisions") if isinstance(js, dict) else None
+    out: Dict[int, Dict[str, Any]] = {}
+    for d in rows or []:
+        if not isinstance(d, dict):
+            continue
+        try:
+            idx = int(d.get("idx"))
+        except Exception:
+            continue
+        dec = _coerce_llm_decision(d)
+        if dec and 0 <= idx < len(evidences):
+            out[idx] = dec
+    return out
+
+
+# Venue-modifier tokens for the name/title disqualifier override, compiled once into one
+# alternation (one scan per string instead of a substring test per token)
+_MOD_TOKENS = ("simulator", "simulation", "virtual", "screen", "indoor", "lounge", "studio", "bay", "clinic", "cafe")
+_MOD_RE = re.compile("|".join(re.escape(m) for m in _MOD_TOKENS))
+_NON_ALNUM_RE = re.compile(r"[^a-z0-9]+")
+
+
 def _apply_guardrails(industry: str, taxonomy: Dict[str, Any], decision: Dict[str, Any], ev: Dict[str, Any], bias: str) -> Dict[str, Any]:
     """
     Post-process an LLM decision (or synthesize one) using rubric-driven constraints.
@@ -436,13 +642,8 @@ def _apply_guardrails(industry: str, taxonomy: Dict[str, Any], decision: Dict[st
     name = ((ev.get("_source_fields", {}) or {}).get("name") or "").lower()
     title = ((ev.get("_source_fields", {}) or {}).get("title") or "").lower()
 
-    # Same modifier set we use elsewhere (inline to keep it simple)
-    _MOD_TOKENS = {"simulator", "simulation", "virtual", "screen", "indoor", "lounge", "studio", "bay", "clinic",
-                   "cafe"}
-
     def _has_mod(s: str) -> bool:
-        cs = re.sub(r"[^a-z0-9]+", "", s)
-        return any(m in cs for m in _MOD_TOKENS)
+        return _MOD_RE.search(_NON_ALNUM_RE.sub("", s)) is not None
 
     # Check if any disqualifier phrase appears literally in the NAME
     disq_phrases = ev.get("disqualifier_hits", [])
@@ -499,6 +700,51 @@ def _apply_guardrails(industry: str, taxonomy: Dict[str, Any], decision: Dict[st
 # Public entrypoint
 # -------------------------------------------------
 
+def _resolve_bias(bias: str | None) -> str:
+    bias = (bias or PHASE1_BIAS).strip().lower()
+    return bias if bias in ("balanced", "high-recall") else "high-recall"
+
+
+def _augment_evidence(ev: Dict[str, Any], **kw) -> Dict[str, Any]:
+    """Augment evidence text with any extras (snippets, titles, etc.)."""
+    text_blob = ev.get("text_blob", "")
+    def _cat(val):
+        nonlocal text_blob
+        if not val: return
+        if isinstance(val, (list, tuple)):
+            text_blob += " \n " + " ".join(str(x) for x in val)
+        else:
+            text_blob += " \n " + str(val)
+    for key in ["snippets", "text_snippets", "titles", "page_titles", "schema_types", "google_types", "categories"]:
+        _cat(kw.get(key))
+    for key in ["snippet", "text_snippet", "title", "page_title", "website", "name"]:
+        _cat(kw.get(key))
+    ev["text_blob"] = (text_blob or "").lower()
+    return ev
+
+
+def _rules_decision(industry: str, taxonomy: Dict[str, Any], ev: Dict[str, Any], bias: str, flags: Dict[str, bool] | None = None) -> Dict[str, Any]:
+    if bias == "balanced":
+        t, r, c = _rules_balanced(industry, taxonomy, ev, flags)
+    else:
+        t, r, c = _rules_high_recall(industry, taxonomy, ev, flags)
+    return {"tier": t, "reason": r, "confidence": c}
+
+
+def _finalize_decision(industry: str, ev: Dict[str, Any], adjusted: Dict[str, Any], bias: str, flags: Dict[str, bool] | None = None) -> Dict[str, Any]:
+    adjusted["hits"] = {
+        "primary": ev.get("primary_hits", []),
+        "adjacent": ev.get("adjacent_hits", []),
+        "disqualifier": ev.get("disqualifier_hits", []),
+        "venue_taxonomy": ev.get("venue_hits_taxonomy", []),
+        "venue_fallback": ev.get("venue_hits_fallback", []),
+        "brand": ev.get("brand_hits", []),
+    }
+    adjusted["flags"] = flags if flags is not None else _industry_flags(industry, ev)
+    adjusted["_bias"] = bias
+    return adjusted
+
+
 def choose_tier(
     industry: str,
     taxonomy: Dict[str, Any],
@@ -513,55 +759,77 @@ def choose_tier(
     bias: 'balanced' | 'high-recall' | None  (None → env PHASE1_BIAS, default 'high-recall')
     """
     provider = (provider or "ollama").lower()
-    bias = (bias or PHASE1_BIAS).strip().lower()
-    if bias not in ("balanced", "high-recall"):
-        bias = "high-recall"
-
-    # Augment evidence text with any extras (snippets, titles, etc.)
-    def _augment_evidence(ev: Dict[str, Any], **kw) -> Dict[str, Any]:
-        text_blob = ev.get("text_blob", "")
-        def _cat(val):
-            nonlocal text_blob
-            if not val: return
-            if isinstance(val, (list, tuple)):
-                text_blob += " \n " + " ".join(str(x) for x in val)
-            else:
-                text_blob += " \n " + str(val)
-        for key in ["snippets", "text_snippets", "titles", "page_titles", "schema_types", "google_types", "categories"]:
-            _cat(kw.get(key))
-        for key in ["snippet", "text_snippet", "title", "page_title", "website", "name"]:
-            _cat(kw.get(key))
-        ev["text_blob"] = (text_blob or "").lower()
-        return ev
+    bias = _resolve_bias(bias)
 
     ev = _augment_evidence(dict(evidence or {}), **kwargs)
 
-    # Ensure hits exist even if caller passed raw text only
-    if "venue_hits_taxonomy" not in ev or "venue_hits_fallback" not in ev:
-        # Recompute from scratch using extract_evidence against the same blob is overkill here; instead
-        # call the strict/relaxed matchers again using the fields embedded in `ev.text_blob`.
-        # To avoid duplication, we rely on the original extraction path for first calls.
-        pass
-
     # Decide via rules or LLM+guardrails
     if provider in ("ollama", "openai"):
         decision = _llm_decide(industry, taxonomy, ev, provider, model)
         adjusted = _apply_guardrails(industry, taxonomy, decision, ev, bias)
     else:
-        if bias == "balanced":
-            t, r, c = _rules_balanced(industry, taxonomy, ev)
-        else:
-            t, r, c = _rules_high_recall(industry, taxonomy, ev)
-        adjusted = {"tier": t, "reason": r, "confidence": c}
+        adjusted = _rules_decision(industry, taxonomy, ev, bias)
 
-    adjusted["hits"] = {
-        "primary": ev.get("primary_hits", []),
-        "adjacent": ev.get("adjacent_hits", []),
-        "disqualifier": ev.get("disqualifier_hits", []),
-        "venue_taxonomy": ev.get("venue_hits_taxonomy", []),
-        "venue_fallback": ev.get("venue_hits_fallback", []),
-        "brand": ev.get("brand_hits", []),
-    }
-    adjusted["flags"] = _industry_flags(industry, ev)
-    adjusted["_bias"] = bias
-    return adjusted
+    return _finalize_decision(industry, ev, adjusted, bias)
+
+
+def choose_tiers_batch(
+    industry: str,
+    taxonomy: Dict[str, Any],
+    evidences: List[Dict[str, Any]],
+    snippets_list: List[Dict[str, Any]] | None = None,
+    provider: str = "openai",
+    model: str | None = None,
+    bias: str | None = None,
+    batch_size: int = 20,
+) -> List[Dict[str, Any]]:
+    """Batched variant of choose_tier: one LLM request per `batch_size` candidates.
+
+    The taxonomy is sent once per batch instead of once per row. Output order matches
+    `evidences`; rows the LLM skipped fall back to the rules engine via guardrails.
+    snippets_list[i] is passed to the evidence augmenter like choose_tier(**kwargs).
+    """
+    provider = (provider or "ollama").lower()
+    bias = _resolve_bias(bias)
+    snippets_list = snippets_list or [{} for _ in evidences]
+
+    if provider not in ("ollama", "openai"):
+        return choose_tiers_fast(industry, taxonomy, evidences, snippets_list, bias=bias)
+
+    evs = [_augment_evidence(dict(ev or {}), **(kw or {})) for ev, kw in zip(evidences, snippets_list)]
+
+    out: List[Dict[str, Any]] = []
+    step = max(1, int(batch_size))
+    for start in range(0, len(evs), step):
+        chunk = evs[start:start + step]
+        decisions = _llm_decide_batch(industry, taxonomy, chunk, provider, model)
+        for idx, ev in enumerate(chunk):
+            adjusted = _apply_guardrails(industry, taxonomy, decisions.get(idx, {}), ev, bias)
+            out.append(_finalize_decision(industry, ev, adjusted, bias))
+    return out
+
+
+def choose_tiers_fast(
+    industry: str,
+    taxonomy: Dict[str, Any],
+    evidences: List[Dict[str, Any]],
+    snippets_list: List[Dict[str, Any]] | None = None,
+    bias: str | None = None,
+) -> List[Dict[str, Any]]:
+    """Rules-only (provider='none') tiering for a whole candidate list in one call.
+
+    Same decisions as choose_tier(provider='none'), but industry stems are derived once
+    and each row's industry flags are computed once and shared by the rule engine and
+    the output (choose_tier computes them twice per row).
+    """
+    bias = _resolve_bias(bias)
+    snippets_list = snippets_list or [{} for _ in evidences]
+    stems = _stems_from_phrase(industry)
+
+    out: List[Dict[str, Any]] = []
+    for ev, kw in zip(evidences, snippets_list):
+        ev = _augment_evidence(dict(ev or {}), **(kw or {}))
+        flags = _industry_flags(industry, ev, stems)
+        adjusted = _rules_decision(industry, taxonomy, ev, bias, flags)
+        out.append(_finalize_decision(industry, ev, adjusted, bias, flags))
+    return out
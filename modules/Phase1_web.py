@@ -4,10 +4,25 @@
 # ================================
 
 from __future__ import annotations
-import re, json, requests
+import os, re, json, requests
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
 from bs4 import BeautifulSoup
 from typing import Dict, Any, List
 
+# ---- Shared keep-alive session for site fetches (one TCP/TLS setup per host, not per call) ----
+def _web_session() -> requests.Session:
+    s = requests.Session()
+    adapter = HTTPAdapter(pool_connections=64, pool_maxsize=64,
+                          max_retries=Retry(total=1, backoff_factor=0.2, raise_on_status=False))
+    s.mount("https://", adapter)
+    s.mount("http://", adapter)
+    s.headers.update({"User-Agent": "Mozilla/5.0", "Accept-Encoding": "gzip, deflate"})
+    return s
+
+_WEB_SESSION = _web_session()
+SCRAPE_MAX_BYTES = int(os.getenv("SCRAPE_MAX_BYTES", str(512 * 1024)))  # same knob as google_search
+
 def _extract_schema_types_ldjson(soup: BeautifulSoup) -> List[str]:
     types: List[str] = []
     for tag in soup.find_all("script", attrs={"type": re.compile(r"application/ld\+json", re.I)}):
@@ -31,13 +46,26 @@ def _extract_schema_types_ldjson(soup: BeautifulSoup) -> List[str]:
             norm.append(tnorm); seen.add(tnorm)
     return norm[:12]
 
+def _fetch_html(url: str, max_bytes: int = SCRAPE_MAX_BYTES):
+    """Stream at most max_bytes of an HTML page; None for non-HTML (checked before any body read)."""
+    with _WEB_SESSION.get(url, timeout=8, stream=True) as r:
+        ctype = (r.headers.get("Content-Type") or "").lower()
+        if "text/html" not in ctype:
+            return None
+        buf = bytearray()
+        for chunk in r.iter_content(16384):
+            buf.extend(chunk)
+            if len(buf) >= max_bytes:
+                break
+        # Decode once, on the truncated buffer; without a declared charset let bs4 sniff the bytes
+        return bytes(buf[:max_bytes]).decode(r.encoding, errors="replace") if r.encoding else bytes(buf[:max_bytes])
+
 def scrape_site(url: str) -> Dict[str, Any]:
     if not url: return {}
     try:
-        r = requests.get(url, headers={"User-Agent":"Mozilla/5.0"}, timeout=8)
-        ctype = (r.headers.get("Content-Type") or "").lower()
-        if "text/html" not in ctype: return {}
-        soup = BeautifulSoup(r.text, "html.parser")
+        html = _fetch_html(url)
+        if html is None: return {}
+        soup = BeautifulSoup(html, "html.parser")
         page_title = soup.title.string if soup.title else ""
         meta_desc = (soup.find("meta", attrs={"name":"description"}) or {}).get("content","") or ""
         headers_text = " ".join(h.get_text(strip=True) for h in soup.find_all(re.compile("h[1-3]")))[:2000]
@@ -52,3 +80,4 @@ def scrape_site(url: str) -> Dict[str, Any]:
         }
     except Exception:
         return {}
+
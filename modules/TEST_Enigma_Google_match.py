@@ -131,6 +131,7 @@ Notable changes
 
 import argparse
 import csv
+import operator
 import os
 import re
 import sys
@@ -139,6 +140,7 @@ import unicodedata
 from dataclasses import dataclass
 from typing import Dict, Any, Optional, List, Tuple
 from difflib import SequenceMatcher
+from functools import lru_cache
 from collections import Counter
 
 from dotenv import load_dotenv
@@ -151,6 +153,9 @@ from postgrest.exceptions import APIError
 PUNCT_RE = re.compile(r"[^\w\s]")
 MULTISPACE_RE = re.compile(r"\s+")
 STATE_ZIP_TAIL_RE = re.compile(r"\b[A-Z]{2}\s+\d{5}(?:-\d{4})?$", re.I)
+UNIT_HASH_RE = re.compile(r"#\s*(\d+)", re.I)
+UNIT_WORD_RE = re.compile(r"\b(ste\.?|suite|unit|apt|no\.?|number)\b", re.I)
+UNIT_NUM_RE = re.compile(r"\bsuite\s*(\d+)", re.I)
 
 
 def _strip_diacritics(s: str) -> str:
@@ -158,6 +163,8 @@ def _strip_diacritics(s: str) -> str:
     return "".join(ch for ch in nfkd if not unicodedata.combining(ch))
 
 
+# Cities, states and repeated addresses recur across rows (match + CSV columns): normalize each once
+@lru_cache(maxsize=8192)
 def normalize_text(s: Optional[str]) -> str:
     if not s:
         return ""
@@ -172,12 +179,13 @@ def normalize_unit_synonyms(s: Optional[str]) -> str:
     if not s:
         return ""
     # Convert common unit markers to a canonical 'suite <num>'
-    s = re.sub(r"#\s*(\d+)", r"suite \1", s, flags=re.I)
-    s = re.sub(r"\b(ste\.?|suite|unit|apt|no\.?|number)\b", "suite", s, flags=re.I)
-    s = re.sub(r"\bsuite\s*(\d+)", r"suite \1", s, flags=re.I)
+    s = UNIT_HASH_RE.sub(r"suite \1", s)
+    s = UNIT_WORD_RE.sub("suite", s)
+    s = UNIT_NUM_RE.sub(r"suite \1", s)
     return s
 
 
+@lru_cache(maxsize=8192)
 def normalize_street_only(s: Optional[str]) -> str:
     return normalize_text(normalize_unit_synonyms(s))
 
@@ -248,6 +256,7 @@ class MatchRow:
 # Supabase client
 # ----------------------------
 
+@lru_cache(maxsize=1)
 def get_supabase() -> Client:
     load_dotenv()
     url = os.getenv("SUPABASE_URL")
@@ -446,7 +455,8 @@ def print_row(mr: MatchRow, *, verbose: bool) -> bool:
 
 
 def write_csv(rows: List[MatchRow], path: str) -> None:
-    fieldnames = [
+    # Straight MatchRow attributes, in column order; the four *_norm columns are derived at write time
+    attr_fields = [
         "enigma_summary_id",
         "project_id",
         "search_result_id",
@@ -472,48 +482,27 @@ def write_csv(rows: List[MatchRow], path: str) -> None:
         "enigma_annual_revenue",
         "enigma_yoy_growth",
         "enigma_ticket_size",
+    ]
+    fieldnames = attr_fields + [
         "g_address_full_norm",
         "enigma_matched_full_address_norm",
         "g_street_norm",
         "enigma_street_norm",
     ]
-    with open(path, "w", newline="") as f:
-        w = csv.DictWriter(f, fieldnames=fieldnames)
-        w.writeheader()
-        for mr in rows:
-            w.writerow(
-                {
-                    "enigma_summary_id": mr.enigma_summary_id,
-                    "project_id": mr.project_id,
-                    "search_result_id": mr.search_result_id,
-                    "place_id": mr.place_id,
-                    "enigma_id": mr.enigma_id,
-                    "g_address_full": mr.g_address_full,
-                    "enigma_matched_full_address": mr.enigma_matched_full_address,
-                    "g_street": mr.g_street,
-                    "enigma_street": mr.enigma_street,
-                    "g_city": mr.g_city,
-                    "g_state": mr.g_state,
-                    "g_zip": mr.g_zip,
-                    "e_city": mr.e_city,
-                    "e_state": mr.e_state,
-                    "e_zip": mr.e_zip,
-                    "city_equal": mr.city_equal,
-                    "state_equal": mr.state_equal,
-                    "zip_equal": mr.zip_equal,
-                    "street_equal": mr.street_equal,
-                    "equal_after_norm": mr.equal_after_norm,
-                    "reason": mr.reason,
-                    "category": mr.category,
-                    "enigma_annual_revenue": mr.enigma_annual_revenue,
-                    "enigma_yoy_growth": mr.enigma_yoy_growth,
-                    "enigma_ticket_size": mr.enigma_ticket_size,
-                    "g_address_full_norm": normalize_text(mr.g_address_full),
-                    "enigma_matched_full_address_norm": normalize_text(mr.enigma_matched_full_address),
-                    "g_street_norm": normalize_street_only(mr.g_street),
-                    "enigma_street_norm": normalize_street_only(mr.enigma_street),
-                }
+    getter = operator.attrgetter(*attr_fields)
+    with open(path, "w", newline="", buffering=1 << 20) as f:  # 1 MiB blocks instead of per-row flushes
+        w = csv.writer(f)
+        w.writerow(fieldnames)
+        # tuples in column order: no per-row dict for DictWriter to re-key
+        w.writerows(
+            getter(mr) + (
+                normalize_text(mr.g_address_full),
+                normalize_text(mr.enigma_matched_full_address),
+                normalize_street_only(mr.g_street),
+                normalize_street_only(mr.enigma_street),
             )
+            for mr in rows
+        )
     print(f"\n📄 CSV written: {path}")
 
 
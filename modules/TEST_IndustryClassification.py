@@ -18,29 +18,45 @@ for p in (HERE, ROOT):
     if p not in sys.path:
         sys.path.insert(0, p)
 
+import io
 import json
+import asyncio
+import hashlib
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from collections import OrderedDict
+from functools import lru_cache
 import pandas as pd
 import streamlit as st
 from dotenv import load_dotenv, find_dotenv
 
+try:  # optional: Arrow's C CSV writer for the results download (pandas fallback)
+    import pyarrow as pa
+    import pyarrow.csv as pa_csv
+except Exception:
+    pa = pa_csv = None
+
 # --- env + setup ---
-# Always load .env from project root (ROOT/.env), regardless of where Streamlit is launched
+# Always load .env from project root (ROOT/.env), regardless of where Streamlit is launched.
+# Streamlit re-executes this script on every interaction; parse the file once per process.
 DOTENV_PATH = os.path.join(ROOT, ".env")
-if os.path.exists(DOTENV_PATH):
-    load_dotenv(dotenv_path=DOTENV_PATH)
-else:
-    # fallback: search upwards just in case
-    load_dotenv(find_dotenv(usecwd=True))
+if not os.environ.get("_ENV_LOADED"):
+    if os.path.exists(DOTENV_PATH):
+        load_dotenv(dotenv_path=DOTENV_PATH)
+    else:
+        # fallback: search upwards just in case
+        load_dotenv(find_dotenv(usecwd=True))
+    os.environ["_ENV_LOADED"] = "1"
 
 # OpenAI helpers (optional)
 OPENAI_AVAILABLE = True
 try:
     from modules.openai_taxonomy import fetch_taxonomy_openai
-    from modules.openai_evaluator import evaluate_tiers_openai
+    from modules.openai_evaluator import evaluate_tiers_openai_async
 except Exception as _e:
     OPENAI_AVAILABLE = False
     fetch_taxonomy_openai = None
-    evaluate_tiers_openai = None
+    evaluate_tiers_openai_async = None
 
 # Rubric post-processor (required)
 from Phase1_rubric import process_taxonomy
@@ -48,11 +64,17 @@ from Phase1_rubric import process_taxonomy
 # --- strict imports of our rubric/tiering API ---
 try:
     from Phase1_rubric import build_taxonomy  # industry-agnostic taxonomy builder
-    from Phase1_tiering import extract_evidence, choose_tier  # evidence + tier decision
+    from Phase1_tiering import extract_evidence, choose_tiers_batch, compile_taxonomy  # evidence + batched tier decision
 except Exception as e:
     st.error(f"Import error in Phase1_* modules: {e}")
     st.stop()
 
+# --- optional: lets worker threads write st.* messages into this session ---
+try:
+    from streamlit.runtime.scriptrunner import add_script_run_ctx, get_script_run_ctx
+except Exception:
+    add_script_run_ctx = get_script_run_ctx = None
+
 # --- optional Supabase (we'll render UI even if missing) ---
 try:
     from supabase import create_client, Client  # type: ignore
@@ -60,12 +82,22 @@ except Exception:
     create_client = None
     Client = None
 
-# --- env + setup ---
-load_dotenv()
-SUPABASE_URL = os.getenv("SUPABASE_URL") or ""
-SUPABASE_KEY = os.getenv("SUPABASE_SERVICE_ROLE_KEY") or ""
-OLLAMA_MODEL = os.getenv("LLM_MODEL", "llama3")
-DEFAULT_PROJECT = os.getenv("TEST_PROJECT_ID", "23c25087-db5a-49bc-ad6f-432f7480acdf")
+# --- config (read once per process) ---
+@st.cache_resource
+def _get_config():
+    return {
+        "SUPABASE_URL": os.getenv("SUPABASE_URL") or "",
+        "SUPABASE_KEY": os.getenv("SUPABASE_SERVICE_ROLE_KEY") or "",
+        "OLLAMA_MODEL": os.getenv("LLM_MODEL", "llama3"),
+        "DEFAULT_PROJECT": os.getenv("TEST_PROJECT_ID", "23c25087-db5a-49bc-ad6f-432f7480acdf"),
+    }
+
+_CFG = _get_config()
+SUPABASE_URL = _CFG["SUPABASE_URL"]
+SUPABASE_KEY = _CFG["SUPABASE_KEY"]
+OLLAMA_MODEL = _CFG["OLLAMA_MODEL"]
+DEFAULT_PROJECT = _CFG["DEFAULT_PROJECT"]
+CANDIDATE_PAGE_SIZE = 1000  # PostgREST default max rows per response
 
 st.set_page_config(page_title="TEST — Industry Tiering", layout="wide")
 st.title("TEST — LLM Tiering (Industry-agnostic, no Google calls)")
@@ -92,6 +124,12 @@ if not OPENAI_AVAILABLE:
 
 # --- helpers ---
 
+@st.cache_resource
+def _supabase_client(url: str, key: str):
+    # One client (and its HTTP pool) per process, reused across reruns and sessions
+    return create_client(url, key)
+
+
 def _connect_supabase():
     if not create_client:
         st.warning("supabase client not installed (`pip install supabase`). Running without DB.")
@@ -100,7 +138,7 @@ def _connect_supabase():
         st.warning("Supabase env vars missing. Running without DB.")
         return None
     try:
-        return create_client(SUPABASE_URL, SUPABASE_KEY)
+        return _supabase_client(SUPABASE_URL, SUPABASE_KEY)
     except Exception as e:
         st.error(f"Could not initialize Supabase: {e}")
         return None
@@ -123,15 +161,275 @@ def _load_candidates(sb, project_id: str, limit: int = 500):
         st.warning("No DB client; cannot fetch candidates.")
         return []
     try:
-        # Pull common fields; web_signals may include schema_types etc.
-        res = sb.table("search_results").select(
-            "id,name,website,page_title,web_signals,tier,tier_reason,category,city,state"
-        ).eq("project_id", project_id).limit(limit).execute()
-        return res.data or []
+        # Only the fields the loop reads; schema_types is pulled out of web_signals server-side
+        # so the (large) web_signals JSON never crosses the wire. PostgREST caps a response at
+        # 1000 rows, so page with .range() for bigger limits.
+        rows = []
+        for off in range(0, limit, CANDIDATE_PAGE_SIZE):
+            end = min(off + CANDIDATE_PAGE_SIZE, limit) - 1
+            res = sb.table("search_results").select(
+                "id,name,website,page_title,category,tier,tier_reason,audit_confidence,"
+                "schema_types:web_signals->schema_types"
+            ).eq("project_id", project_id).order("id").range(off, end).execute()
+            page = res.data or []
+            rows.extend(page)
+            if len(page) < end - off + 1:
+                break
+        return rows
     except Exception as e:
         st.error(f"Error loading candidates: {e}")
         return []
 
+def _with_script_ctx(fn):
+    """Wrap fn so st.warning/st.error from a pool thread land in the current session."""
+    ctx = get_script_run_ctx() if get_script_run_ctx else None
+
+    def _run(*args, **kwargs):
+        if ctx is not None:
+            add_script_run_ctx(threading.current_thread(), ctx)
+        return fn(*args, **kwargs)
+    return _run
+
+
+def _taxonomy_hash(taxonomy: dict) -> str:
+    """Content hash of the taxonomy (canonical JSON, blake2b-128); computed once per run."""
+    canon = json.dumps(taxonomy, sort_keys=True, ensure_ascii=False, separators=(",", ":"))
+    return hashlib.blake2b(canon.encode("utf-8"), digest_size=16).hexdigest()
+
+
+# Taxonomy (+ compiled matchers) by content hash, so cache keys carry a short string instead of the dict.
+# Shared by every Streamlit session: entries are only added (bounded, oldest out), never cleared, so a
+# concurrent _ev_cached lookup for another session's hash can't miss. _ev_cached is keyed by hash too.
+_TAX_REGISTRY: "OrderedDict[str, tuple]" = OrderedDict()
+_TAX_REGISTRY_MAX = 16
+_TAX_REGISTRY_LOCK = threading.Lock()
+
+
+def _register_taxonomy(tax_hash: str, taxonomy: dict, matchers) -> None:
+    with _TAX_REGISTRY_LOCK:
+        _TAX_REGISTRY[tax_hash] = (taxonomy, matchers)
+        _TAX_REGISTRY.move_to_end(tax_hash)
+        while len(_TAX_REGISTRY) > _TAX_REGISTRY_MAX:
+            _TAX_REGISTRY.popitem(last=False)
+
+
+@lru_cache(maxsize=4096)
+def _ev_cached(tax_hash: str, name: str, website: str, page_title: str, schema_tuple: tuple, cat_tuple: tuple):
+    # Chains / duplicated listings share identical inputs; extract_evidence is deterministic on them
+    taxonomy, matchers = _TAX_REGISTRY[tax_hash]
+    return extract_evidence(
+        taxonomy,
+        name=name,
+        website=website,
+        page_title=page_title,
+        schema_types=list(schema_tuple),
+        categories=list(cat_tuple),
+        google_types=[],
+        text_snippet="",  # keep cheap for harness
+        matchers=matchers,
+    )
+
+def _write_back_tiers(sb, df: pd.DataFrame) -> None:
+    """Persist tier/tier_reason/audit_confidence for newly classified rows (same columns as Phase1_apply).
+
+    Runs from the script body (not inside the cached _classify), so ids that failed are retried on the
+    next rerun; ids already written this session are skipped.
+
+    Rows with identical values share one `update ... where id in (...)` (chunks of 500 ids); the
+    remaining statements run on a small pool. A failed write doesn't stop the others: failed ids are
+    collected and reported once.
+    """
+    groups: dict = {}
+    for rid, tier, reason, conf in zip(df["id"], df["tier"], df["reason"], df["conf"]):
+        # conf is float32 in the frame: round back to the 2dp value so the column gets 0.7, not 0.69999…
+        groups.setdefault((int(tier), reason, round(float(conf), 2)), []).append(rid)
+    jobs = [
+        ({"tier": tier, "tier_reason": reason, "audit_confidence": conf}, ids[i:i + 500])
+        for (tier, reason, conf), ids in groups.items()
+        for i in range(0, len(ids), 500)
+    ]
+    if not jobs:
+        return
+
+    def _one(job):
+        payload, ids = job
+        try:
+            sb.table("search_results").update(payload).in_("id", ids).execute()
+            return [], None
+        except Exception as e:
+            return ids, e
+
+    failed, last_err = [], None
+    with ThreadPoolExecutor(max_workers=min(8, len(jobs))) as ex:
+        for ids, err in ex.map(_one, jobs):
+            if err is not None:
+                failed.extend(ids)
+                last_err = err
+    written = st.session_state.setdefault("_tiers_written", set())
+    written.update(set(df["id"]) - set(failed))
+    if failed:
+        st.warning(f"Could not write tiers back for {len(failed)} search_results rows "
+                   f"(e.g. {', '.join(map(str, failed[:5]))}): {last_err}")
+
+
+@st.cache_data(show_spinner=False, max_entries=8)
+def _classify(project_id: str, tax_hash: str, industry: str, bias: str, provider: str, model: str, max_rows: int,
+              skip_done: bool, _taxonomy: dict, _rows: list) -> pd.DataFrame:
+    """Evidence + tier decisions for every candidate row.
+
+    Cached on (project_id, taxonomy hash, bias, provider, model, max_rows, skip_done): reruns from
+    other widgets (e.g. evaluator toggles) reuse the frame instead of repeating the LLM loop.
+    `_taxonomy`/`_rows` are not hashed (leading underscore): the taxonomy is represented by
+    tax_hash and the rows are determined by project_id + max_rows.
+
+    skip_done: rows that already carry a tier keep it (no evidence/LLM work). Freshly computed
+    tiers (tier_source == "computed") are written back by the caller so the next run can skip them.
+    """
+    stored = [r for r in _rows if skip_done and r.get("tier") is not None]
+    rows = [r for r in _rows if not (skip_done and r.get("tier") is not None)]
+    taxonomy = _taxonomy
+
+    # Normalize/compile the taxonomy term lists once for every candidate below
+    tax_matchers = compile_taxonomy(taxonomy, industry)
+    _register_taxonomy(tax_hash, taxonomy, tax_matchers)
+
+    # Column-oriented results buffer: one list per output column, one DataFrame build at the end
+    cols = {k: [] for k in (
+        "id", "name", "website", "tier", "conf", "reason",
+        "primary_hits", "adjacent_hits", "disqualifier_hits", "venue_taxonomy", "venue_fallback", "brand_hits",
+        "flags", "page_title", "category", "tier_source",
+    )}
+    prog = st.progress(0.0, text="Extracting evidence…")
+    total = len(rows)
+    # Rules-only tiering runs the whole list in one choose_tiers_fast pass; LLM providers go 20 per request
+    tier_batch = max(1, total) if provider == "none" else 20
+
+    # Pass 1: evidence is cheap and local — build it for every row up front
+    evidences, snippets_list = [], []
+    for r in rows:
+        name = r.get("name") or ""
+        website = r.get("website") or ""
+        page_title = r.get("page_title") or ""
+
+        # optional structured signals
+        schema_types = r.get("schema_types") or []
+        categories = []
+        if not isinstance(schema_types, list):
+            schema_types = []
+
+        # category may be a string or list in search_results
+        cat = r.get("category")
+        if isinstance(cat, list):
+            categories = cat
+        elif isinstance(cat, str) and cat.strip():
+            categories = [cat.strip()]
+
+        # Build evidence (lightweight; no live scraping); identical inputs hit the cache.
+        # Copy so per-row consumers never share one dict.
+        evidences.append(dict(_ev_cached(
+            tax_hash, name, website, page_title,
+            tuple(map(str, schema_types)), tuple(map(str, categories)),
+        )))
+        snippets_list.append({"snippets": {"name": name, "page_title": page_title, "website": website}})
+
+    prog_step, prog_shown = max(1, total // 100), 0
+
+    # Pass 2: tier decisions, one request per batch (taxonomy sent once per batch, not per row)
+    for start in range(0, total, tier_batch):
+        batch_rows = rows[start:start + tier_batch]
+        decisions = choose_tiers_batch(
+            industry,
+            taxonomy,
+            evidences[start:start + tier_batch],
+            snippets_list[start:start + tier_batch],
+            provider=provider,
+            model=model,
+            bias=bias,
+            batch_size=tier_batch,
+        )
+
+        for r, decision in zip(batch_rows, decisions):
+            hits = decision.get("hits", {})
+            cols["id"].append(r.get("id"))
+            cols["name"].append(r.get("name") or "")
+            cols["website"].append(r.get("website") or "")
+            cols["tier"].append(decision.get("tier"))
+            cols["conf"].append(round(float(decision.get("confidence") or 0.0), 2))
+            cols["reason"].append(decision.get("reason") or "")
+            cols["primary_hits"].append(hits.get("primary"))
+            cols["adjacent_hits"].append(hits.get("adjacent"))
+            cols["disqualifier_hits"].append(hits.get("disqualifier"))
+            cols["venue_taxonomy"].append(hits.get("venue_taxonomy"))
+            cols["venue_fallback"].append(hits.get("venue_fallback"))
+            cols["brand_hits"].append(hits.get("brand"))
+            cols["flags"].append(decision.get("flags", {}))
+            cols["page_title"].append(r.get("page_title") or "")
+            cols["category"].append(r.get("category"))
+            cols["tier_source"].append("computed")
+
+        # Coarse progress: ~100 websocket updates at most, whatever the batch size
+        done = min(start + tier_batch, total)
+        if done - prog_shown >= prog_step or done == total:
+            prog.progress(done / total, text=f"Classified {done}/{total}")
+            prog_shown = done
+
+    prog.empty()
+
+    # Previously tiered rows: reuse the stored tier/reason as-is
+    for r in stored:
+        for k in ("primary_hits", "adjacent_hits", "disqualifier_hits", "venue_taxonomy", "venue_fallback", "brand_hits"):
+            cols[k].append([])
+        cols["id"].append(r.get("id"))
+        cols["name"].append(r.get("name") or "")
+        cols["website"].append(r.get("website") or "")
+        cols["tier"].append(int(r.get("tier")))
+        cols["conf"].append(round(float(r.get("audit_confidence") or 0.0), 2))
+        cols["reason"].append(r.get("tier_reason") or "")
+        cols["flags"].append({})
+        cols["page_title"].append(r.get("page_title") or "")
+        cols["category"].append(r.get("category"))
+        cols["tier_source"].append("stored")
+
+    # Narrow dtypes: tier is 1/2/3, conf is 0..1 at 2dp, category repeats heavily. flags stays
+    # object (dicts), and category only converts when no row carries a list of categories.
+    df = pd.DataFrame(cols)
+    df["tier"] = df["tier"].astype("int8")
+    df["conf"] = df["conf"].astype("float32")
+    if not df["category"].map(lambda v: isinstance(v, list)).any():
+        df["category"] = df["category"].astype("category")
+    return df
+
+
+@st.cache_data(show_spinner=False, max_entries=8)
+def _results_csv(df: pd.DataFrame) -> bytes:
+    # List-valued columns go out as JSON (one dumps per cell instead of str(list)); write
+    # straight into a byte buffer so the CSV text isn't held twice (str + encoded bytes)
+    json_cols = [
+        "primary_hits", "adjacent_hits", "disqualifier_hits", "venue_taxonomy", "venue_fallback",
+        "brand_hits", "flags", "eval_evidence_tags",
+    ]
+    out = df.assign(**{
+        c: df[c].map(lambda v: json.dumps(v) if isinstance(v, (list, dict)) else v)
+        for c in json_cols if c in df.columns
+    })
+    if pa is not None:
+        try:
+            tbl = pa.Table.from_pandas(out, preserve_index=False)
+            # categorical columns arrive as dictionary arrays; write their plain values
+            tbl = pa.Table.from_arrays(
+                [c.cast(c.type.value_type) if pa.types.is_dictionary(c.type) else c for c in tbl.columns],
+                names=tbl.column_names,
+            )
+            sink = pa.BufferOutputStream()
+            pa_csv.write_csv(tbl, sink, write_options=pa_csv.WriteOptions(include_header=True))
+            return sink.getvalue().to_pybytes()
+        except (pa.ArrowInvalid, pa.ArrowTypeError, pa.ArrowNotImplementedError):
+            pass  # mixed-type object column etc. -> pandas writer below
+    csv_buf = io.BytesIO()
+    out.to_csv(csv_buf, index=False, encoding="utf-8")
+    return csv_buf.getvalue()
+
+
 # --- UI controls ---
 col1, col2, col3, col4 = st.columns([2, 1, 1, 1])
 with col1:
@@ -145,6 +443,7 @@ with col4:
 
 bias = st.radio("Bias", ["balanced", "high-recall"], index=0, horizontal=True)
 max_rows = st.number_input("Max rows", min_value=10, max_value=2000, step=10, value=300)
+skip_done = st.checkbox("Skip rows already tiered", value=True)
 
 # Evaluator controls
 colE1, colE2 = st.columns([1,1])
@@ -158,7 +457,12 @@ run = st.button("Build taxonomy & classify", type="primary")
 # --- main execution guarded with try/except so we always show something ---
 try:
     sb = _connect_supabase()
-    proj = _load_project(sb, project_id)
+    # Independent round-trips: fetch candidates while the project loads (and the taxonomy builds)
+    _pool = ThreadPoolExecutor(max_workers=2)
+    f_proj = _pool.submit(_with_script_ctx(_load_project), sb, project_id)
+    f_rows = _pool.submit(_with_script_ctx(_load_candidates), sb, project_id, int(max_rows))
+    _pool.shutdown(wait=False)
+    proj = f_proj.result()
     if not proj:
         st.error("Project not found or DB offline.")
         st.stop()
@@ -185,133 +489,71 @@ try:
 
     st.caption("Taxonomy used (LLM-derived or fallback):")
     st.json(taxonomy)
+    TAX_HASH = _taxonomy_hash(taxonomy)
 
-    rows = _load_candidates(sb, project_id, limit=int(max_rows))
+    rows = f_rows.result()
     if not rows:
         st.warning("No candidates returned from search_results for this project.")
         st.stop()
 
-    out_records = []
-    prog = st.progress(0.0, text="Classifying…")
-    total = len(rows)
-
-    for i, r in enumerate(rows, start=1):
-        name = r.get("name") or ""
-        website = r.get("website") or ""
-        page_title = r.get("page_title") or ""
-
-        # optional structured signals
-        schema_types = []
-        categories = []
-        ws = r.get("web_signals")
-        if isinstance(ws, dict):
-            schema_types = ws.get("schema_types", []) or []
-
-        # category may be a string or list in search_results
-        cat = r.get("category")
-        if isinstance(cat, list):
-            categories = cat
-        elif isinstance(cat, str) and cat.strip():
-            categories = [cat.strip()]
-
-        # Build evidence (lightweight; no live scraping)
-        ev = extract_evidence(
-            taxonomy,
-            name=name,
-            website=website,
-            page_title=page_title,
-            schema_types=schema_types,
-            categories=categories,  # <— NEW
-            google_types=[],
-            text_snippet="",  # keep cheap for harness
-        )
-
-        # Ask tier engine (balanced or high-recall). Extra context (snippets) is folded into evidence.
-        decision = choose_tier(
-            industry,
-            taxonomy,
-            ev,
-            provider=provider,
-            model=model,
-            bias=bias,
-            snippets={"name": name, "page_title": page_title, "website": website},
-        )
-
-        hits = decision.get("hits", {})
-        flags = decision.get("flags", {})
-        out_records.append({
-            "id": r.get("id"),
-            "name": name,
-            "website": website,
-            "tier": decision.get("tier"),
-            "conf": round(float(decision.get("confidence") or 0.0), 2),
-            "reason": decision.get("reason") or "",
-            "primary_hits": hits.get("primary"),
-            "adjacent_hits": hits.get("adjacent"),
-            "disqualifier_hits": hits.get("disqualifier"),
-            "venue_taxonomy": hits.get("venue_taxonomy"),
-            "venue_fallback": hits.get("venue_fallback"),
-            "brand_hits": hits.get("brand"),
-            "flags": flags,
-            "page_title": page_title,
-            "category": r.get("category"),
-        })
-
-        if total:
-            prog.progress(i / total, text=f"Classified {i}/{total}")
-
-    prog.empty()
-
-    df = pd.DataFrame(out_records)
+    df = _classify(
+        project_id, TAX_HASH, industry, bias, provider, model, int(max_rows),
+        bool(skip_done), taxonomy, rows,
+    )
+    if skip_done and sb is not None:
+        written = st.session_state.get("_tiers_written", set())
+        todo = df.loc[(df["tier_source"] == "computed") & ~df["id"].isin(written)]
+        if len(todo):
+            _write_back_tiers(sb, todo)
 
     # Optional evaluator (OpenAI) on a subset to minimize cost
     if eval_mode != "Off":
         if not OPENAI_AVAILABLE:
             st.warning("Evaluator selected, but OpenAI client is unavailable. Skipping evaluator.")
         else:
-            # Filter candidates
-            def borderline(row):
-                if row["tier"] == 1 and 0.70 <= row["conf"] < 0.85:
-                    return True
-                if row["tier"] == 2:
-                    syn_hit = bool(row["primary_hits"]) or bool(row["adjacent_hits"])
-                    ven_ok = bool(row["venue_taxonomy"])
-                    return syn_hit and ven_ok
-                return False
-
+            # Filter candidates (column masks; no per-row Python callback)
             if eval_mode == "Borderline only":
-                eval_df = df[df.apply(borderline, axis=1)].copy()
+                pri_b = df["primary_hits"].map(bool)
+                adj_b = df["adjacent_hits"].map(bool)
+                ven_b = df["venue_taxonomy"].map(bool)
+                mask = (
+                    ((df["tier"] == 1) & (df["conf"] >= 0.70) & (df["conf"] < 0.85))
+                    | ((df["tier"] == 2) & (pri_b | adj_b) & ven_b)
+                )
+                eval_df = df.loc[mask]
             else:
-                eval_df = df[df["tier"].isin([1, 2])].copy()
-
-            # Build items payload
-            items = []
-            for _, row in eval_df.iterrows():
-                items.append({
-                    "id": row["id"],
-                    "name": row["name"],
-                    "page_title": row["page_title"],
-                    "category": row["category"],
-                    "primary_hits": row["primary_hits"] or [],
-                    "adjacent_hits": row["adjacent_hits"] or [],
-                    "disqualifier_hits": row["disqualifier_hits"] or [],
-                    "venue_hits_taxonomy": row["venue_taxonomy"] or [],
-                    "venue_hits_fallback": row["venue_fallback"] or [],
-                    "tier": int(row["tier"]),
-                    "confidence": float(row["conf"]),
-                    "reason": row["reason"],
-                })
+                eval_df = df.loc[df["tier"].isin([1, 2])]
+
+            # Build items payload (rename to the evaluator schema, then one to_dict pass)
+            payload_cols = {
+                "id": "id", "name": "name", "page_title": "page_title", "category": "category",
+                "primary_hits": "primary_hits", "adjacent_hits": "adjacent_hits",
+                "disqualifier_hits": "disqualifier_hits", "venue_taxonomy": "venue_hits_taxonomy",
+                "venue_fallback": "venue_hits_fallback", "tier": "tier", "conf": "confidence", "reason": "reason",
+            }
+            eval_df = eval_df[list(payload_cols)].rename(columns=payload_cols)
+            for col in ("primary_hits", "adjacent_hits", "disqualifier_hits", "venue_hits_taxonomy", "venue_hits_fallback"):
+                eval_df[col] = eval_df[col].map(lambda v: v or [])
+            eval_df["tier"] = eval_df["tier"].astype(int)
+            eval_df["confidence"] = eval_df["confidence"].astype(float)
+            items = eval_df.to_dict("records")
 
             with st.spinner(f"Evaluating {len(items)} borderline items…"):
-                suggestions = evaluate_tiers_openai(items, taxonomy, model=eval_model, batch_size=50)
-
-            # Join suggestions back
-            sugg_by_id = {s["id"]: s for s in suggestions}
-            df["eval_suggested_tier"] = df["id"].map(lambda x: sugg_by_id.get(x, {}).get("suggested_tier"))
-            df["eval_disposition"] = df["id"].map(lambda x: sugg_by_id.get(x, {}).get("disposition"))
-            df["eval_conf"] = df["id"].map(lambda x: sugg_by_id.get(x, {}).get("confidence"))
-            df["eval_reason"] = df["id"].map(lambda x: sugg_by_id.get(x, {}).get("reason"))
-            df["eval_evidence_tags"] = df["id"].map(lambda x: sugg_by_id.get(x, {}).get("evidence_tags"))
+                # Batches run concurrently (capped at 8 in flight); Streamlit's script thread has no loop
+                suggestions = asyncio.run(
+                    evaluate_tiers_openai_async(items, taxonomy, model=eval_model, batch_size=50, max_concurrency=8)
+                )
+
+            # Join suggestions back (one hash join instead of five per-row dict lookups)
+            sugg_cols = ["id", "suggested_tier", "disposition", "confidence", "reason", "evidence_tags"]
+            sugg_df = (
+                pd.DataFrame(suggestions)
+                .reindex(columns=sugg_cols)
+                .drop_duplicates(subset="id", keep="last")
+                .add_prefix("eval_")
+                .rename(columns={"eval_id": "id", "eval_confidence": "eval_conf"})
+            )
+            df = df.merge(sugg_df, on="id", how="left")
 
     # Ensure eval_* columns exist even if evaluator is Off
     for col in ["eval_suggested_tier","eval_disposition","eval_conf","eval_reason","eval_evidence_tags"]:
@@ -328,11 +570,12 @@ try:
         "reason", "eval_reason", "eval_evidence_tags", "flags",
         "primary_hits", "adjacent_hits", "disqualifier_hits", "venue_taxonomy", "venue_fallback", "brand_hits",
     ]
-    st.dataframe(df[display_cols].sort_values(by=["tier", "conf"], ascending=[True, False]), use_container_width=True)
+    # df is already sorted above; the same frame feeds the download below
+    st.dataframe(df[display_cols], use_container_width=True)
 
     st.download_button(
         "Download CSV",
-        data=df.to_csv(index=False).encode("utf-8"),
+        data=_results_csv(df),
         file_name="tiering_results.csv",
         mime="text/csv",
     )
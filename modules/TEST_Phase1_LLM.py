@@ -3,7 +3,7 @@ import argparse, json, sys
 from typing import Optional, Tuple
 from phase1_lib import (
     IndustrySettings, DiscoveryParams, KNOWN_TYPES,
-    default_settings_for_industry, build_profile_prompt, ollama_generate_profile_json,
+    default_settings_for_industry, build_profile_prompt, ollama_generate_profile_json, cached_profile_json,
     validate_profile_json, merge_profile, plan_queries, explain_scoring_rules,
 )
 
@@ -79,7 +79,8 @@ def main():
     # 2) Optional LLM profile (merges into defaults)
     if args.enable_llm_profile:
         prompt = build_profile_prompt(args.industry, args.location, KNOWN_TYPES)
-        prof_raw = ollama_generate_profile_json(args.ollama_model, args.ollama_url, prompt, temperature=args.llm_temp)
+        prof_raw = cached_profile_json(args.ollama_model, args.ollama_url, args.industry, args.location, prompt,
+                                       temperature=args.llm_temp)
         prof = validate_profile_json(prof_raw or {}, KNOWN_TYPES)
         if prof:
             settings = merge_profile(settings, prof)
@@ -110,6 +111,8 @@ def main():
     else:
         print(f"\n📍 Center: {center}")
         print(f"Grid nodes planned: {plan.get('grid_nodes')} (showing first {len(plan.get('grid_preview',[]))})")
+        if args.verbose:
+            print(f"Nearby requests after coalescing: {plan.get('nearby_requests')} ({plan.get('coalesced_requests')} duplicate/enclosed skipped)")
         for i, q in enumerate(plan.get('grid_preview', []), start=1):
             print(f" {i:02d}. location={q['location']} radius={q['radius']} type={q.get('type')} keyword={q.get('keyword')}")
             print(f"     e.g., {q['sample_url']}")
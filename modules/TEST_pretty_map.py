@@ -5,29 +5,33 @@ for a single project without touching the main codebase.
 """
 from __future__ import annotations
 import argparse
+import functools
 import logging
 import math
 import os
-import time
 from datetime import datetime
 from typing import Tuple, List, Dict
 
+import numpy as np
 import pandas as pd
 from dotenv import load_dotenv
 from supabase import create_client, Client
 import folium
-from geopy.distance import geodesic
 from branca.element import Element
 from selenium import webdriver
 from selenium.webdriver.chrome.options import Options
 from selenium.common.exceptions import WebDriverException, JavascriptException
 
+try:  # shared on-disk tile cache proxy (repeat renders read tiles from disk)
+    from modules.map_generator import POSI_TILE_URL, capture_png, local_render_copy, marker_layer, prefetch_tiles, wait_for_tiles
+except ImportError:
+    from map_generator import POSI_TILE_URL, capture_png, local_render_copy, marker_layer, prefetch_tiles, wait_for_tiles
+
 OUTPUT_ROOT = os.path.join("modules", "output")
 WINDOW_W, WINDOW_H = 1200, 800
-TILE_URL = "https://{s}.basemaps.cartocdn.com/light_all/{z}/{x}/{y}{r}.png"
 TILE_ATTR = "© OpenStreetMap contributors © CARTO"
 TILE_WAIT_HARD_TIMEOUT_SEC = 12.0
-TILE_POLL_INTERVAL_SEC = 0.25
+EARTH_RADIUS_KM = 6371.0088  # mean radius; within ~0.5% of geodesic at map scales
 
 logger = logging.getLogger("TEST_pretty_map")
 
@@ -40,7 +44,9 @@ def setup_logging(level: str = "INFO") -> None:
     )
     logger.debug("Logging initialized at %s", level)
 
+@functools.lru_cache(maxsize=1)
 def get_supabase() -> Client:
+    """One client (and one .env parse) per process."""
     load_dotenv()
     url = os.getenv("SUPABASE_URL")
     key = os.getenv("SUPABASE_SERVICE_ROLE_KEY")
@@ -70,6 +76,13 @@ def fetch_businesses(project_id: str, supabase: Client) -> pd.DataFrame:
 # Zoom computation
 # -----------------------------
 
+def farthest_km(center_lat: float, center_lng: float, lats: np.ndarray, lngs: np.ndarray) -> float:
+    """Largest haversine distance (km) from the centre to any point, in one array pass."""
+    lat = np.radians(lats)
+    clat = math.radians(center_lat)
+    a = np.sin((lat - clat) / 2.0) ** 2 + math.cos(clat) * np.cos(lat) * np.sin((np.radians(lngs) - math.radians(center_lng)) / 2.0) ** 2
+    return float(2.0 * EARTH_RADIUS_KM * np.arcsin(np.sqrt(a.max()))) if a.size else 0.0
+
 def compute_zoom_for_circle(center_lat: float, radius_m: float, target_fraction_of_height: float, height_px: int) -> float:
     """Compute Leaflet zoom so that a circle of radius_m meters appears with diameter ~= target_fraction_of_height * map height.
     Uses WebMercator meters-per-pixel formula: mpp = 156543.03392 * cos(lat) / 2**z
@@ -92,8 +105,8 @@ def build_map(df: pd.DataFrame) -> Tuple[folium.Map, Dict[str, float]]:
     logger.info("Center lat/lng: %.6f, %.6f", center_lat, center_lng)
 
     # Radius based on farthest point (keeps underlying area constant)
-    farthest_km = max(geodesic((center_lat, center_lng), (lat, lng)).km for lat, lng in zip(df["latitude"], df["longitude"]))
-    radius_m = max(200, int(farthest_km * 1000))
+    far_km = farthest_km(center_lat, center_lng, df["latitude"].to_numpy(float), df["longitude"].to_numpy(float))
+    radius_m = max(200, int(far_km * 1000))
 
     # Compute zoom so the circle diameter ~ 60% of map height
     desired_zoom = compute_zoom_for_circle(center_lat, radius_m, target_fraction_of_height=0.60, height_px=WINDOW_H)
@@ -108,32 +121,8 @@ def build_map(df: pd.DataFrame) -> Tuple[folium.Map, Dict[str, float]]:
         max_zoom=19,
     )
 
-    # Allow fractional zoom & set exact level via JS
-    js = Element(f"""
-    <script>
-    var map = document.querySelector('.leaflet-container')._leaflet_map;
-    if (map) {{
-      map.options.zoomSnap = 0;
-      map.options.zoomDelta = 0.1;
-      map.setZoom({desired_zoom});
-    }}
-    </script>
-    """)
-    m.get_root().html.add_child(js)
-
-    # Larger legend styling
-    legend_html = """
-    <div style="position: fixed; top: 12px; right: 12px; z-index: 9999;
-                background: rgba(255,255,255,0.96); border: 1px solid #d0d0d0;
-                border-radius: 6px; padding: 14px 16px; font-size: 18px; line-height: 1.6;
-                box-shadow: 0 2px 8px rgba(0,0,0,.15);">
-      <div style="font-weight:600; margin-bottom:8px;">Legend</div>
-      <div><span style="display:inline-block;width:14px;height:14px;border:2px solid #fff;background:#2ca25f;border-radius:50%;margin-right:8px;"></span>Trusted</div>
-      <div><span style="display:inline-block;width:14px;height:14px;border:2px solid #fff;background:#7f8c8d;border-radius:50%;margin-right:8px;"></span>Other</div>
-    </div>
-    """
-
-    folium.TileLayer(TILE_URL, name="Positron", attr=TILE_ATTR, control=False).add_to(m)
+    folium.TileLayer(POSI_TILE_URL, name="Positron", attr=TILE_ATTR, control=False,
+                     update_when_idle=False, keep_buffer=4).add_to(m)
 
     # Subtle basemap fade & desaturation so markers pop
     css = Element(
@@ -189,19 +178,8 @@ def build_map(df: pd.DataFrame) -> Tuple[folium.Map, Dict[str, float]]:
         ).add_to(m)
         logger.debug("dash_array unsupported; used solid ring")
 
-    # Markers
-    for _, row in df.iterrows():
-        fill = "#2ca25f" if str(row.get("benchmark", "")).lower() == "trusted" else "#7f8c8d"
-        folium.CircleMarker(
-            location=[row["latitude"], row["longitude"]],
-            radius=8,
-            weight=2,
-            color="#ffffff",
-            fill=True,
-            fill_color=fill,
-            fill_opacity=0.95,
-            tooltip=row.get("name", ""),
-        ).add_to(m)
+    # Markers: one JSON blob + one Leaflet loop
+    marker_layer(df, tooltips=True).add_to(m)
 
     # Bigger legend with subtle shadow
     legend_html = (
@@ -226,6 +204,7 @@ def build_map(df: pd.DataFrame) -> Tuple[folium.Map, Dict[str, float]]:
 def save_html_and_png(m: folium.Map, html_path: str, png_path: str) -> None:
     logger.info("Saving HTML → %s", html_path)
     m.save(html_path)
+    render_path = local_render_copy(html_path)  # screenshot via the tile cache; saved HTML keeps CDN tiles
     options = Options()
     options.add_argument("--headless=new")
     options.add_argument("--no-sandbox")
@@ -239,7 +218,7 @@ def save_html_and_png(m: folium.Map, html_path: str, png_path: str) -> None:
         raise
     try:
         driver.set_window_size(WINDOW_W, WINDOW_H)
-        target = "file://" + os.path.abspath(html_path)
+        target = "file://" + os.path.abspath(render_path)
         logger.info("Loading: %s", target)
         driver.get(target)
         try:
@@ -248,24 +227,14 @@ def save_html_and_png(m: folium.Map, html_path: str, png_path: str) -> None:
             logger.debug("Final Leaflet zoom (pre-wait): %s", final_zoom)
         except JavascriptException:
             pass
-        deadline = time.time() + TILE_WAIT_HARD_TIMEOUT_SEC
-        polls = 0
-        while time.time() < deadline:
-            polls += 1
-            try:
-                loading = driver.execute_script("return document.querySelectorAll('.leaflet-tile-loading').length")
-                loaded_imgs = driver.execute_script("return document.querySelectorAll('.leaflet-tile-loaded, .leaflet-tile').length")
-            except JavascriptException:
-                loading, loaded_imgs = 0, 0
-            logger.debug("Tile poll %d → loading=%s, tiles_seen=%s", polls, loading, loaded_imgs)
-            if int(loading) == 0 and int(loaded_imgs) > 0:
-                time.sleep(0.4)
-                break
-            time.sleep(TILE_POLL_INTERVAL_SEC)
-        driver.save_screenshot(png_path)
+        settled = wait_for_tiles(driver, m.get_name(), TILE_WAIT_HARD_TIMEOUT_SEC)
+        logger.debug("Tiles settled: %s", settled)
+        capture_png(driver, png_path)
         logger.info("Saved PNG → %s", png_path)
     finally:
         driver.quit()
+        if render_path != html_path:
+            os.remove(render_path)
 
 
 def main() -> int:
@@ -283,6 +252,8 @@ def main() -> int:
         return 2
     m, meta = build_map(df)
     logger.debug("Map meta: %s", meta)
+    n_tiles = prefetch_tiles(meta["center_lat"], meta["center_lng"], meta["desired_zoom"], (WINDOW_W, WINDOW_H))
+    logger.debug("Prefetched %d tiles", n_tiles)
     stamp = datetime.now().strftime("%Y%m%d_%H%M%S")
     html_path = os.path.join(out_dir, f"test_map_{stamp}.html")
     png_path = os.path.join(out_dir, f"test_map_{stamp}.png")
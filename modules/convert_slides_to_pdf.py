@@ -2,48 +2,130 @@
 
 import os
 import re
+import shutil
 import subprocess
+import tempfile
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
 from PyPDF2 import PdfMerger
 from datetime import datetime
 
+try:  # optional: QPDF-backed merge splices page objects instead of re-serialising everything
+    import pikepdf
+except Exception:
+    pikepdf = None
+
+# slide_1.pptx, slide_1_title.pptx, slide_10.pptx, ... -> group(1) is the sort number
+_SLIDE_RE = re.compile(r"slide_(\d+).*\.pptx$")
+# Impress PDF export tuned for on-screen reports: downsample images to 150 dpi, no bookmarks
+# (LibreOffice >= 7.4 JSON filter options). LIBREOFFICE_PDF_FILTER="pdf" restores the default profile.
+_PDF_FILTER_DEFAULT = (
+    'pdf:impress_pdf_Export:{'
+    '"ReduceImageResolution":{"type":"boolean","value":"true"},'
+    '"MaxImageResolution":{"type":"long","value":"150"},'
+    '"ExportBookmarks":{"type":"boolean","value":"false"}}'
+)
+LIBREOFFICE_PDF_FILTER = os.getenv("LIBREOFFICE_PDF_FILTER", _PDF_FILTER_DEFAULT)
+# Parallel LibreOffice processes for the slide conversion (each needs its own user profile)
+LIBREOFFICE_WORKERS = int(os.getenv("LIBREOFFICE_WORKERS", str(min(4, os.cpu_count() or 1))))
+
 
 def pptx_to_pdf_libreoffice(pptx_path: str, pdf_path: str):
     try:
         subprocess.run([
-            "libreoffice", "--headless", "--convert-to", "pdf", pptx_path, "--outdir", os.path.dirname(pdf_path)
+            "libreoffice", "--headless", "--convert-to", LIBREOFFICE_PDF_FILTER, pptx_path, "--outdir", os.path.dirname(pdf_path)
         ], check=True)
     except FileNotFoundError:
         raise RuntimeError("❌ LibreOffice CLI not found. Make sure 'libreoffice' is in your PATH.")
 
 
+def pptx_to_pdf_libreoffice_many(pptx_paths: list, outdir: str, profile_dir: str = None):
+    """Convert every deck in one LibreOffice process (startup paid once, not per slide).
+    profile_dir gives the process its own user profile so several can run at once."""
+    if not pptx_paths:
+        return
+    cmd = ["libreoffice", "--headless"]
+    if profile_dir:
+        cmd.append(f"-env:UserInstallation={Path(profile_dir).as_uri()}")
+    try:
+        subprocess.run([*cmd, "--convert-to", LIBREOFFICE_PDF_FILTER, "--outdir", outdir, *pptx_paths], check=True)
+    except FileNotFoundError:
+        raise RuntimeError("❌ LibreOffice CLI not found. Make sure 'libreoffice' is in your PATH.")
+
+
+def _balanced_chunks(paths: list, n: int) -> list:
+    # largest deck first onto the lightest worker: image-heavy exhibits/map/cover slides
+    # dominate conversion time, so file size is a decent proxy for cost
+    bins = [[] for _ in range(n)]
+    loads = [0] * n
+    for path in sorted(paths, key=os.path.getsize, reverse=True):
+        i = loads.index(min(loads))
+        bins[i].append(path)
+        loads[i] += os.path.getsize(path)
+    return bins
+
+
+def pptx_to_pdf_libreoffice_parallel(pptx_paths: list, outdir: str, workers: int = LIBREOFFICE_WORKERS):
+    """Split the decks over `workers` concurrent LibreOffice processes, balanced by file size.
+    Each process gets a fresh profile dir for this run only: concurrent exports (other Streamlit
+    sessions share this process) never hand off to, or lock on, each other's soffice instance."""
+    n = max(1, min(int(workers), len(pptx_paths)))
+    if n == 1:
+        return pptx_to_pdf_libreoffice_many(pptx_paths, outdir)
+    chunks = _balanced_chunks(pptx_paths, n)
+    run_dir = tempfile.mkdtemp(prefix="lo_profiles_")
+    profiles = [os.path.join(run_dir, str(i)) for i in range(n)]
+    try:
+        # threads are enough: each one just waits on its soffice child process
+        with ThreadPoolExecutor(max_workers=n) as ex:
+            list(ex.map(pptx_to_pdf_libreoffice_many, chunks, [outdir] * n, profiles))
+    finally:
+        shutil.rmtree(run_dir, ignore_errors=True)
+
+
 def convert_all_slides_to_pdf(project_output_dir: str):
     pdf_paths = []
 
-    # Delete old PDFs
-    for file in os.listdir(project_output_dir):
-        if file.endswith(".pdf"):
-            os.remove(os.path.join(project_output_dir, file))
-
-    # Match filenames like slide_1.pptx, slide_1_title.pptx, slide_10.pptx, etc.
-    slide_files = [f for f in os.listdir(project_output_dir) if re.match(r"slide_(\d+).*\.pptx$", f)]
-    slide_files.sort(key=lambda f: int(re.match(r"slide_(\d+)", f).group(1)))
+    # One directory pass: delete old PDFs and collect slide decks
+    # (slide_1.pptx, slide_1_title.pptx, slide_10.pptx, ...; one regex match per file)
+    matches = []
+    with os.scandir(project_output_dir) as it:
+        for e in it:
+            if not e.is_file():
+                continue
+            if e.name.endswith(".pdf"):
+                os.unlink(e.path)
+            elif (m := _SLIDE_RE.match(e.name)):
+                matches.append((int(m.group(1)), e.name, e.path))
+    matches.sort(key=lambda t: t[0])
+    slide_files = [name for _, name, _ in matches]
 
-    for filename in slide_files:
-        pptx_path = os.path.join(project_output_dir, filename)
-        pdf_path = pptx_path.replace(".pptx", ".pdf")
-        pptx_to_pdf_libreoffice(pptx_path, pdf_path)
-        pdf_paths.append(pdf_path)
+    pptx_paths = [path for _, _, path in matches]
+    pptx_to_pdf_libreoffice_parallel(pptx_paths, project_output_dir)
+    for filename, pptx_path in zip(slide_files, pptx_paths):
+        pdf_paths.append(pptx_path.replace(".pptx", ".pdf"))
         print(f"✅ Converted {filename} to PDF")
 
     return pdf_paths
 
 
 def merge_pdfs(pdf_paths: list, output_pdf: str):
-    merger = PdfMerger()
-    for path in pdf_paths:
-        merger.append(path)
-    merger.write(output_pdf)
-    merger.close()
+    if pikepdf is not None:
+        with pikepdf.Pdf.new() as out:
+            sources = [pikepdf.Pdf.open(p) for p in pdf_paths]
+            try:
+                for src in sources:
+                    out.pages.extend(src.pages)
+                out.save(output_pdf, object_stream_mode=pikepdf.ObjectStreamMode.generate)
+            finally:
+                for src in sources:
+                    src.close()
+    else:
+        merger = PdfMerger()
+        for path in pdf_paths:
+            merger.append(path)
+        merger.write(output_pdf)
+        merger.close()
     print(f"📄 Merged PDF created at {output_pdf}")
 
 
@@ -1,14 +1,22 @@
 import os
 import io
-from google.oauth2.service_account import Credentials
-from googleapiclient.discovery import build
-from googleapiclient.http import MediaIoBaseDownload
+import json
+import time
+import threading
+from concurrent.futures import ThreadPoolExecutor
 from dotenv import load_dotenv
+# google-api-client imports are deferred to the functions that talk to Drive:
+# the common case (templates fresh) returns before needing them
 
 # Load credentials from .env
 load_dotenv()
 SERVICE_ACCOUNT_FILE = os.getenv("GOOGLE_SERVICE_ACCOUNT_FILE")
 SCOPES = ["https://www.googleapis.com/auth/drive.readonly"]
+# Skip the Drive round-trip entirely when every template was checked this recently
+TEMPLATE_TTL_S = int(os.getenv("TEMPLATE_TTL_S", "3600"))
+# Ignore the TTL and md5 cache and re-download every template
+FORCE_TEMPLATE_REFRESH = os.getenv("FORCE_TEMPLATE_REFRESH", "0").strip().lower() in ("1", "true", "yes", "on")
+PPTX_MIME = "application/vnd.openxmlformats-officedocument.presentationml.presentation"
 
 # Files to download: (Google Drive name → local filename)
 TEMPLATES = {
@@ -24,6 +32,7 @@ TEMPLATES = {
 }
 
 def download_file_from_drive(service, drive_filename, local_filename):
+    from googleapiclient.http import MediaIoBaseDownload
     print(f"🔍 Searching for: {drive_filename}")
     results = service.files().list(
         q=f"name='{drive_filename}' and mimeType='application/vnd.openxmlformats-officedocument.presentationml.presentation'",
@@ -49,12 +58,84 @@ def download_file_from_drive(service, drive_filename, local_filename):
 
     print(f"✅ Downloaded to: {local_filename}")
 
-def download_all_templates():
+# ---- Local cache: <template>.meta.json holds the Drive md5 and when it was last checked ----
+def _meta_path(local_filename):
+    return local_filename + ".meta.json"
+
+def _read_meta(local_filename):
+    try:
+        with open(_meta_path(local_filename)) as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return {}
+
+def _write_meta(local_filename, md5):
+    with open(_meta_path(local_filename), "w") as f:
+        json.dump({"md5": md5, "checked": time.time()}, f)
+
+def _download_by_id(service, file_id, drive_filename, local_filename):
+    from googleapiclient.http import MediaIoBaseDownload
+    request = service.files().get_media(fileId=file_id)
+    os.makedirs(os.path.dirname(local_filename), exist_ok=True)
+    with io.FileIO(local_filename, 'wb') as fh:
+        downloader = MediaIoBaseDownload(fh, request)
+        done = False
+        while not done:
+            status, done = downloader.next_chunk()
+    print(f"✅ Downloaded {drive_filename} to: {local_filename}")
+
+def download_all_templates(force: bool = False):
+    """Fetch templates that changed on Drive (md5), in parallel; no-op within TEMPLATE_TTL_S of the last check."""
+    force = force or FORCE_TEMPLATE_REFRESH
+    now = time.time()
+    metas = {local: _read_meta(local) for local in TEMPLATES.values()}
+    if not force and all(os.path.exists(l) and now - m.get("checked", 0) < TEMPLATE_TTL_S for l, m in metas.items()):
+        print("✅ Templates up to date (cached)")
+        return
+
+    from google.oauth2.service_account import Credentials
+    from googleapiclient.discovery import build
+
     creds = Credentials.from_service_account_file(SERVICE_ACCOUNT_FILE, scopes=SCOPES)
     service = build('drive', 'v3', credentials=creds)
 
+    # One list call for all templates instead of one per file
+    names = " or ".join(f"name='{n}'" for n in TEMPLATES)
+    files = service.files().list(
+        q=f"({names}) and mimeType='{PPTX_MIME}'",
+        spaces='drive',
+        fields='files(id, name, md5Checksum)',
+        pageSize=100).execute().get('files', [])
+    by_name = {}
+    for f in files:
+        by_name.setdefault(f['name'], f)  # first match, like the per-file search
+
+    todo = []
     for drive_name, local_name in TEMPLATES.items():
-        download_file_from_drive(service, drive_name, local_name)
+        f = by_name.get(drive_name)
+        if f is None:
+            print(f"❌ File not found: {drive_name}")
+            continue
+        md5 = f.get('md5Checksum')
+        if not force and os.path.exists(local_name) and md5 and metas[local_name].get("md5") == md5:
+            _write_meta(local_name, md5)  # unchanged: refresh the check time only
+            continue
+        todo.append((f['id'], drive_name, local_name, md5))
+
+    # googleapiclient services aren't thread-safe: one per worker thread
+    local = threading.local()
+
+    def _one(job):
+        file_id, drive_name, local_name, md5 = job
+        if not hasattr(local, "service"):
+            local.service = build('drive', 'v3', credentials=creds)
+        _download_by_id(local.service, file_id, drive_name, local_name)
+        _write_meta(local_name, md5)
+
+    if todo:
+        with ThreadPoolExecutor(max_workers=min(6, len(todo))) as ex:
+            list(ex.map(_one, todo))
+    print(f"✅ Templates ready ({len(todo)} downloaded, {len(TEMPLATES) - len(todo)} cached)")
 
 if __name__ == "__main__":
     download_all_templates()
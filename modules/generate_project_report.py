@@ -1,8 +1,11 @@
 # generate_project_report.py (main entrypoint)
 
 import os
+import heapq
 import shutil
+from concurrent.futures import ThreadPoolExecutor, as_completed
 from datetime import datetime
+import numpy as np
 from dotenv import load_dotenv
 from supabase import create_client, Client
 from modules.slides_exhibit import (
@@ -11,12 +14,15 @@ from modules.slides_exhibit import (
     generate_yoy_chart,
     generate_ticket_chart,
     generate_market_size_chart,
-    generate_map_chart
+    generate_map_chart,
+    apply_peerview_style,
+    _upper_median,
 )
-from modules.slides_summary import generate_summary_slide, generate_llama_summary, get_latest_period_end, generate_paginated_business_table_slides
+from modules.slides_summary import generate_summary_slide, generate_llama_summary, get_latest_period_end, format_period_end, generate_paginated_business_table_slides
 from modules.slides_admin import generate_title_slide
 from modules.convert_slides_to_pdf import convert_and_merge_slides
 from pptx import Presentation
+from modules.pptx_templates import copy_template
 
 # Constants
 REVENUE_SLIDE_TITLE = "Exhibit 1: Annual Revenue"
@@ -31,6 +37,13 @@ EXHIBIT_INTRO_TEMPLATE = "modules/downloaded_exhibit_intro_template.pptx"
 APPENDIX_INTRO_TEMPLATE = "modules/downloaded_appendix_intro_template.pptx"
 DISCLOSURES_TEMPLATE = "modules/downloaded_disclosures_template.pptx"
 OUTPUT_DIR = os.path.join(os.path.dirname(__file__), "output")
+# exhibit render threads: Agg drawing and python-pptx XML hold the GIL, so the charts don't speed each
+# other up; what overlaps is the map exhibit (waits on Chrome/Selenium) with the chart exhibits
+EXHIBIT_WORKERS = int(os.getenv("EXHIBIT_WORKERS", "2"))
+# enigma_summaries columns the report reads (charts, map, summary, appendix table) — not SELECT *
+# (the get_report_bundle SQL in README projects the same list)
+REPORT_COLUMNS = ("id, project_id, name, address, latitude, longitude, benchmark, "
+                  "annual_revenue, yoy_growth, ticket_size, search_result_id")
 
 # Load environment
 load_dotenv()
@@ -41,9 +54,59 @@ os.makedirs(OUTPUT_DIR, exist_ok=True)
 
 supabase: Client = create_client(SUPABASE_URL, SUPABASE_KEY)
 
+def _top_k(values: np.ndarray, k: int = 3) -> list:
+    # indices of sorted(..., reverse=True)[:k] (ties keep input order) in O(N log k), no full sort
+    return heapq.nlargest(k, range(len(values)), key=values.__getitem__)
+
+def _bottom_k(values: np.ndarray, k: int = 3) -> list:
+    # indices of sorted(..., reverse=True)[-k:]: scan right-to-left so ties match, then flip to descending
+    return heapq.nsmallest(k, reversed(range(len(values))), key=values.__getitem__)[::-1]
+
+def _fetch_report_bundle(supabase, project_id: str):
+    """Everything the report reads in one round trip via the get_report_bundle RPC (SQL in README).
+    Returns (summaries, project_meta, tier_lookup, end_date) or None if the function isn't installed."""
+    try:
+        bundle = supabase.rpc("get_report_bundle", {"pid": project_id}).execute().data
+    except Exception as e:
+        print(f"⚠️ get_report_bundle RPC unavailable ({e}); using table queries.")
+        return None
+    if not isinstance(bundle, dict):
+        return None
+    return (
+        bundle.get("summaries") or [],
+        bundle.get("project"),
+        bundle.get("tier_reasons") or {},
+        format_period_end(bundle.get("period_end")),
+    )
+
+def _fetch_report_rows(supabase, project_id: str):
+    """enigma_summaries + project meta + tier_reason in one PostgREST call, embedding
+    search_projects / search_results over the project_id / search_result_id FKs.
+    Returns (summaries, project_meta, tier_lookup) or None if the embed isn't available."""
+    try:
+        rows = (
+            supabase.table("enigma_summaries")
+            .select(f"{REPORT_COLUMNS}, report_project:search_projects(industry, location), report_sr:search_results(tier_reason)")
+            .eq("project_id", project_id)
+            .order("annual_revenue", desc=True)
+            .execute()
+            .data
+        ) or []
+    except Exception as e:
+        print(f"⚠️ Embedded select unavailable ({e}); using separate queries.")
+        return None
+    project_meta, tier_lookup = None, {}
+    for r in rows:
+        meta = r.pop("report_project", None)
+        sr = r.pop("report_sr", None)
+        project_meta = project_meta or meta
+        if sr and r.get("search_result_id"):
+            tier_lookup[r["search_result_id"]] = sr.get("tier_reason")
+    return rows, project_meta, tier_lookup
+
 def copy_template_slides(template_path, output_path_prefix, start_slide_num):
     output_path = f"{output_path_prefix}_{start_slide_num}.pptx"
-    shutil.copy(template_path, output_path)
+    copy_template(template_path, output_path)
     print(f"✅ Copied template file to: {output_path}")
 
 def export_project_pptx(project_id: str, supabase):
@@ -57,20 +120,37 @@ def export_project_pptx(project_id: str, supabase):
     from modules.download_templates import download_all_templates
     download_all_templates()
 
-    summaries = supabase.table("enigma_summaries").select("*").eq("project_id", project_id).execute().data
+    end_date = None
+    bundle = _fetch_report_bundle(supabase, project_id)
+    fetched = _fetch_report_rows(supabase, project_id) if bundle is None else None
+    if bundle is not None:
+        summaries, project_meta, tier_lookup, end_date = bundle
+    elif fetched is not None:
+        summaries, project_meta, tier_lookup = fetched
+    else:
+        summaries = (
+            supabase.table("enigma_summaries")
+            .select(REPORT_COLUMNS)
+            .eq("project_id", project_id)
+            .order("annual_revenue", desc=True)
+            .execute()
+            .data
+        )
+        project_meta, tier_lookup = None, None
     print(f"📊 {len(summaries)} rows found in enigma_summaries.")
     if not summaries:
         print("❌ No data found for this project.")
         return
 
-    project_meta = (
-        supabase.table("search_projects")
-        .select("industry, location")
-        .eq("id", project_id)
-        .single()
-        .execute()
-        .data
-    )
+    if project_meta is None:
+        project_meta = (
+            supabase.table("search_projects")
+            .select("industry, location")
+            .eq("id", project_id)
+            .single()
+            .execute()
+            .data
+        )
 
     if not project_meta:
         print("❌ Project metadata not found.")
@@ -89,7 +169,8 @@ def export_project_pptx(project_id: str, supabase):
 
     copy_template_slides(INTRO_TEMPLATE, os.path.join(project_output_dir, "slide_10_intro"), 0)
 
-    end_date = get_latest_period_end(supabase, project_id)
+    if end_date is None:
+        end_date = get_latest_period_end(supabase, project_id)
     trusted = [b for b in summaries if b.get("benchmark") == "trusted"]
     slide_summaries = {}
 
@@ -98,72 +179,97 @@ def export_project_pptx(project_id: str, supabase):
     from modules.slides_exhibit import build_exhibit_slide_from_template
 
     def save_slide(title, chart_func, filename, summaries, summary_text):
+        # renders the chart + builds the slide; the caller writes it. Returns (filename, ppt) or None.
         image_path = os.path.join(project_output_dir, filename.replace(".pptx", ".png"))
-        if chart_func(image_path, summaries):
-            ppt = build_exhibit_slide_from_template(
-                chart_png_path=image_path,
-                exhibit_title=title,
-                analysis_text=summary_text,
-                template_path="modules/downloaded_exhibit_template.pptx",
-            )
-            ppt.save(os.path.join(project_output_dir, filename))
-            print(f"✅ Saved {title} to: {filename}")
-
-    # Revenue
-    sorted_rev = sorted(trusted, key=lambda x: x["annual_revenue"], reverse=True)
-    top_rev = ", ".join(f"{b['name']} (${b['annual_revenue']:,.0f})" for b in sorted_rev[:3])
-    avg_rev = sum(b["annual_revenue"] for b in trusted) / len(trusted)
-    med_rev = sorted(b["annual_revenue"] for b in trusted)[len(trusted) // 2]
-    range_rev = max(b["annual_revenue"] for b in trusted) - min(b["annual_revenue"] for b in trusted)
+        if not chart_func(image_path, summaries):
+            return None
+        ppt = build_exhibit_slide_from_template(
+            chart_png_path=image_path,
+            exhibit_title=title,
+            analysis_text=summary_text,
+            template_path="modules/downloaded_exhibit_template.pptx",
+        )
+        return filename, ppt
+
+    exhibits = []
+
+    # Revenue (rows arrive ordered by annual_revenue desc, so trusted is already ranked)
+    rev = np.array([b["annual_revenue"] for b in trusted], dtype=float)
+    top_rev = ", ".join(f"{b['name']} (${b['annual_revenue']:,.0f})" for b in trusted[:3])
+    avg_rev = float(rev.mean())
+    med_rev = _upper_median(rev)
+    range_rev = float(np.ptp(rev))
     cluster_text = "tightly clustered" if range_rev < 0.2 * avg_rev else "widely spread"
     summary_revenue = f"Top: {top_rev}. Mean: ${avg_rev:,.0f}, Median: ${med_rev:,.0f}. Distribution: {cluster_text}."
     slide_summaries["revenue"] = summary_revenue
-    save_slide(REVENUE_SLIDE_TITLE, lambda path, summaries: generate_revenue_chart(path, summaries, end_date), "slide_21_revenue.pptx", summaries, summary_revenue)
+    exhibits.append((REVENUE_SLIDE_TITLE, lambda path, summaries: generate_revenue_chart(path, summaries, end_date), "slide_21_revenue.pptx", summaries, summary_revenue))
 
     # YoY Growth
-    sorted_yoy = sorted([b for b in trusted if b.get("yoy_growth") is not None], key=lambda x: x["yoy_growth"], reverse=True)
-    top_yoy = ", ".join(f"{b['name']} ({b['yoy_growth'] * 100:.1f}%)" for b in sorted_yoy[:3])
-    bottom_yoy = ", ".join(f"{b['name']} ({b['yoy_growth'] * 100:.1f}%)" for b in sorted_yoy[-3:])
-    avg_yoy = sum(b["yoy_growth"] for b in sorted_yoy) / len(sorted_yoy)
-    med_yoy = sorted(b["yoy_growth"] for b in sorted_yoy)[len(sorted_yoy) // 2]
+    with_yoy = [b for b in trusted if b.get("yoy_growth") is not None]
+    yoy = np.array([b["yoy_growth"] for b in with_yoy], dtype=float)
+    top_yoy = ", ".join(f"{with_yoy[i]['name']} ({yoy[i] * 100:.1f}%)" for i in _top_k(yoy))
+    bottom_yoy = ", ".join(f"{with_yoy[i]['name']} ({yoy[i] * 100:.1f}%)" for i in _bottom_k(yoy))
+    avg_yoy = float(yoy.mean())
+    med_yoy = _upper_median(yoy)
     summary_yoy = f"Top growth: {top_yoy}. Declines: {bottom_yoy}. Avg: {avg_yoy * 100:.1f}%, Median: {med_yoy * 100:.1f}%."
     slide_summaries["yoy"] = summary_yoy
-    save_slide(YOY_SLIDE_TITLE, lambda path, summaries: generate_yoy_chart(path, summaries, end_date), "slide_22_yoy.pptx", summaries, summary_yoy)
+    exhibits.append((YOY_SLIDE_TITLE, lambda path, summaries: generate_yoy_chart(path, summaries, end_date), "slide_22_yoy.pptx", summaries, summary_yoy))
 
     # Ticket Size
-    sorted_ticket = sorted(trusted, key=lambda x: x["ticket_size"], reverse=True)
-    top_ticket = ", ".join(f"{b['name']} (${b['ticket_size']:,.0f})" for b in sorted_ticket[:3])
-    avg_ticket = sum(b["ticket_size"] for b in sorted_ticket) / len(sorted_ticket)
-    med_ticket = sorted(b["ticket_size"] for b in sorted_ticket)[len(sorted_ticket) // 2]
+    ticket = np.array([b["ticket_size"] for b in trusted], dtype=float)
+    top_ticket = ", ".join(f"{trusted[i]['name']} (${ticket[i]:,.0f})" for i in _top_k(ticket))
+    avg_ticket = float(ticket.mean())
+    med_ticket = _upper_median(ticket)
     summary_ticket = f"Top prices: {top_ticket}. Mean: ${avg_ticket:,.0f}, Median: ${med_ticket:,.0f}."
     slide_summaries["ticket"] = summary_ticket
-    save_slide(
+    exhibits.append((
         TICKET_SLIDE_TITLE,
         lambda path, summaries: generate_ticket_chart(path, summaries, end_date),
         "slide_23_ticket.pptx",
         summaries,
         summary_ticket
-    )
+    ))
 
     # Market Size
-    trusted_total = sum(b["annual_revenue"] for b in trusted)
+    trusted_total = float(rev.sum())
     projected_total = trusted_total * 1.5
     from modules.slides_summary import get_market_size_analysis
     summary_market = get_market_size_analysis()
     slide_summaries["market"] = summary_market
-    save_slide(
+    exhibits.append((
         MARKET_SLIDE_TITLE,
         lambda path, summaries: generate_market_size_chart(path, summaries, end_date),
         "slide_24_market_size.pptx",
         summaries,
         summary_market
-    )
+    ))
 
     # Map
     map_png_path = os.path.join(project_output_dir, "slide_25_map.png")
     summary_map = f"Map of benchmark businesses around {city}, including trusted (green) and untrusted (gray) businesses."
     slide_summaries["map"] = summary_map
-    save_slide(MAP_SLIDE_TITLE, generate_map_chart, "slide_25_map.pptx", summaries, summary_map)
+    exhibits.append((MAP_SLIDE_TITLE, generate_map_chart, "slide_25_map.pptx", summaries, summary_map))
+
+    apply_peerview_style()  # set the shared rcParams before any worker reads them
+    # the LLM summary only needs the text summaries above — it waits on Ollama alongside the exhibit
+    # renders, on its own pool so an exhibit failure below doesn't wait out the LLM before raising
+    llm_pool = ThreadPoolExecutor(max_workers=1)
+    llm_future = llm_pool.submit(generate_llama_summary, dict(slide_summaries), LLM_MODEL)
+    llm_pool.shutdown(wait=False)
+    with ThreadPoolExecutor(max_workers=max(1, EXHIBIT_WORKERS)) as ex:
+        futures = {ex.submit(save_slide, *args): args[0] for args in exhibits}
+        try:
+            for fut in as_completed(futures):
+                saved = fut.result()
+                if saved:
+                    filename, ppt = saved
+                    ppt.save(os.path.join(project_output_dir, filename))
+                    print(f"✅ Saved {futures[fut]} to: {filename}")
+        except Exception:
+            for f in futures:
+                f.cancel()  # first failure: drop exhibits not yet started
+            llm_future.cancel()
+            raise
     assert os.path.exists(map_png_path), f"Expected map PNG missing: {map_png_path}"
 
     summary_stats = {
@@ -175,7 +281,7 @@ def export_project_pptx(project_id: str, supabase):
         "mean_yoy": avg_yoy * 100
     }
 
-    summary_analysis = generate_llama_summary(slide_summaries, model_name=LLM_MODEL)
+    summary_analysis = llm_future.result()
     summary_analysis = summary_analysis.replace("Pet Industry in [Location]", f"{industry} in {city}")
     summary_path = os.path.join(project_output_dir, "slide_11_market_summary.pptx")
     generate_summary_slide(
@@ -194,8 +300,13 @@ def export_project_pptx(project_id: str, supabase):
     search_ids = [b["search_result_id"] for b in trusted if b.get("search_result_id")]
     print(f"🔍 Trusted businesses with search_results_id: {len(search_ids)}")
 
-    search_rows = supabase.table("search_results").select("id, tier_reason").in_("id", search_ids).execute().data
-    tier_lookup = {r["id"]: r["tier_reason"] for r in search_rows}
+    if tier_lookup is None:
+        # batch the in.() filter so large projects don't overflow the request URL (414)
+        tier_lookup = {}
+        for i in range(0, len(search_ids), 500):
+            chunk = search_ids[i:i + 500]
+            search_rows = supabase.table("search_results").select("id, tier_reason").in_("id", chunk).execute().data
+            tier_lookup.update((r["id"], r["tier_reason"]) for r in search_rows or [])
     print(f"📝 Retrieved {len(tier_lookup)} tier_reason entries")
 
     for b in trusted:
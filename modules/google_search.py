@@ -13,11 +13,16 @@
 
 from __future__ import annotations
 
-import os, re, json, time, asyncio, traceback
+import os, re, json, time, asyncio, threading, traceback
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from dataclasses import dataclass
+from urllib.parse import urlparse
 from uuid import uuid4
 from math import cos, radians
 from typing import Any, Dict, List, Optional, Tuple, Set
 
+import numpy as np
 import streamlit as st
 import requests
 from requests.adapters import HTTPAdapter
@@ -27,6 +32,17 @@ from dotenv import load_dotenv
 from supabase import create_client, Client
 from shutil import which as _which
 
+try:  # optional: HTTP/2 client for the Places calls (pip install "httpx[http2]")
+    import httpx
+except Exception:
+    httpx = None
+
+# optional: lets pool threads write st.* messages (API warnings) into this session
+try:
+    from streamlit.runtime.scriptrunner import add_script_run_ctx, get_script_run_ctx
+except Exception:
+    add_script_run_ctx = get_script_run_ctx = None
+
 load_dotenv()
 
 # ---- Env ----
@@ -36,6 +52,18 @@ GOOGLE_API_KEY = os.getenv("GOOGLE_PLACES_API_KEY")
 OLLAMA_URL = os.getenv("OLLAMA_URL", "http://localhost:11434")
 LLM_MODEL = os.getenv("LLM_MODEL", "llama3")
 SEARCH_RADIUS_KM_DEFAULT = 5.0
+PLACES_MAX_WORKERS = int(os.getenv("PLACES_MAX_WORKERS", "16"))  # concurrent Place Details requests
+PLACES_QPS = float(os.getenv("PLACES_QPS", "10"))                # request rate cap for the batch path
+SCRAPE_MAX_WORKERS = int(os.getenv("SCRAPE_MAX_WORKERS", "16"))  # concurrent website fetches
+SCRAPE_PER_HOST = int(os.getenv("SCRAPE_PER_HOST", "2"))         # concurrent fetches per website host
+SCRAPE_MAX_BYTES = int(os.getenv("SCRAPE_MAX_BYTES", str(512 * 1024)))  # HTML read cap per site
+# Persistent details/scrape cache across runs ("" or "off" disables)
+PLACES_CACHE_PATH = os.getenv("PLACES_CACHE_PATH", os.path.join(os.path.dirname(__file__), "..", ".cache", "places_cache.sqlite"))
+PLACES_CACHE_TTL_S = int(os.getenv("PLACES_CACHE_TTL_S", str(7 * 24 * 3600)))
+# Places API (New) v1 with field masks; opt-in because the API must be enabled on the key's project
+PLACES_API_V1 = os.getenv("PLACES_API_V1", "0").strip().lower() in ("1", "true", "yes", "on")
+# Multiplex Places calls over one HTTP/2 connection (needs httpx[http2]; falls back to requests)
+PLACES_HTTP2 = os.getenv("PLACES_HTTP2", "0").strip().lower() in ("1", "true", "yes", "on")
 
 if not SUPABASE_URL or not SUPABASE_KEY:
     st.warning("Supabase credentials not set. Check SUPABASE_URL and SUPABASE_SERVICE_ROLE_KEY in your .env")
@@ -54,12 +82,61 @@ def _requests_session() -> requests.Session:
         allowed_methods=frozenset(["GET"]),
         raise_on_status=False,
     )
-    adapter = HTTPAdapter(max_retries=retry)
+    # Pool sized for the concurrent details fetch (default pool_maxsize=10 would drop connections)
+    adapter = HTTPAdapter(max_retries=retry, pool_connections=32, pool_maxsize=32)
     s.mount("https://", adapter)
     s.mount("http://", adapter)
     return s
 
-_HTTP = _requests_session()
+if httpx is not None:
+    class _RetryingTransport(httpx.HTTPTransport):
+        """Same status retry as _requests_session (GET on 429/5xx, 4 retries, backoff 1.2s * 2^n);
+        the transport's own `retries=` only covers connect errors."""
+        _STATUS = frozenset((429, 500, 502, 503, 504))
+
+        def handle_request(self, request):
+            for attempt in range(4):
+                resp = super().handle_request(request)
+                if request.method != "GET" or resp.status_code not in self._STATUS:
+                    return resp
+                resp.close()
+                time.sleep(1.2 * (2 ** attempt))
+            return super().handle_request(request)
+
+def _places_client():
+    """HTTP/2 httpx client when PLACES_HTTP2 is on and h2 is installed, else the retrying requests session.
+
+    Both expose get/post(params=, json=, headers=, timeout=) -> response with .content/.raise_for_status(),
+    and both retry GETs on 429/5xx.
+    """
+    if PLACES_HTTP2 and httpx is not None:
+        try:
+            # pool limits and http2 must be set on the transport: httpx ignores the client-level ones
+            # when a transport is passed
+            transport = _RetryingTransport(
+                http2=True, retries=3,
+                limits=httpx.Limits(max_connections=32, max_keepalive_connections=32),
+            )
+            return httpx.Client(headers={"Accept-Encoding": "gzip"}, transport=transport)
+        except ImportError:  # http2=True without the h2 package
+            pass
+    return _requests_session()
+
+_HTTP = _places_client()
+# read timeouts from either client are treated as "no results" by the sweep
+_TIMEOUT_ERRORS = (requests.exceptions.ReadTimeout,) + ((httpx.TimeoutException,) if httpx is not None else ())
+
+# ---- Shared keep-alive session for site fetches: short retry, big pool (one TCP/TLS setup per host, not per call) ----
+def _web_session() -> requests.Session:
+    s = requests.Session()
+    adapter = HTTPAdapter(pool_connections=64, pool_maxsize=64,
+                          max_retries=Retry(total=1, backoff_factor=0.2, raise_on_status=False))
+    s.mount("https://", adapter)
+    s.mount("http://", adapter)
+    s.headers.update({"User-Agent": "Mozilla/5.0", "Accept-Encoding": "gzip, deflate"})
+    return s
+
+_WEB_SESSION = _web_session()
 
 # ---- Import core helpers from phase1_lib ----
 try:
@@ -71,11 +148,16 @@ try:
         default_settings_for_industry,
         build_profile_prompt,
         ollama_generate_profile_json,
+        cached_profile_json,
+        coalesce_nearby_queries,
         validate_profile_json,
         merge_profile,
         plan_queries,
         explain_scoring_rules,
         compose_keyword,
+        freeze_settings,
+        soft_dedup_by_name_and_distance,
+        _json_loads,
     )
     _PHASE1_LIB_SRC = "modules.phase1_lib"
 except ModuleNotFoundError:
@@ -86,16 +168,38 @@ except ModuleNotFoundError:
         default_settings_for_industry,
         build_profile_prompt,
         ollama_generate_profile_json,
+        cached_profile_json,
+        coalesce_nearby_queries,
         validate_profile_json,
         merge_profile,
         plan_queries,
         explain_scoring_rules,
         compose_keyword,
+        freeze_settings,
+        soft_dedup_by_name_and_distance,
+        _json_loads,
     )
     _PHASE1_LIB_SRC = "phase1_lib"
 except Exception as e:
     raise ImportError("Error inside phase1_lib while importing core names:\n" + traceback.format_exc()) from e
 
+# ---- Optional persistent cache (details by place_id, scrapes by URL hash) ----
+try:
+    from .places_cache import PlacesCache
+except Exception:
+    try:
+        from places_cache import PlacesCache
+    except Exception:
+        PlacesCache = None
+
+_PLACES_CACHE = None
+if PlacesCache is not None and PLACES_CACHE_PATH and PLACES_CACHE_PATH.lower() != "off":
+    try:
+        _PLACES_CACHE = PlacesCache(PLACES_CACHE_PATH, ttl_s=PLACES_CACHE_TTL_S)
+    except Exception as e:
+        st.warning(f"Places cache disabled ({e})")
+        _PLACES_CACHE = None
+
 # ---- Tiering: final decision comes from this function ----
 try:
     from .Phase1_tiering import choose_tier  # (industry, audit_cand, predicted_tier) -> (final_tier, source, reason, conf, raw_json)
@@ -110,9 +214,12 @@ except Exception:
         from .phase1_lib import score_candidate, choose_tier1_threshold, assign_predicted_tier  # type: ignore
     except Exception:
         # ---- Fallback minimal scoring shim ----
-        def _text_hits(text: str, tokens: Set[str]) -> int:
-            tx = (text or "").lower()
-            return sum(1 for t in tokens if t and t.lower() in tx)
+        try:  # same substring semantics; automaton-backed when pyahocorasick is installed
+            from .Phase1_scoring import _text_hits  # type: ignore
+        except Exception:
+            def _text_hits(text: str, tokens: Set[str]) -> int:
+                tx = (text or "").lower()
+                return sum(1 for t in tokens if t and t.lower() in tx)
 
         def _schema_match_bonus(schema_types: List[str], industry: str) -> float:
             if not schema_types:
@@ -131,8 +238,10 @@ except Exception:
             score = 0.0
             reasons: Dict[str, Any] = {}
 
-            # types allow / soft-deny
-            types = set((cand.get("types") or []))
+            # types allow / soft-deny (type set frozen once per candidate)
+            types = cand.get("_types_set")
+            if types is None:
+                types = cand["_types_set"] = frozenset(cand.get("types") or ())
             allow_hit = types & settings.allow_types
             if allow_hit:
                 w = settings.weights.get("allow_types", 30.0)
@@ -143,9 +252,9 @@ except Exception:
                 score += w; reasons[f"soft_deny({int(w)})"] = sorted(deny_hit)
 
             # tokens
-            blob = " ".join([str(cand.get("page_title","")), str(cand.get("headers","")), str(cand.get("text","")), str(cand.get("name",""))])
-            pos_hits = _text_hits(blob, settings.name_positive)
-            neg_hits = _text_hits(blob, settings.name_negative)
+            blob_l = " ".join([str(cand.get("page_title","")), str(cand.get("headers","")), str(cand.get("text","")), str(cand.get("name",""))]).lower()
+            pos_hits = _text_hits(blob_l, settings.name_positive)
+            neg_hits = _text_hits(blob_l, settings.name_negative)
             if pos_hits:
                 per = settings.weights.get("name_pos", 10.0)
                 bonus = min(2, pos_hits) * per
@@ -155,13 +264,11 @@ except Exception:
                 penalty = min(2, neg_hits) * per
                 score -= penalty; reasons[f"name_neg(-{int(penalty)})"] = neg_hits
 
-            # phrase-level negatives from planner (soft)
-            blob_l = blob.lower()
-            phrase_hits = []
-            for phrase in (cand.get("exclude_phrases") or [])[:12]:
-                ph = (phrase or "").lower()
-                if ph and ph in blob_l:
-                    phrase_hits.append(phrase)
+            # phrase-level negatives from planner (soft); (phrase, lowered) pairs are built once per run
+            pairs = cand.get("_exclude_lc")
+            if pairs is None:
+                pairs = [(p, (p or "").lower()) for p in (cand.get("exclude_phrases") or [])[:12]]
+            phrase_hits = [phrase for phrase, ph in pairs if ph and ph in blob_l]
             if phrase_hits:
                 penalty_each = 3.0; max_penalty = 6.0
                 total_penalty = min(max_penalty, penalty_each * len(phrase_hits))
@@ -181,7 +288,7 @@ except Exception:
 
             # focus bonus
             focus_detail = cand.get("focus_detail")
-            if focus_detail and focus_detail.lower() in blob.lower():
+            if focus_detail and focus_detail.lower() in blob_l:
                 w = settings.weights.get("focus_bonus", 8.0)
                 score += w; reasons[f"focus(+{int(w)})"] = focus_detail
 
@@ -193,13 +300,16 @@ except Exception:
             return max(0.0, min(100.0, score)), reasons
 
         def choose_tier1_threshold(scores: List[int], threshold_candidates: List[int], floor_ratio: float, target: int) -> int:
-            if not scores:
+            if len(scores) == 0:
                 return max(65, min(threshold_candidates) if threshold_candidates else 65)
-            likely_eligible = sum(1 for s in scores if s >= 50)
+            sc = np.sort(np.asarray(scores, dtype=float))
+            # sorted once: count(scores >= t) = n - searchsorted(t, 'left'); first threshold (given order) meeting floor wins
+            likely_eligible = int(sc.size - np.searchsorted(sc, 50, side="left"))
             floor = max(1, min(target, int(round(floor_ratio * max(1, likely_eligible)))))
-            for t in threshold_candidates:
-                if sum(1 for s in scores if s >= t) >= floor:
-                    return int(t)
+            ths = np.asarray(threshold_candidates, dtype=float)
+            ok = np.flatnonzero(sc.size - np.searchsorted(sc, ths, side="left") >= floor)
+            if ok.size:
+                return int(ths[ok[0]])
             return int(min(threshold_candidates) if threshold_candidates else 55)
 
         def assign_predicted_tier(score: int, tier1_threshold: int) -> int:
@@ -207,6 +317,48 @@ except Exception:
             if score >= 50: return 2
             return 3
 
+def should_hard_exclude(place: Dict[str, Any], settings: "IndustrySettings") -> bool:
+    """Nearby hit carries a type listed in settings.hard_deny_types (empty by default: recall-first)."""
+    hard = getattr(settings, "hard_deny_types", None)
+    return bool(hard) and not hard.isdisjoint(place.get("types") or ())
+
+# ---- Prescreen: best score a Nearby hit could still reach once Details + website are known ----
+TIER3_FLOOR = 50  # assign_predicted_tier: below this is Tier-3 whatever the threshold
+
+def prescreen_upper_bound(place: Dict[str, Any], settings: "IndustrySettings") -> float:
+    """Upper bound on score_candidate from Nearby fields only (types, name, rating/reviews).
+
+    Components Nearby cannot see (website, focus, schema, page-text name hits) are
+    assumed to max out; negatives only count when already certain from the name.
+    """
+    w = settings.weights
+    types = set(place.get("types") or [])
+    ub = 0.0
+    if types & settings.allow_types:
+        ub += w.get("allow_types", 30.0)
+    if types & settings.soft_deny_types:
+        ub += w.get("soft_deny_types", -20.0)
+    ub += 2 * max(0.0, w.get("name_pos", 10.0))
+    name_l = (place.get("name") or "").lower()
+    neg = sum(1 for t in settings.name_negative if t and t.lower() in name_l)
+    ub -= min(2, neg) * abs(w.get("name_neg", -10.0))
+    ub += sum(max(0.0, w.get(k, d)) for k, d in (
+        ("website", 5.0), ("focus_bonus", 8.0), ("schema_bonus", 4.0)))
+    rating, reviews = place.get("rating"), place.get("user_ratings_total")
+    if rating is None or reviews is None or (rating >= 3.8 and reviews >= 25):
+        ub += max(0.0, w.get("rating", 5.0))
+    return ub
+
+# ---- Per-place record carried from scoring to tiering/persist (slotted: one per discovered place) ----
+@dataclass
+class ScoredPlace:
+    __slots__ = ("place", "details", "scraped", "score", "reasons")
+    place: Dict[str, Any]
+    details: Dict[str, Any]
+    scraped: Dict[str, Any]
+    score: int
+    reasons: Any
+
 # ---- small utils ----
 
 def _tokens_from_phrases(phrases):
@@ -379,7 +531,7 @@ def geocode_location(location: str) -> Tuple[float, float]:
     params = {"address": location, "key": GOOGLE_API_KEY}
     r = _HTTP.get(url, params=params, timeout=30)
     r.raise_for_status()
-    data = r.json()
+    data = _json_loads(r.content)
     results = data.get("results", [])
     if not results:
         raise ValueError(f"Unable to geocode location: {data.get('status')}")
@@ -387,22 +539,129 @@ def geocode_location(location: str) -> Tuple[float, float]:
     return float(loc["lat"]), float(loc["lng"])
 
 def generate_grid(center_lat: float, center_lng: float, max_radius_km: float, step_km: float = 2.5) -> List[Tuple[float, float]]:
-    pts: List[Tuple[float, float]] = [(center_lat, center_lng)]
+    # Square rings around the center, built as one array op: every (dx, dy) offset in the
+    # (2*steps+1)^2 block, ordered ring by ring (center first), dx-major within a ring.
     steps = int(max_radius_km / step_km)
     dlat = step_km / 110.574
     dlng = step_km / (111.320 * max(1e-9, cos(radians(center_lat))))
-    seen = {(center_lat, center_lng)}
-    for ring in range(1, steps + 1):
-        for dx in range(-ring, ring + 1):
-            for dy in range(-ring, ring + 1):
-                if abs(dx) != ring and abs(dy) != ring: continue
-                lat = center_lat + dy * dlat
-                lng = center_lng + dx * dlng
-                if (lat, lng) not in seen:
-                    pts.append((lat, lng)); seen.add((lat, lng))
-    return pts
+    idx = np.arange(-steps, steps + 1)
+    dx, dy = (a.ravel() for a in np.meshgrid(idx, idx, indexing="ij"))
+    order = np.argsort(np.maximum(np.abs(dx), np.abs(dy)), kind="stable")
+    lats = center_lat + dy[order] * dlat
+    lngs = center_lng + dx[order] * dlng
+    return list(dict.fromkeys(zip(lats.tolist(), lngs.tolist())))
+
+# ---- Places API (New) v1: field-masked responses mapped back to the legacy dict shape ----
+_V1_BASE = "https://places.googleapis.com/v1"
+_V1_DETAIL_FIELDS = (
+    "id,displayName,location,shortFormattedAddress,types,websiteUri,regularOpeningHours,"
+    "rating,userRatingCount,nationalPhoneNumber,editorialSummary,addressComponents"
+)
+# Search returns everything Phase-1 reads from Details, so v1 candidates skip the Details round-trip
+_V1_SEARCH_MASK = ",".join(f"places.{f}" for f in _V1_DETAIL_FIELDS.split(",")) + ",nextPageToken"
+
+
+def _v1_headers(field_mask: str) -> Dict[str, str]:
+    return {"X-Goog-Api-Key": GOOGLE_API_KEY or "", "X-Goog-FieldMask": field_mask}
+
+
+def _v1_to_legacy(p: Dict[str, Any]) -> Dict[str, Any]:
+    """Map a v1 Place resource onto the legacy search/details keys used throughout Phase-1."""
+    loc = p.get("location") or {}
+    periods = []
+    for per in ((p.get("regularOpeningHours") or {}).get("periods") or []):
+        out = {}
+        for side in ("open", "close"):
+            x = per.get(side)
+            if x:
+                out[side] = {"day": x.get("day"), "time": f"{int(x.get('hour', 0)):02d}{int(x.get('minute', 0)):02d}"}
+        periods.append(out)
+    return {
+        "place_id": p.get("id"),
+        "name": (p.get("displayName") or {}).get("text", ""),
+        "geometry": {"location": {"lat": loc.get("latitude"), "lng": loc.get("longitude")}},
+        "vicinity": p.get("shortFormattedAddress", ""),
+        "types": p.get("types", []) or [],
+        "website": p.get("websiteUri", ""),
+        "rating": p.get("rating"),
+        "user_ratings_total": p.get("userRatingCount"),
+        "formatted_phone_number": p.get("nationalPhoneNumber"),
+        "editorial_summary": {"overview": (p.get("editorialSummary") or {}).get("text", "")},
+        "opening_hours": {"periods": periods},
+        "address_components": [
+            {"long_name": c.get("longText"), "short_name": c.get("shortText"), "types": c.get("types", [])}
+            for c in (p.get("addressComponents") or [])
+        ],
+        "_v1_inline": True,
+    }
+
+
+def _google_text_search_v1(keyword: str, lat: float, lng: float, radius_km: float, type_hint: Optional[str] = None) -> List[Dict[str, Any]]:
+    # searchNearby has no keyword parameter; searchText with a circular location bias is the v1 equivalent
+    body: Dict[str, Any] = {
+        "textQuery": keyword, "pageSize": 20,
+        "locationBias": {"circle": {"center": {"latitude": lat, "longitude": lng}, "radius": min(50000.0, radius_km * 1000)}},
+    }
+    if type_hint: body["includedType"] = type_hint
+    all_results: List[Dict[str, Any]] = []
+    for _ in range(3):
+        r = _HTTP.post(f"{_V1_BASE}/places:searchText", json=body, headers=_v1_headers(_V1_SEARCH_MASK), timeout=30)
+        data = _json_loads(r.content)
+        _check_quota(r.status_code, (data.get("error") or {}).get("status"))
+        if "error" in data:
+            st.warning(f"Google API warning: {(data['error'] or {}).get('message')}")
+            break
+        all_results.extend(_v1_to_legacy(p) for p in (data.get("places") or []))
+        token = data.get("nextPageToken")
+        if not token:
+            break
+        body["pageToken"] = token  # v1 tokens are usable immediately (no 2s wait)
+    return all_results
+
+
+def _place_details_v1(place_id: str) -> Dict[str, Any]:
+    r = _HTTP.get(f"{_V1_BASE}/places/{place_id}", headers=_v1_headers(_V1_DETAIL_FIELDS), timeout=30)
+    data = _json_loads(r.content)
+    _check_quota(r.status_code, (data.get("error") or {}).get("status"))
+    return {} if (not data or "error" in data) else _v1_to_legacy(data)
+
+
+# ---- In-process memo of Nearby results: repeated (point, radius, keyword) requests within the TTL
+# (reruns of the same project, overlapping sweeps) skip the HTTP round-trips and page-token waits ----
+_NEARBY_MEMO: "OrderedDict[Tuple, Tuple[float, List[Dict[str, Any]]]]" = OrderedDict()
+_NEARBY_MEMO_MAX = 4096
+_NEARBY_MEMO_TTL_S = 3600.0
+_NEARBY_MEMO_LOCK = threading.Lock()
+
 
 def google_nearby_search(keyword: str, lat: float, lng: float, radius_km: float, type_hint: Optional[str] = None) -> List[Dict[str, Any]]:
+    key = (PLACES_API_V1, (keyword or "").strip().lower(), round(lat, 4), round(lng, 4), int(radius_km * 1000), type_hint or "")
+    now = time.monotonic()
+    with _NEARBY_MEMO_LOCK:
+        hit = _NEARBY_MEMO.get(key)
+        if hit is not None and now - hit[0] < _NEARBY_MEMO_TTL_S:
+            _NEARBY_MEMO.move_to_end(key)
+            return list(hit[1])
+    # second tier: on-disk cache shared across runs (re-runs with the same centre cost no quota)
+    disk_key = json.dumps(key)
+    results = _PLACES_CACHE.get_nearby(disk_key) if _PLACES_CACHE is not None else None
+    if results is None:
+        results = _google_nearby_search_live(keyword, lat, lng, radius_km, type_hint=type_hint)
+        if not results:
+            return results  # empty may be a transient API error; don't pin it for the TTL
+        if _PLACES_CACHE is not None:
+            _PLACES_CACHE.put_nearby(disk_key, results)
+    with _NEARBY_MEMO_LOCK:
+        _NEARBY_MEMO[key] = (now, results)
+        _NEARBY_MEMO.move_to_end(key)
+        while len(_NEARBY_MEMO) > _NEARBY_MEMO_MAX:
+            _NEARBY_MEMO.popitem(last=False)
+    return list(results)
+
+
+def _google_nearby_search_live(keyword: str, lat: float, lng: float, radius_km: float, type_hint: Optional[str] = None) -> List[Dict[str, Any]]:
+    if PLACES_API_V1:
+        return _google_text_search_v1(keyword, lat, lng, radius_km, type_hint=type_hint)
     url = "https://maps.googleapis.com/maps/api/place/nearbysearch/json"
     params: Dict[str, Any] = {"location": f"{lat},{lng}", "radius": int(radius_km * 1000), "keyword": keyword, "key": GOOGLE_API_KEY}
     if type_hint: params["type"] = type_hint
@@ -410,7 +669,8 @@ def google_nearby_search(keyword: str, lat: float, lng: float, radius_km: float,
     page_count = 0
     while True:
         r = _HTTP.get(url, params=params, timeout=30)
-        data = r.json()
+        data = _json_loads(r.content)
+        _check_quota(r.status_code, data.get("status"))
         if "error_message" in data:
             st.warning(f"Google API warning: {data['error_message']}")
             break
@@ -431,11 +691,147 @@ def get_place_details(place_id: str) -> Dict[str, Any]:
         "place_id": place_id, "key": GOOGLE_API_KEY,
         "fields": "address_components,types,formatted_phone_number,opening_hours,editorial_summary,website,rating,user_ratings_total",
     }
+    if _PLACES_CACHE is not None:
+        hit = _PLACES_CACHE.get_details(place_id)
+        if hit is not None:
+            return hit
     try:
-        r = _HTTP.get(url, params=params, timeout=30)
-        return r.json().get("result", {}) or {}
+        if PLACES_API_V1:
+            result = _place_details_v1(place_id)
+        else:
+            r = _HTTP.get(url, params=params, timeout=30)
+            data = _json_loads(r.content)
+            _check_quota(r.status_code, data.get("status"))
+            result = data.get("result", {}) or {}
     except Exception:
         return {}
+    if result and _PLACES_CACHE is not None:
+        _PLACES_CACHE.put_details(place_id, result)
+    return result
+
+# ---- Quota pressure: any 429 / OVER_QUERY_LIMIT halves every limiter's rate, ramping back over the window ----
+_QUOTA_BACKOFF_S = 30.0
+_QUOTA_STATUSES = {"OVER_QUERY_LIMIT", "RESOURCE_EXHAUSTED"}
+_quota_hit_at = -1e9  # monotonic time of the last quota response (single float write; no lock needed)
+
+
+def _check_quota(status_code: int, api_status: Optional[str]) -> None:
+    global _quota_hit_at
+    if status_code == 429 or api_status in _QUOTA_STATUSES:
+        _quota_hit_at = time.monotonic()
+
+
+class _RateLimiter:
+    """Token bucket shared by worker threads: at most `rate` acquisitions/sec (burst = rate).
+
+    Adaptive: after a quota response the effective rate drops to half and climbs linearly
+    back to `rate` over _QUOTA_BACKOFF_S, so PLACES_QPS can sit near the real API ceiling.
+    """
+
+    def __init__(self, rate: float):
+        self.rate = max(0.1, float(rate))
+        self.tokens = self.rate
+        self.stamp = time.monotonic()
+        self.lock = threading.Lock()
+
+    def _rate_at(self, now: float) -> float:
+        since = now - _quota_hit_at
+        if since >= _QUOTA_BACKOFF_S:
+            return self.rate
+        return self.rate * (0.5 + 0.5 * since / _QUOTA_BACKOFF_S)
+
+    def acquire(self) -> None:
+        while True:
+            with self.lock:
+                now = time.monotonic()
+                rate = self._rate_at(now)
+                self.tokens = min(rate, self.tokens + (now - self.stamp) * rate)
+                self.stamp = now
+                if self.tokens >= 1.0:
+                    self.tokens -= 1.0
+                    return
+                wait = (1.0 - self.tokens) / rate
+            time.sleep(wait)
+
+def get_place_details_batch(place_ids: List[str], max_workers: int = PLACES_MAX_WORKERS) -> Dict[str, Dict[str, Any]]:
+    """Fetch Place Details for many ids concurrently (I/O-bound; shares the _HTTP pool).
+
+    Ids already in the places cache are resolved up front; the rest are paced by a token
+    bucket at PLACES_QPS. Returns {place_id: details}; failures map to {} just like
+    get_place_details.
+    """
+    ids = list(dict.fromkeys(pid for pid in place_ids if pid))
+    out: Dict[str, Dict[str, Any]] = {}
+    if _PLACES_CACHE is not None and ids:
+        # ids seen in earlier runs come back in one query; only the misses hit the pool/limiter
+        out.update(_PLACES_CACHE.get_details_many(ids))
+        ids = [pid for pid in ids if pid not in out]
+    if not ids:
+        return out
+    limiter = _RateLimiter(PLACES_QPS)
+
+    def _one(pid: str) -> Dict[str, Any]:
+        limiter.acquire()
+        return get_place_details(pid)
+
+    with ThreadPoolExecutor(max_workers=max(1, min(int(max_workers), len(ids)))) as ex:
+        futs = {ex.submit(_one, pid): pid for pid in ids}
+        for f in as_completed(futs):
+            try:
+                out[futs[f]] = f.result() or {}
+            except Exception:
+                out[futs[f]] = {}
+    return out
+
+def _with_script_ctx(fn):
+    """Wrap fn so st.warning/st.error from a pool thread land in the current session."""
+    ctx = get_script_run_ctx() if get_script_run_ctx else None
+
+    def _run(*args, **kwargs):
+        if ctx is not None:
+            add_script_run_ctx(threading.current_thread(), ctx)
+        return fn(*args, **kwargs)
+    return _run
+
+def sweep_nearby(pts: List[Tuple[float, float]], keywords: List[str], radius_km: float, stop_after: int,
+                 max_workers: int = PLACES_MAX_WORKERS, on_progress=None) -> Dict[str, Dict[str, Any]]:
+    """Run the grid x keyword Nearby sweep concurrently (token bucket at PLACES_QPS).
+
+    All requests are queued on the pool up front, so a node waiting out its page-token delay never
+    holds up the others; results are merged in (node, keyword) order, so first-seen wins exactly as in
+    the sequential loop. Once stop_after unique places are in, requests not yet started are cancelled.
+    on_progress(done, total) reports merged requests. Identical requests (same ~11 m point and keyword)
+    are coalesced before dispatch.
+    """
+    found: Dict[str, Dict[str, Any]] = {}
+    if not pts or not keywords:
+        return found
+    queries, _ = coalesce_nearby_queries(pts, [int(radius_km * 1000)], keywords)
+    limiter = _RateLimiter(PLACES_QPS)
+
+    def _one(lat: float, lng: float, radius_m: int, kw: str) -> List[Dict[str, Any]]:
+        limiter.acquire()
+        try:
+            return google_nearby_search(kw, lat, lng, radius_m / 1000.0, type_hint=None)  # no type filter
+        except _TIMEOUT_ERRORS:
+            return []  # continue on timeouts
+
+    report_every = max(1, len(keywords))
+    with ThreadPoolExecutor(max_workers=max(1, int(max_workers))) as ex:
+        run = _with_script_ctx(_one)  # API errors (bad key, REQUEST_DENIED, quota) still reach the page
+        futs = [ex.submit(run, *q) for q in queries]
+        for i, f in enumerate(futs, start=1):
+            for r in f.result():
+                pid = r.get("place_id")
+                if pid:
+                    found.setdefault(pid, r)  # first sighting wins; one probe instead of `in` + store
+            if on_progress is not None and (i % report_every == 0 or i == len(futs)):
+                on_progress(i, len(futs))
+            if len(found) >= stop_after:
+                for g in futs[i:]:
+                    g.cancel()
+                break
+    return found
 
 # -------------------------------------------------------------
 # Web scraping (safe & bounded)
@@ -466,12 +862,34 @@ def _extract_schema_types_ldjson(soup: BeautifulSoup) -> List[str]:
 
 def scrape_site(url: str) -> Dict[str, Any]:
     if not url: return {}
-    try:
-        headers = {"User-Agent": "Mozilla/5.0"}
-        r = _HTTP.get(url, headers=headers, timeout=8)
+    if _PLACES_CACHE is not None:
+        hit = _PLACES_CACHE.get_web(url)
+        if hit is not None:
+            return hit
+    scraped = _scrape_site_live(url)
+    if scraped and _PLACES_CACHE is not None:
+        _PLACES_CACHE.put_web(url, scraped)
+    return scraped
+
+def _fetch_html(url: str, max_bytes: int = SCRAPE_MAX_BYTES):
+    """Stream at most max_bytes of an HTML page; None for non-HTML (checked before any body read)."""
+    with _WEB_SESSION.get(url, timeout=8, stream=True) as r:
         ctype = (r.headers.get("Content-Type") or "").lower()
-        if "text/html" not in ctype: return {}
-        soup = BeautifulSoup(r.text, "html.parser")
+        if "text/html" not in ctype:
+            return None
+        buf = bytearray()
+        for chunk in r.iter_content(16384):
+            buf.extend(chunk)
+            if len(buf) >= max_bytes:
+                break
+        # Decode once, on the truncated buffer; without a declared charset let bs4 sniff the bytes
+        return bytes(buf[:max_bytes]).decode(r.encoding, errors="replace") if r.encoding else bytes(buf[:max_bytes])
+
+def _scrape_site_live(url: str) -> Dict[str, Any]:
+    try:
+        html = _fetch_html(url)
+        if html is None: return {}
+        soup = BeautifulSoup(html, "html.parser")
         page_title = soup.title.string if soup.title else ""
         meta_desc = (soup.find("meta", attrs={"name": "description"}) or {}).get("content", "") or ""
         headers_text = " ".join(h.get_text(strip=True) for h in soup.find_all(re.compile("h[1-3]")))[:2000]
@@ -487,6 +905,32 @@ def scrape_site(url: str) -> Dict[str, Any]:
     except Exception:
         return {}
 
+def scrape_sites_batch(urls: List[str], max_workers: int = SCRAPE_MAX_WORKERS) -> Dict[str, Dict[str, Any]]:
+    """scrape_site over many URLs concurrently; returns {url: scraped} ({} on failure).
+
+    Wall-clock is bounded by the slowest site per worker rather than the sum of all fetches;
+    workers share _WEB_SESSION's connection pool and a host never sees more than
+    SCRAPE_PER_HOST requests at once (shared hosting / multi-location chains).
+    """
+    todo = list(dict.fromkeys(u for u in urls if u))
+    out: Dict[str, Dict[str, Any]] = {}
+    if not todo:
+        return out
+    gates = {h: threading.Semaphore(SCRAPE_PER_HOST) for h in {urlparse(u).netloc.lower() for u in todo}}
+
+    def _one(u: str) -> Dict[str, Any]:
+        with gates[urlparse(u).netloc.lower()]:
+            return scrape_site(u)
+
+    with ThreadPoolExecutor(max_workers=max(1, min(int(max_workers), len(todo)))) as ex:
+        futs = {ex.submit(_one, u): u for u in todo}
+        for f in as_completed(futs):
+            try:
+                out[futs[f]] = f.result() or {}
+            except Exception:
+                out[futs[f]] = {}
+    return out
+
 # -------------------------------------------------------------
 # Profile builder + persistence + preview gate
 # -------------------------------------------------------------
@@ -502,7 +946,7 @@ def _finalize_profile(project: Dict[str, Any]) -> Tuple["IndustrySettings", Dict
 
     if use_llm_profile:
         prompt = build_profile_prompt(industry, location, KNOWN_TYPES)
-        prof_raw = ollama_generate_profile_json(LLM_MODEL, OLLAMA_URL, prompt, temperature=0.2)
+        prof_raw = cached_profile_json(LLM_MODEL, OLLAMA_URL, industry, location, prompt, temperature=0.2)
         prof = validate_profile_json(prof_raw or {}, KNOWN_TYPES)
         if prof:
             settings = merge_profile(settings, prof)
@@ -521,6 +965,7 @@ def _finalize_profile(project: Dict[str, Any]) -> Tuple["IndustrySettings", Dict
     derived_pos = {t for t in topic_tokens if t in {"simulator", "indoor", "studio", "lounge", "bay", "suite"}}
     settings.name_positive = base_pos | derived_pos
     settings.name_negative = set(getattr(settings, "name_negative", set()) or set())
+    freeze_settings(settings)
 
     profile_json = {
         "type_hint": type_hint, "keyword": keyword,
@@ -662,42 +1107,68 @@ def search_and_expand(project: dict) -> bool:
 
     # Sanitize types so scoring doesn't award wrong categories
     type_hint = _sanitize_types_against_keywords(settings, kw_list, project.get("industry", ""))
+    freeze_settings(settings)
 
     oversample_factor = float(project.get("oversample_factor", 2.0))
     stop_after = int(max(target, 1) * oversample_factor)
 
     pts = generate_grid(center_lat, center_lng, max_radius_km, step_km=grid_step_km)
-    found: Dict[str, Dict[str, Any]] = {}
     prog = st.progress(0.0, text="Collecting businesses from Google…")
-
-    for i, (lat, lng) in enumerate(pts):
-        prog.progress(i / max(1, len(pts)), text=f"Searching at ({lat:.4f}, {lng:.4f})")
-        for k in kw_list:
-            # Excludes are NOT used to filter queries (recall-first)
-            try:
-                results = google_nearby_search(k, lat, lng, radius_km, type_hint=None)  # no type filter
-            except requests.exceptions.ReadTimeout:
-                # continue on timeouts
-                continue
-            for r in results:
-                pid = r.get("place_id")
-                if pid and pid not in found:
-                    found[pid] = r
-            if len(found) >= stop_after:
-                break
-        if len(found) >= stop_after:
-            break
-
+    # Excludes are NOT used to filter queries (recall-first)
+    found = sweep_nearby(
+        pts, kw_list, radius_km, stop_after,
+        on_progress=lambda done, total: prog.progress(done / max(1, total), text=f"Nearby searches {done}/{total}"),
+    )
     prog.empty()
 
+    # Optional: same-name listings a few meters apart (duplicate Places entries) collapse to one
+    # (project "soft_dedup_m", e.g. 150; off by default so discovery output is unchanged)
+    dedup_m = float(project.get("soft_dedup_m") or 0)
+    if dedup_m > 0:
+        fuzzy = project.get("soft_dedup_fuzzy")  # e.g. 90: also merge near-identical names (off by default)
+        kept = soft_dedup_by_name_and_distance(list(found.values()), radius_m=dedup_m,
+                                               fuzzy_cutoff=float(fuzzy) if fuzzy else None)
+        found = {p["place_id"]: p for p in kept}
+
+    # Hard type excludes (project "hard_deny_types" / settings) are pushed down before any Details call
+    hard = set(getattr(settings, "hard_deny_types", None) or ()) | set(project.get("hard_deny_types") or ())
+    if hard:
+        settings.hard_deny_types = frozenset(hard)
+        dropped = [pid for pid, p in found.items() if should_hard_exclude(p, settings)]
+        for pid in dropped:
+            del found[pid]
+        if dropped:
+            st.caption(f"Excluded {len(dropped)} listings by hard-deny types before fetching details")
+
     # scoring (ranking within tiers)
     st.write(f"Scoring + classifying {len(found)} unique businesses…")
-    scored_list: List[Dict[str, Any]] = []
+    scored_list: List[ScoredPlace] = []
+    # Optional: hits that cannot leave Tier-3 even with every Details/website bonus skip both fetches
+    # (still scored and saved from their Nearby fields)
+    skip_ids: Set[str] = set()
+    if bool(project.get("prescreen_details", False)):
+        skip_ids = {pid for pid, p in found.items() if prescreen_upper_bound(p, settings) < TIER3_FLOOR}
+        if skip_ids:
+            st.caption(f"Prescreen: skipping details/website for {len(skip_ids)} low-ceiling listings")
+    with st.spinner(f"Fetching place details for {len(found) - len(skip_ids)} businesses…"):
+        # v1 search results already carry the Details fields (field mask), only fetch the rest
+        details_by_id = {pid: p for pid, p in found.items() if p.get("_v1_inline")}
+        details_by_id.update(get_place_details_batch(
+            [pid for pid in found if pid not in details_by_id and pid not in skip_ids]))
+    websites = {
+        pid: (details_by_id.get(pid, {}).get("website") or place.get("website") or "")
+        for pid, place in found.items()
+    }
+    with st.spinner("Reading business websites…"):
+        # prescreened rows keep their inline website flag but skip the site fetch
+        scraped_by_url = scrape_sites_batch([u for pid, u in websites.items() if pid not in skip_ids])
+    exclude_phrases = list(exclude_kw)
+    exclude_lc = tuple((p, (p or "").lower()) for p in exclude_phrases[:12])  # lowered once, not per candidate
     for place in found.values():
         place_id = place.get("place_id")
-        details = get_place_details(place_id)
-        website = details.get("website") or place.get("website") or ""
-        scraped = scrape_site(website) if website else {}
+        details = details_by_id.get(place_id, {})
+        website = websites.get(place_id, "")
+        scraped = scraped_by_url.get(website, {}) if website else {}
 
         cand = {
             "name": place.get("name", ""),
@@ -705,7 +1176,6 @@ def search_and_expand(project: dict) -> bool:
             "website": bool(website),
             "rating": details.get("rating"),
             "user_ratings_total": details.get("user_ratings_total"),
-            "hour_open": (details.get("opening_hours", {}) or {}).get("periods", []),
             "page_title": scraped.get("page_title", ""),
             "headers": scraped.get("headers", ""),
             "text": scraped.get("visible_text_blocks", ""),
@@ -713,29 +1183,34 @@ def search_and_expand(project: dict) -> bool:
             "focus_detail": profile_json.get("focus_detail"),
             "focus_strict": profile_json.get("focus_strict"),
             "industry": project.get("industry", ""),
-            "exclude_phrases": list(exclude_kw),  # soft phrase-level negatives in shim
+            "exclude_phrases": exclude_phrases,  # soft phrase-level negatives in shim
+            "_exclude_lc": exclude_lc,
         }
         score, reasons = score_candidate(cand, settings)
-        scored_list.append({
-            "place": place, "details": details, "scraped": scraped,
-            "score": int(round(score)), "reasons": reasons,
-        })
+        scored_list.append(ScoredPlace(place, details, scraped, int(round(score)), reasons))
 
     # dynamic threshold & predicted tier (used as context/fallback only)
-    scores_only = [row["score"] for row in scored_list]
+    scores_only = np.fromiter((row.score for row in scored_list), dtype=np.int32, count=len(scored_list))
     threshold_candidates = settings.threshold_candidates or [80, 75, 70, 65, 60, 55]
     tier1_threshold = choose_tier1_threshold(
         scores_only, threshold_candidates=threshold_candidates,
         floor_ratio=settings.floor_ratio, target=target,
     )
+    # predicted tier for every row in one column op (same cut-offs as assign_predicted_tier)
+    tiers_arr = np.where(scores_only >= tier1_threshold, 1, np.where(scores_only >= 50, 2, 3)).astype(np.int8)
+    # process best-first (tier asc, score desc) so partial runs persist the strongest rows;
+    # lexsort over the two columns instead of a per-row Python sort key
+    order = np.lexsort((-scores_only, tiers_arr)).tolist()
+    predicted_tiers = tiers_arr.tolist()
 
     # choose_tier + persist
     async def _process():
         prog2 = st.progress(0.0, text="Choosing tiers and saving…")
         total = max(1, len(scored_list))
-        for i, row in enumerate(scored_list):
-            place = row["place"]; details = row["details"]; scraped = row["scraped"]
-            score = row["score"]
+        for n, i in enumerate(order):
+            row = scored_list[i]
+            place = row.place; details = row.details; scraped = row.scraped
+            score = row.score
 
             # base attributes
             lat = place.get("geometry", {}).get("location", {}).get("lat")
@@ -745,7 +1220,7 @@ def search_and_expand(project: dict) -> bool:
             address = place.get("vicinity", "")
 
             # predicted tier from numeric (context for LLM; not final)
-            predicted_tier = assign_predicted_tier(score, tier1_threshold)
+            predicted_tier = predicted_tiers[i]
 
             # compact candidate for audit/tiering
             audit_cand = {
@@ -794,7 +1269,7 @@ def search_and_expand(project: dict) -> bool:
                 "category": "",
                 "page_title": scraped.get("page_title", ""),
                 "eligibility_score": score,  # ranking within tier
-                "score_reasons": json.dumps(row["reasons"]) if not isinstance(row["reasons"], str) else row["reasons"],
+                "score_reasons": json.dumps(row.reasons) if not isinstance(row.reasons, str) else row.reasons,
                 "tier": final_tier,
                 "tier_reason": tier_reason,          # short, human-readable reason
                 "tier_source": tier_source,          # "llm_override" / "gpt4" / "numeric" depending on choose_tier impl
@@ -806,7 +1281,7 @@ def search_and_expand(project: dict) -> bool:
             }
 
             _upsert_result(row_out)
-            prog2.progress((i + 1) / total, text=f"Processed {i + 1} of {total}")
+            prog2.progress((n + 1) / total, text=f"Processed {n + 1} of {total}")
         prog2.empty()
 
     asyncio.run(_process())
@@ -0,0 +1,51 @@
+# ================================
+# FILE: modules/llm_cache.py
+# PURPOSE: On-disk cache for local LLM completions (report summaries)
+# - one <sha256>.txt per completion under LLM_CACHE_DIR (default .cache/llm; "off" disables)
+# - key covers the model name + the full prompt inputs, so any change misses
+# ================================
+
+from __future__ import annotations
+
+import os
+import json
+import hashlib
+from typing import Any, Optional
+
+LLM_CACHE_DIR = os.getenv("LLM_CACHE_DIR", os.path.join(os.path.dirname(__file__), "..", ".cache", "llm"))
+
+
+def enabled() -> bool:
+    return bool(LLM_CACHE_DIR) and LLM_CACHE_DIR.lower() != "off"
+
+
+def cache_key(model_name: str, inputs: Any) -> str:
+    payload = json.dumps({"m": model_name, "s": inputs}, sort_keys=True, ensure_ascii=False)
+    return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+
+def _path(key: str) -> str:
+    return os.path.join(LLM_CACHE_DIR, f"{key}.txt")
+
+
+def get(key: str) -> Optional[str]:
+    if not enabled():
+        return None
+    try:
+        with open(_path(key), "r", encoding="utf-8") as f:
+            return f.read()
+    except OSError:
+        return None
+
+
+def put(key: str, value: str) -> None:
+    if not enabled() or not value:
+        return
+    try:
+        os.makedirs(LLM_CACHE_DIR, exist_ok=True)
+        tmp = _path(key) + f".{os.getpid()}.tmp"
+        with open(tmp, "w", encoding="utf-8") as f:
+            f.write(value)
+        os.replace(tmp, _path(key))  # atomic: readers never see a partial file
+    except OSError:
+        pass
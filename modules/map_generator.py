@@ -3,28 +3,218 @@
 
 from __future__ import annotations
 
+import atexit
+import base64
 import math
 import os
+import threading
 import time
+import multiprocessing as mp
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
 from dataclasses import dataclass
-from typing import Iterable, Tuple, Optional
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Dict, Iterable, List, Tuple, Optional
 from string import Template
 
+import numpy as np
 import pandas as pd
+import requests
+from requests.adapters import HTTPAdapter
 import folium
-from branca.element import Element
-from geopy.distance import geodesic
+from branca.element import Element, MacroElement
+from jinja2 import Template as JinjaTemplate
+
+try:  # optional: fused, parallel farthest-point kernel for very large marker sets
+    from numba import njit, prange  # type: ignore
+except Exception:
+    njit = prange = None
 
 from selenium import webdriver
 from selenium.webdriver.chrome.options import Options
-from selenium.common.exceptions import JavascriptException
+from selenium.common.exceptions import JavascriptException, TimeoutException, WebDriverException
 from selenium.webdriver.common.by import By
 
 POSI_TILE_URL = "https://{s}.basemaps.cartocdn.com/light_all/{z}/{x}/{y}{r}.png"
 POSI_TILE_ATTR = "© OpenStreetMap contributors © CARTO"
 WINDOW_DEFAULT = (1200, 800)
 TILE_WAIT_HARD_TIMEOUT_SEC = 12.0
-TILE_POLL_INTERVAL_SEC = 0.25
+EARTH_RADIUS_KM = 6371.0088
+# On-disk z/x/y tile cache served to headless Chrome, so repeat renders skip tile RTTs ("" or "off" disables)
+TILE_CACHE_DIR = os.getenv("MAP_TILE_CACHE_DIR", os.path.join(os.path.dirname(__file__), "..", ".cache", "tiles"))
+_TILE_UPSTREAM = "https://{s}.basemaps.cartocdn.com/light_all/{z}/{x}/{y}.png"
+
+
+# ---- Local tile cache proxy (renders only; interactive maps keep the CDN URL) ----
+_tile_server: Optional[ThreadingHTTPServer] = None
+_tile_lock = threading.Lock()
+_tile_http = requests.Session()
+_tile_http.mount("https://", HTTPAdapter(pool_connections=4, pool_maxsize=8))  # ~browser per-host concurrency
+
+
+def _tile_bytes(z: int, x: int, y: int) -> Optional[bytes]:
+    """PNG for one tile: disk hit, else fetch from CARTO and store (atomic rename)."""
+    path = os.path.join(TILE_CACHE_DIR, str(z), str(x), f"{y}.png")
+    if os.path.exists(path):
+        with open(path, "rb") as f:
+            return f.read()
+    url = _TILE_UPSTREAM.format(s="abcd"[(x + y) % 4], z=z, x=x, y=y)
+    try:
+        r = _tile_http.get(url, timeout=10)
+    except Exception:
+        return None
+    if r.status_code != 200:
+        return None
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    tmp = f"{path}.{threading.get_ident()}.tmp"
+    with open(tmp, "wb") as f:
+        f.write(r.content)
+    os.replace(tmp, path)
+    return r.content
+
+
+class _TileHandler(BaseHTTPRequestHandler):
+    def do_GET(self):
+        parts = self.path.strip("/").split("/")
+        try:
+            z, x, y = int(parts[0]), int(parts[1]), int(parts[2].split(".")[0])
+        except (IndexError, ValueError):
+            self.send_error(404)
+            return
+        body = _tile_bytes(z, x, y)
+        if body is None:
+            self.send_error(502)
+            return
+        self.send_response(200)
+        self.send_header("Content-Type", "image/png")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, *args):  # quiet
+        pass
+
+
+def local_tile_url() -> str:
+    """Leaflet URL template for the cached tile proxy, starting it on first use.
+    Falls back to the CDN URL when the cache is disabled."""
+    global _tile_server
+    if not TILE_CACHE_DIR or TILE_CACHE_DIR.lower() == "off":
+        return POSI_TILE_URL
+    with _tile_lock:
+        if _tile_server is None:
+            _tile_server = ThreadingHTTPServer(("127.0.0.1", 0), _TileHandler)
+            _tile_server.daemon_threads = True
+            threading.Thread(target=_tile_server.serve_forever, daemon=True).start()
+        port = _tile_server.server_address[1]
+    return f"http://127.0.0.1:{port}/{{z}}/{{x}}/{{y}}.png"
+
+
+def local_render_copy(html_path: str) -> str:
+    """Sibling copy of a saved map HTML with the CDN tile URL pointed at local_tile_url(), for the
+    screenshot only: the saved .html keeps CDN tiles so it still renders after this process exits.
+    Returns html_path itself when the tile cache is off; callers remove any other path when done."""
+    local = local_tile_url()
+    if local == POSI_TILE_URL:
+        return html_path
+    with open(html_path, "r", encoding="utf-8") as f:
+        html = f.read()
+    render_path = os.path.splitext(html_path)[0] + ".render.html"
+    with open(render_path, "w", encoding="utf-8") as f:
+        f.write(html.replace(POSI_TILE_URL, local))
+    return render_path
+
+
+def prefetch_tiles(center_lat: float, center_lng: float, zoom: float, window: Tuple[int, int],
+                   max_workers: int = 8) -> int:
+    """Warm the disk cache with every tile the render will request, fetched in parallel.
+
+    With zoomSnap=0 Leaflet draws round(zoom) tiles scaled by 2**(zoom - round(zoom)),
+    so the viewport spans window * 2**(tz - zoom) pixels at the tile zoom (plus one tile margin).
+    """
+    if not TILE_CACHE_DIR or TILE_CACHE_DIR.lower() == "off":
+        return 0
+    tz = int(round(zoom))
+    n = 2 ** tz
+    scale = 2.0 ** (tz - zoom)
+    px = (center_lng + 180.0) / 360.0 * 256 * n
+    py = (1.0 - math.asinh(math.tan(math.radians(center_lat))) / math.pi) / 2.0 * 256 * n
+    hw, hh = window[0] / 2.0 * scale, window[1] / 2.0 * scale
+    xs = range(int((px - hw) // 256) - 1, int((px + hw) // 256) + 2)
+    ys = range(max(0, int((py - hh) // 256) - 1), min(n - 1, int((py + hh) // 256) + 1) + 1)
+    tiles = [(tz, x % n, y) for x in xs for y in ys]
+    with ThreadPoolExecutor(max_workers=max_workers) as ex:
+        list(ex.map(lambda t: _tile_bytes(*t), tiles))
+    return len(tiles)
+
+
+# Resolves once every tile layer on the map has fired 'load' (no fixed polling/sleeps)
+_TILES_SETTLED_JS = """
+var done = arguments[arguments.length - 1];
+var map = window[arguments[0]];
+if (!map || !window.L) { done(false); return; }
+var layers = [];
+map.eachLayer(function (l) { if (l instanceof L.GridLayer) layers.push(l); });
+function settle() {
+  for (var i = 0; i < layers.length; i++) {
+    if (layers[i].isLoading()) { layers[i].once('load', settle); return; }
+  }
+  requestAnimationFrame(function () { done(true); });
+}
+setTimeout(settle, 100);  // after the fractional setZoom/invalidateSize (60 ms)
+"""
+
+
+def wait_for_tiles(driver, map_name: str, timeout: float = TILE_WAIT_HARD_TIMEOUT_SEC) -> bool:
+    """Block until the map's tiles have loaded; False on timeout (the screenshot still proceeds)."""
+    driver.set_script_timeout(timeout)
+    try:
+        return bool(driver.execute_async_script(_TILES_SETTLED_JS, map_name))
+    except (TimeoutException, JavascriptException):
+        return False
+
+
+# All markers in one JSON blob + one Leaflet loop (one script, one featureGroup) instead of a
+# folium.CircleMarker object/script per row. A map child, so it renders after the map (and in st_folium).
+def is_trusted(df: pd.DataFrame) -> pd.Series:
+    """benchmark == "trusted" (case-insensitive) as one vectorized column op."""
+    if "benchmark" not in df.columns:
+        return pd.Series(False, index=df.index)
+    return df["benchmark"].astype(str).str.lower().eq("trusted")
+
+
+class _MarkerLayer(MacroElement):
+    _template = JinjaTemplate("""
+        {% macro script(this, kwargs) %}
+        (function () {
+          // one <canvas> for every circle: a single paint regardless of N (SVG adds a DOM node each)
+          var rows = {{ this.rows }}, group = L.featureGroup(), renderer = L.canvas({ padding: 0.5 });
+          // two shared style objects (Leaflet copies options per layer), not one literal per marker
+          var base = { renderer: renderer, radius: 8, weight: 2, color: "#ffffff", fill: true, fillOpacity: 0.95 };
+          var styles = [L.extend({}, base, { fillColor: "#7f8c8d" }), L.extend({}, base, { fillColor: "#2ca25f" })];
+          for (var i = 0; i < rows.length; i++) {
+            var b = rows[i];
+            var mk = L.circleMarker([b.lat, b.lng], styles[b.trusted ? 1 : 0]);
+            if (b.name) { mk.bindTooltip(String(b.name)); }
+            group.addLayer(mk);
+          }
+          group.addTo({{ this._parent.get_name() }});
+        })();
+        {% endmacro %}
+    """)
+
+    def __init__(self, rows_json: str):
+        super().__init__()
+        self._name = "MarkerLayer"
+        self.rows = rows_json
+
+
+def marker_layer(df: pd.DataFrame, *, tooltips: bool = False) -> MacroElement:
+    """One map child carrying every business marker; add with .add_to(m)."""
+    out = pd.DataFrame({"lat": df["latitude"], "lng": df["longitude"], "trusted": is_trusted(df)})
+    if tooltips and "name" in df.columns:
+        out["name"] = df["name"]
+    rows = out.to_json(orient="records")
+    return _MarkerLayer(rows.replace("</", "<\\/"))
 
 
 @dataclass
@@ -107,16 +297,45 @@ def _bbox_midpoint(df: pd.DataFrame) -> tuple[float, float]:
             float((df["longitude"].min() + df["longitude"].max()) / 2.0))
 
 
+def _haversine_km(clat: float, clng: float, lats: np.ndarray, lngs: np.ndarray) -> np.ndarray:
+    """Distances (km) from one centre to every point, vectorized (no per-row geodesic objects)."""
+    lat = np.radians(lats)
+    c = math.radians(clat)
+    a = np.sin((lat - c) / 2.0) ** 2 + math.cos(c) * np.cos(lat) * np.sin((np.radians(lngs) - math.radians(clng)) / 2.0) ** 2
+    return 2.0 * EARTH_RADIUS_KM * np.arcsin(np.sqrt(a))
+
+
+if njit is not None:
+    @njit(parallel=True, fastmath=True, cache=True)
+    def _haversine_max_nb(lat, lng, clat, clng):  # pragma: no cover - compiled
+        """Largest great-circle distance (km) from (clat, clng); all inputs in radians."""
+        m = 0.0
+        for i in prange(lat.shape[0]):
+            a = math.sin((lat[i] - clat) / 2.0) ** 2 + math.cos(clat) * math.cos(lat[i]) * math.sin((lng[i] - clng) / 2.0) ** 2
+            m = max(m, 2.0 * EARTH_RADIUS_KM * math.asin(math.sqrt(a)))  # prange max-reduction
+        return m
+else:
+    _haversine_max_nb = None
+
+# below this the NumPy path is faster than the numba call overhead
+_NB_MIN_POINTS = 50_000
+
+
 def _radius_from_center(center: tuple[float, float], df: pd.DataFrame) -> int:
     clat, clng = center
-    return max(200, int(max(
-        geodesic((clat, clng), (lat, lng)).km for lat, lng in zip(df["latitude"], df["longitude"])) * 1000))
+    lats, lngs = df["latitude"].to_numpy(float), df["longitude"].to_numpy(float)
+    if _haversine_max_nb is not None and lats.size >= _NB_MIN_POINTS:
+        far_km = _haversine_max_nb(np.radians(lats), np.radians(lngs), math.radians(clat), math.radians(clng))
+    else:
+        far_km = float(_haversine_km(clat, clng, lats, lngs).max())
+    return max(200, int(far_km * 1000))
 
 
-def build_map(df: pd.DataFrame, *, zoom_fraction: float = 0.75, window: Tuple[int, int] = WINDOW_DEFAULT) -> tuple[
-    folium.Map, MapMeta]:
+def build_map(df: pd.DataFrame, *, zoom_fraction: float = 0.75, window: Tuple[int, int] = WINDOW_DEFAULT,
+              tile_url: str = POSI_TILE_URL) -> tuple[folium.Map, MapMeta]:
     """Build a Folium map sized exactly to `window` and centered via bbox midpoint.
-    Keeps fractional zoom and adds full-bleed CSS so screenshots have no rails."""
+    Keeps fractional zoom and adds full-bleed CSS so screenshots have no rails.
+    save_html_and_png screenshots through the disk tile cache (see local_render_copy)."""
     df = df[df["latitude"].notna() & df["longitude"].notna()].copy()
     if df.empty:
         raise ValueError("No valid lat/lon rows")
@@ -135,7 +354,9 @@ def build_map(df: pd.DataFrame, *, zoom_fraction: float = 0.75, window: Tuple[in
         width=window[0],
         height=window[1],
     )
-    folium.TileLayer(POSI_TILE_URL, name="Positron", attr=POSI_TILE_ATTR, control=False).add_to(m)
+    # keep_buffer/update_when_idle: fetch the whole view eagerly while the fractional zoom settles
+    folium.TileLayer(tile_url, name="Positron", attr=POSI_TILE_ATTR, control=False,
+                     update_when_idle=False, keep_buffer=4).add_to(m)
 
     # Base tile style
     m.get_root().html.add_child(Element(
@@ -190,17 +411,7 @@ def build_map(df: pd.DataFrame, *, zoom_fraction: float = 0.75, window: Tuple[in
         dash_array="6 6",
     ).add_to(m)
 
-    for _, row in df.iterrows():
-        fill = "#2ca25f" if str(row.get("benchmark", "")).lower() == "trusted" else "#7f8c8d"
-        folium.CircleMarker(
-            location=[row["latitude"], row["longitude"]],
-            radius=8,
-            weight=2,
-            color="#ffffff",
-            fill=True,
-            fill_color=fill,
-            fill_opacity=0.95,
-        ).add_to(m)
+    marker_layer(df).add_to(m)
 
     # Legend
     m.get_root().html.add_child(Element(
@@ -211,56 +422,105 @@ def build_map(df: pd.DataFrame, *, zoom_fraction: float = 0.75, window: Tuple[in
 
 
 
-def save_html_and_png(m, html_path: str, png_path: str, window: tuple[int, int]):
-    import os, time
-    from selenium import webdriver
-    from selenium.webdriver.chrome.options import Options
-    from selenium.common.exceptions import JavascriptException
-    from selenium.webdriver.common.by import By
+def capture_png(driver, png_path: str, element_id: Optional[str] = None) -> None:
+    """Screenshot via CDP Page.captureScreenshot (optimizeForSpeed), clipped to `element_id` if given.
 
-    # Save HTML
-    m.save(html_path)
+    Skips WebDriver's screenshot endpoint and its extra encode/scroll work; falls back to it when
+    CDP is unavailable.
+    """
+    params: Dict[str, object] = {"format": "png", "captureBeyondViewport": False, "optimizeForSpeed": True}
+    if element_id:
+        r = driver.execute_script(
+            "var b=document.getElementById(arguments[0]).getBoundingClientRect();"
+            "return [b.left, b.top, b.width, b.height];", element_id)
+        params["clip"] = {"x": r[0], "y": r[1], "width": r[2], "height": r[3], "scale": 1}
+    try:
+        data = driver.execute_cdp_cmd("Page.captureScreenshot", params)["data"]
+    except (AttributeError, WebDriverException):
+        if element_id:
+            driver.find_element(By.ID, element_id).screenshot(png_path)
+        else:
+            driver.save_screenshot(png_path)
+        return
+    with open(png_path, "wb") as f:
+        f.write(base64.b64decode(data))
+
+
+# ---- One long-lived headless Chrome per process (startup is 1-3 s; renders reuse it) ----
+_DRIVER = None
+_DRIVER_LOCK = threading.Lock()  # one page at a time per browser
 
-    # Launch Chrome
+
+def _chrome_options() -> Options:
     options = Options()
     options.add_argument("--headless=new")
     options.add_argument("--no-sandbox")
     options.add_argument("--disable-dev-shm-usage")
     options.add_argument("--force-device-scale-factor=1")
-    options.add_argument(f"--window-size={window[0]},{window[1]}")
+    options.add_argument(f"--window-size={WINDOW_DEFAULT[0]},{WINDOW_DEFAULT[1]}")
+    # no throttling when the (virtual) window is occluded, e.g. CI
+    options.add_argument("--disable-renderer-backgrounding")
+    options.add_argument("--disable-backgrounding-occluded-windows")
+    options.add_argument("--disable-gpu")
+    options.add_argument("--hide-scrollbars")
+    return options
 
-    driver = webdriver.Chrome(options=options)
-    try:
-        # Force the viewport to the exact size (CDP)
-        _set_exact_viewport(driver, window[0], window[1])
 
-        # Load the file
-        driver.get("file://" + os.path.abspath(html_path))
+def _get_driver():
+    global _DRIVER
+    if _DRIVER is None:
+        _DRIVER = webdriver.Chrome(options=_chrome_options())
+        atexit.register(_quit_driver)
+    return _DRIVER
 
-        # One more time after content loads (some pages can alter metrics)
-        _set_exact_viewport(driver, window[0], window[1])
 
-        deadline = time.time() + 12.0
-        driver.execute_script("document.body.style.overflow='hidden'")
+def _quit_driver() -> None:
+    global _DRIVER
+    if _DRIVER is not None:
+        try:
+            _DRIVER.quit()
+        except Exception:
+            pass
+        _DRIVER = None
 
-        # Wait until tiles are loaded
-        while time.time() < deadline:
-            try:
-                loading = driver.execute_script("return document.querySelectorAll('.leaflet-tile-loading').length")
-                tiles_seen = driver.execute_script("return document.querySelectorAll('.leaflet-tile, .leaflet-tile-loaded').length")
-            except JavascriptException:
-                loading, tiles_seen = 0, 0
-            if int(loading) == 0 and int(tiles_seen) > 0:
-                time.sleep(0.4)
-                break
-            time.sleep(0.25)
-
-        # Screenshot ONLY the map element (no window chrome)
-        elem = driver.find_element(By.ID, m.get_name())
-        elem.screenshot(png_path)
-
-    finally:
-        driver.quit()
+
+def save_html_and_png(m, html_path: str, png_path: str, window: tuple[int, int]):
+    # Save HTML (CDN tiles); the screenshot loads a copy that reads tiles through the disk cache
+    m.save(html_path)
+    render_path = local_render_copy(html_path)
+
+    with _DRIVER_LOCK:
+        driver = _get_driver()
+        try:
+            # Force the viewport to the exact size (CDP); window differs per call
+            _set_exact_viewport(driver, window[0], window[1])
+
+            # Load the file
+            driver.get("file://" + os.path.abspath(render_path))
+
+            # One more time after content loads (some pages can alter metrics)
+            _set_exact_viewport(driver, window[0], window[1])
+
+            driver.execute_script("document.body.style.overflow='hidden'")
+
+            # Wait until tiles are loaded (event-driven; hard cap TILE_WAIT_HARD_TIMEOUT_SEC)
+            wait_for_tiles(driver, m.get_name())
+
+            # Screenshot ONLY the map element (no window chrome)
+            capture_png(driver, png_path, m.get_name())
+
+            # Reset for the next render
+            driver.delete_all_cookies()
+            driver.get("about:blank")
+        except WebDriverException:
+            _quit_driver()  # crashed/hung browser: relaunch on the next call
+            raise
+        finally:
+            if render_path != html_path:
+                try:
+                    os.remove(render_path)
+                except OSError:
+                    pass
 
     # QA: confirm final PNG dims
     try:
@@ -281,7 +541,8 @@ def generate_map_png_from_summaries(summaries: Iterable[dict], output_path: str,
     if aspect_ratio is None:
         aspect_ratio = 3 / 2
     window = (int(window_height_px * aspect_ratio), int(window_height_px))
-    m, _ = build_map(df, zoom_fraction=zoom_fraction, window=window)
+    m, meta = build_map(df, zoom_fraction=zoom_fraction, window=window)
+    prefetch_tiles(meta.center_lat, meta.center_lng, meta.desired_zoom, window)
     html_path = output_path.replace(".png", ".html")
     os.makedirs(os.path.dirname(output_path), exist_ok=True)
     save_html_and_png(m, html_path, output_path, window=window)
@@ -317,8 +578,39 @@ def generate_map_png_from_project(project_id: str, supabase, output_dir: str, *,
     if aspect_ratio is None:
         aspect_ratio = 3 / 2
     window = (int(800 * aspect_ratio), 800)
-    m, _ = build_map(df, zoom_fraction=zoom_fraction, window=window)
+    m, meta = build_map(df, zoom_fraction=zoom_fraction, window=window)
+    prefetch_tiles(meta.center_lat, meta.center_lng, meta.desired_zoom, window)
     html_path = os.path.join(output_dir, "test_map.html")
     png_path = os.path.join(output_dir, "test_map.png")
     save_html_and_png(m, html_path, png_path, window=window)
     return png_path
+
+
+# ---- Batch renders: one Chrome *process* per worker (screenshots within one browser serialize) ----
+def _render_worker(job: Tuple[List[dict], str, float, Optional[float]]) -> bool:
+    rows, output_path, zoom_fraction, aspect_ratio = job
+    return generate_map_png_from_summaries(rows, output_path, zoom_fraction=zoom_fraction, aspect_ratio=aspect_ratio)
+
+
+def render_many(project_ids: Iterable[str], supabase, output_root: str, *, zoom_fraction: float = 0.75,
+                aspect_ratio: Optional[float] = None, max_workers: Optional[int] = None) -> Dict[str, Optional[str]]:
+    """Render test_map.png for many projects in parallel; returns {project_id: png_path or None}.
+
+    Rows are fetched here (one query per project) and shipped to spawn-started workers, each
+    keeping its own long-lived driver (_get_driver) and sharing the on-disk tile cache.
+    """
+    ids = list(dict.fromkeys(project_ids))
+    jobs: Dict[str, Tuple[List[dict], str, float, Optional[float]]] = {}
+    out: Dict[str, Optional[str]] = {pid: None for pid in ids}
+    for pid in ids:
+        resp = supabase.table("enigma_summaries").select("name, latitude, longitude, benchmark").eq("project_id", pid).execute()
+        if resp.data:
+            jobs[pid] = (resp.data, os.path.join(output_root, pid, "test_map.png"), zoom_fraction, aspect_ratio)
+    if not jobs:
+        return out
+    workers = max(1, min(max_workers or min(os.cpu_count() or 1, 4), len(jobs)))
+    with ProcessPoolExecutor(max_workers=workers, mp_context=mp.get_context("spawn")) as ex:
+        for pid, ok in zip(jobs, ex.map(_render_worker, jobs.values())):
+            out[pid] = jobs[pid][1] if ok else None
+    return out
+
@@ -2,14 +2,16 @@
 # Batched OpenAI evaluation for borderline Tier-1/Tier-2 results (no writes).
 # Uses Responses API with `input=` (compatible with older client versions).
 # Returns a list of suggestions keyed by id.
+# evaluate_tiers_openai_async runs the batches concurrently (semaphore-capped, x-ratelimit-* aware).
 
 from __future__ import annotations
 
 import os
 import json
 import re
-from typing import List, Dict, Any, Iterable
-from openai import OpenAI
+import asyncio
+from typing import List, Dict, Any, Iterable, Mapping
+from openai import OpenAI, AsyncOpenAI
 
 DEFAULT_EVAL_MODEL = os.getenv("OPENAI_EVAL_MODEL", "gpt-5-mini")
 
@@ -77,6 +79,55 @@ def _parse_json_array(text: str) -> List[Dict[str, Any]]:
     except Exception:
         return []
 
+def _batch_prompt(taxonomy: Dict[str, Any], chunk: List[Dict[str, Any]]) -> str:
+    return (
+        EVAL_RULES
+        + "\n\n--- PAYLOAD START ---\n"
+        + _pack_batch_payload(taxonomy, chunk)
+        + "\n--- PAYLOAD END ---\n"
+        + "Return ONLY the JSON array."
+    )
+
+def _response_text(resp: Any) -> str:
+    text = getattr(resp, "output_text", None)
+    if not text:
+        # Some client versions expose fragmented outputs under resp.output
+        parts = []
+        try:
+            for p in getattr(resp, "output", []) or []:
+                for c in getattr(p, "content", []) or []:
+                    if getattr(c, "type", "") == "output_text" and getattr(c, "text", None):
+                        parts.append(c.text)
+        except Exception:
+            pass
+        text = "\n".join(parts) if parts else ""
+    return text
+
+def _suggestions_from_text(text: str) -> List[Dict[str, Any]]:
+    data = _parse_json_array(text)
+    if isinstance(data, list) and data:
+        return [d for d in data if isinstance(d, dict) and d.get("id") is not None]
+    raise ValueError("Empty/invalid JSON array from evaluator")
+
+def _flag_batch(chunk: List[Dict[str, Any]], e: Exception) -> List[Dict[str, Any]]:
+    # On failure, mark as 'flag' and surface error in eval_reason for visibility
+    err = str(e)[:180]
+    return [{
+        "id": it.get("id"),
+        "suggested_tier": it.get("tier"),
+        "disposition": "flag",
+        "confidence": 0.5,
+        "reason": f"evaluator error: {err}",
+        "evidence_tags": [],
+    } for it in chunk]
+
+def _client_kwargs() -> Dict[str, Any]:
+    api_key = (os.getenv("OPENAI_API_KEY") or "").strip()
+    project = (os.getenv("OPENAI_PROJECT") or "").strip() or None
+    if not api_key:
+        raise RuntimeError("OPENAI_API_KEY is not set")
+    return {"api_key": api_key, "project": project}
+
 def evaluate_tiers_openai(
     items: List[Dict[str, Any]],
     taxonomy: Dict[str, Any],
@@ -88,61 +139,83 @@ def evaluate_tiers_openai(
            venue_hits_taxonomy, venue_hits_fallback, tier, confidence, reason.
     returns: list of {id, suggested_tier, disposition, confidence, reason, evidence_tags}
     """
-    api_key = (os.getenv("OPENAI_API_KEY") or "").strip()
-    project = (os.getenv("OPENAI_PROJECT") or "").strip() or None
-    if not api_key:
-        raise RuntimeError("OPENAI_API_KEY is not set")
-    client = OpenAI(api_key=api_key, project=project)
+    client = OpenAI(**_client_kwargs())
     mdl = model or DEFAULT_EVAL_MODEL
 
     out: List[Dict[str, Any]] = []
 
     for i in range(0, len(items), batch_size):
         chunk = items[i:i+batch_size]
-        payload = _pack_batch_payload(taxonomy, chunk)
-
-        prompt = (
-            EVAL_RULES
-            + "\n\n--- PAYLOAD START ---\n"
-            + payload
-            + "\n--- PAYLOAD END ---\n"
-            + "Return ONLY the JSON array."
-        )
-
         try:
             resp = client.responses.create(
                 model=mdl,
-                input=prompt,   # NOTE: use 'input' (compatible with your client)
+                input=_batch_prompt(taxonomy, chunk),   # NOTE: use 'input' (compatible with your client)
             )
-            text = getattr(resp, "output_text", None)
-            if not text:
-                # Some client versions expose fragmented outputs under resp.output
-                parts = []
-                try:
-                    for p in getattr(resp, "output", []) or []:
-                        for c in getattr(p, "content", []) or []:
-                            if getattr(c, "type", "") == "output_text" and getattr(c, "text", None):
-                                parts.append(c.text)
-                except Exception:
-                    pass
-                text = "\n".join(parts) if parts else ""
-
-            data = _parse_json_array(text)
-            if isinstance(data, list) and data:
-                out.extend([d for d in data if isinstance(d, dict) and d.get("id") is not None])
-            else:
-                raise ValueError("Empty/invalid JSON array from evaluator")
-
+            out.extend(_suggestions_from_text(_response_text(resp)))
         except Exception as e:
-            # On failure, mark as 'flag' and surface error in eval_reason for visibility
-            err = str(e)[:180]
-            for it in chunk:
-                out.append({
-                    "id": it.get("id"),
-                    "suggested_tier": it.get("tier"),
-                    "disposition": "flag",
-                    "confidence": 0.5,
-                    "reason": f"evaluator error: {err}",
-                    "evidence_tags": [],
-                })
+            out.extend(_flag_batch(chunk, e))
     return out
+
+# --- concurrent variant ---
+
+_RESET_PART = re.compile(r"(\d+(?:\.\d+)?)(ms|h|m|s)")
+
+def _reset_seconds(val: str | None) -> float:
+    """Parse OpenAI reset durations like '20ms', '1s', '6m0s' into seconds."""
+    if not val:
+        return 0.0
+    unit = {"ms": 0.001, "s": 1.0, "m": 60.0, "h": 3600.0}
+    return sum(float(n) * unit[u] for n, u in _RESET_PART.findall(str(val)))
+
+def _ratelimit_wait(headers: Mapping[str, str], need_tokens: int) -> float:
+    """Seconds to hold new requests, from x-ratelimit-* headers (0 when budget remains)."""
+    wait = 0.0
+    try:
+        if int(headers.get("x-ratelimit-remaining-requests", "1") or 1) <= 0:
+            wait = max(wait, _reset_seconds(headers.get("x-ratelimit-reset-requests")))
+        if int(headers.get("x-ratelimit-remaining-tokens", need_tokens) or 0) < need_tokens:
+            wait = max(wait, _reset_seconds(headers.get("x-ratelimit-reset-tokens")))
+    except Exception:
+        return 0.0
+    return wait
+
+async def evaluate_tiers_openai_async(
+    items: List[Dict[str, Any]],
+    taxonomy: Dict[str, Any],
+    model: str | None = None,
+    batch_size: int = 40,
+    max_concurrency: int = 8,
+) -> List[Dict[str, Any]]:
+    """Same contract as evaluate_tiers_openai, but batches are in flight together.
+
+    At most `max_concurrency` requests run at once. When a response reports the
+    request/token budget as exhausted, new batches wait for the advertised reset.
+    Output order follows the input batches.
+    """
+    client = AsyncOpenAI(**_client_kwargs())
+    mdl = model or DEFAULT_EVAL_MODEL
+    sem = asyncio.Semaphore(max(1, int(max_concurrency)))
+    loop = asyncio.get_running_loop()
+    resume_at = [0.0]  # shared backoff gate, loop.time() based
+
+    async def _one_batch(chunk: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+        async with sem:
+            delay = resume_at[0] - loop.time()
+            if delay > 0:
+                await asyncio.sleep(delay)
+            prompt = _batch_prompt(taxonomy, chunk)
+            try:
+                raw = await client.responses.with_raw_response.create(model=mdl, input=prompt)
+                wait = _ratelimit_wait(raw.headers, need_tokens=len(prompt) // 4)
+                if wait > 0:
+                    resume_at[0] = max(resume_at[0], loop.time() + wait)
+                return _suggestions_from_text(_response_text(raw.parse()))
+            except Exception as e:
+                return _flag_batch(chunk, e)
+
+    try:
+        batches = [items[i:i+batch_size] for i in range(0, len(items), batch_size)]
+        results = await asyncio.gather(*(_one_batch(b) for b in batches))
+    finally:
+        await client.close()
+    return [row for rows in results for row in rows]
@@ -1,5 +1,24 @@
 from __future__ import annotations
-import json, math, re
+import json, math, os, re, hashlib
+from pathlib import Path
+import numpy as np
+
+try:  # optional: KD-tree neighbor search for dedup (falls back to a grid hash)
+    from scipy.spatial import cKDTree  # type: ignore
+except Exception:
+    cKDTree = None
+try:  # optional: faster JSON for LLM payloads and the profile cache (falls back to stdlib json)
+    import orjson  # type: ignore
+except Exception:
+    orjson = None
+try:  # optional: C++ fuzzy name scorer for soft dedup (difflib fallback)
+    from rapidfuzz import fuzz as _rf_fuzz  # type: ignore
+except Exception:
+    _rf_fuzz = None
+try:  # optional: JIT pairwise haversine for same-name groups when SciPy is absent
+    from numba import njit, prange  # type: ignore
+except Exception:
+    njit = prange = None
 from dataclasses import dataclass, field
 from typing import Dict, List, Tuple, Optional, Set, Iterable
 
@@ -11,6 +30,7 @@ from typing import Dict, List, Tuple, Optional, Set, Iterable
 class IndustrySettings:
     allow_types: Set[str] = field(default_factory=set)
     soft_deny_types: Set[str] = field(default_factory=set)
+    hard_deny_types: Set[str] = field(default_factory=set)  # dropped before Place Details (empty = recall-first)
     include_keywords: Set[str] = field(default_factory=set)
     exclude_keywords: Set[str] = field(default_factory=set)
     name_positive: Set[str] = field(default_factory=set)
@@ -63,17 +83,171 @@ def km_to_deg_lon(km: float, lat_deg: float) -> float:
 
 
 def generate_grid(lat0: float, lon0: float, max_radius_km: float, step_km: float) -> List[Tuple[float, float, float]]:
-    pts: List[Tuple[float, float, float]] = [(lat0, lon0, 0.0)]
+    # Polar rings; each ring's points come from one vectorized sin/cos over all angles
+    lat_parts, lon_parts, r_parts = [np.array([lat0])], [np.array([lon0])], [np.array([0.0])]
+    lon_km_per_deg = 111.320 * math.cos(math.radians(lat0)) or 1e-9
     r = step_km
     while r <= max_radius_km + 1e-9:
         n = max(6, int(math.ceil((2 * math.pi * r) / step_km)))
-        for k in range(n):
-            theta = (2 * math.pi) * (k / n)
-            dlat = km_to_deg_lat(r * math.sin(theta))
-            dlon = km_to_deg_lon(r * math.cos(theta), lat0)
-            pts.append((lat0 + dlat, lon0 + dlon, r))
+        theta = (2 * math.pi) * (np.arange(n) / n)
+        lat_parts.append(lat0 + (r * np.sin(theta)) / 111.0)
+        lon_parts.append(lon0 + (r * np.cos(theta)) / lon_km_per_deg)
+        r_parts.append(np.full(n, r))
         r += step_km
-    return pts
+    return list(zip(np.concatenate(lat_parts).tolist(),
+                    np.concatenate(lon_parts).tolist(),
+                    np.concatenate(r_parts).tolist()))
+
+
+def haversine_km_vec(lat1, lon1, lat2, lon2) -> np.ndarray:
+    """Great-circle distance in km; all args broadcast (scalars or arrays of degrees)."""
+    lat1, lon1, lat2, lon2 = (np.radians(np.asarray(x, dtype=float)) for x in (lat1, lon1, lat2, lon2))
+    a = np.sin((lat2 - lat1) / 2.0) ** 2 + np.cos(lat1) * np.cos(lat2) * np.sin((lon2 - lon1) / 2.0) ** 2
+    return 6371.0088 * 2.0 * np.arctan2(np.sqrt(a), np.sqrt(1.0 - a))
+
+if njit is not None:
+    @njit(cache=True, fastmath=True, parallel=True)
+    def _haversine_pairwise_nb(lats, lons):  # pragma: no cover - compiled
+        """Upper-triangular (n x n) great-circle distance matrix in km (lower triangle left 0)."""
+        n = lats.shape[0]
+        out = np.zeros((n, n))
+        for i in prange(n):
+            p1 = math.radians(lats[i]); l1 = math.radians(lons[i])
+            for j in range(i + 1, n):
+                p2 = math.radians(lats[j]); l2 = math.radians(lons[j])
+                a = math.sin((p2 - p1) / 2.0) ** 2 + math.cos(p1) * math.cos(p2) * math.sin((l2 - l1) / 2.0) ** 2
+                out[i, j] = 6371.0088 * 2.0 * math.atan2(math.sqrt(a), math.sqrt(1.0 - a))
+        return out
+else:
+    _haversine_pairwise_nb = None
+
+
+def _dedup_name_key(name: str) -> str:
+    return re.sub(r"[^a-z0-9]+", "", (name or "").lower())
+
+
+def _near_pairs(xy: np.ndarray, r_km: float) -> Iterable[Tuple[int, int]]:
+    """Index pairs within r_km on planar km coords: KD-tree when SciPy is present, else a cell hash."""
+    if cKDTree is not None:
+        return cKDTree(xy).query_pairs(r_km)
+    cells: Dict[Tuple[int, int], List[int]] = {}
+    keys = np.floor(xy / r_km).astype(int).tolist()
+    for i, (cx, cy) in enumerate(keys):
+        cells.setdefault((cx, cy), []).append(i)
+    pairs = set()
+    for (cx, cy), members in cells.items():
+        for ox in (-1, 0, 1):
+            for oy in (-1, 0, 1):
+                for j in cells.get((cx + ox, cy + oy), ()):
+                    for i in members:
+                        if i < j:
+                            pairs.add((i, j))
+    return pairs
+
+
+def _name_similarity(a: str, b: str) -> float:
+    """0..100 token-set similarity of two display names (rapidfuzz when installed)."""
+    if _rf_fuzz is not None:
+        return float(_rf_fuzz.token_set_ratio(a, b))
+    from difflib import SequenceMatcher
+    ta = " ".join(sorted(set(re.findall(r"[a-z0-9]+", a.lower()))))
+    tb = " ".join(sorted(set(re.findall(r"[a-z0-9]+", b.lower()))))
+    return 100.0 * SequenceMatcher(None, ta, tb).ratio()
+
+
+def soft_dedup_by_name_and_distance(places: List[Dict], radius_m: float = 150.0,
+                                    fuzzy_cutoff: Optional[float] = None) -> List[Dict]:
+    """Collapse listings with the same normalized name within radius_m of each other.
+
+    Duplicate sets are merged with union-find; each keeps the place with the most
+    user_ratings_total. Places without coordinates or name are kept as-is. Order is preserved.
+    fuzzy_cutoff (0..100, off by default) also merges near neighbours whose names differ but
+    score >= cutoff on token-set similarity; equal normalized names still merge without scoring.
+    """
+    if radius_m <= 0 or len(places) < 2:
+        return list(places)
+    idx, lat, lng, keys = [], [], [], []
+    for i, p in enumerate(places):
+        loc = (p.get("geometry") or {}).get("location") or {}
+        k = _dedup_name_key(p.get("name", ""))
+        if k and loc.get("lat") is not None and loc.get("lng") is not None:
+            idx.append(i); lat.append(float(loc["lat"])); lng.append(float(loc["lng"])); keys.append(k)
+    if fuzzy_cutoff is None:
+        # Name blocking first: a listing whose name occurs once can't have a duplicate, so only
+        # repeated names (chains, double listings) go into the spatial search
+        counts: Dict[str, int] = {}
+        for k in keys:
+            counts[k] = counts.get(k, 0) + 1
+        keep = [j for j, k in enumerate(keys) if counts[k] > 1]
+        idx = [idx[j] for j in keep]; lat = [lat[j] for j in keep]
+        lng = [lng[j] for j in keep]; keys = [keys[j] for j in keep]
+    if len(idx) < 2:
+        return list(places)
+
+    lat_a, lng_a = np.array(lat), np.array(lng)
+    lat0 = float(lat_a.mean())
+    # Equirectangular km coords: fine at the few-hundred-meter scale we compare at
+    xy = np.column_stack([lat_a * 111.0, lng_a * 111.320 * math.cos(math.radians(lat0))])
+    r_km = radius_m / 1000.0
+
+    parent = list(range(len(idx)))
+
+    def _find(a: int) -> int:
+        while parent[a] != a:
+            parent[a] = parent[parent[a]]
+            a = parent[a]
+        return a
+
+    def _union(a: int, b: int) -> None:
+        ra, rb = _find(a), _find(b)
+        if ra != rb:
+            parent[rb] = ra
+
+    if fuzzy_cutoff is not None:
+        # Spatial pairs first, then names: equality fast path, fuzzy score only for differing names
+        pairs = list(_near_pairs(xy, r_km))
+        if pairs:
+            a_i, b_i = np.array(pairs).T
+            close = haversine_km_vec(lat_a[a_i], lng_a[a_i], lat_a[b_i], lng_a[b_i]) <= r_km
+            scored: Dict[Tuple[str, str], bool] = {}
+            for a, b in np.array(pairs)[close].tolist():
+                if keys[a] != keys[b]:
+                    nk = (keys[a], keys[b]) if keys[a] < keys[b] else (keys[b], keys[a])
+                    ok = scored.get(nk)
+                    if ok is None:
+                        ok = scored[nk] = _name_similarity(
+                            places[idx[a]].get("name", ""), places[idx[b]].get("name", "")) >= fuzzy_cutoff
+                    if not ok:
+                        continue
+                _union(a, b)
+    elif cKDTree is None and _haversine_pairwise_nb is not None:
+        # No KD-tree: same-name groups are small, so compare all pairs per group in compiled code
+        groups: Dict[str, List[int]] = {}
+        for j, k in enumerate(keys):
+            groups.setdefault(k, []).append(j)
+        for members in groups.values():
+            if len(members) < 2:
+                continue
+            m = np.array(members)
+            near = np.triu(_haversine_pairwise_nb(lat_a[m], lng_a[m]) <= r_km, 1)
+            for a, b in zip(*np.nonzero(near)):
+                _union(int(m[a]), int(m[b]))
+    else:
+        cand = [(a, b) for a, b in _near_pairs(xy, r_km) if keys[a] == keys[b]]
+        if cand:
+            a_i, b_i = np.array(cand).T
+            close = haversine_km_vec(lat_a[a_i], lng_a[a_i], lat_a[b_i], lng_a[b_i]) <= r_km
+            for a, b in np.array(cand)[close].tolist():
+                _union(a, b)
+
+    best: Dict[int, int] = {}
+    for j in range(len(idx)):
+        root = _find(j)
+        cur = best.get(root)
+        if cur is None or (places[idx[j]].get("user_ratings_total") or 0) > (places[idx[cur]].get("user_ratings_total") or 0):
+            best[root] = j
+    drop = {idx[j] for j in range(len(idx))} - {idx[j] for j in best.values()}
+    return [p for i, p in enumerate(places) if i not in drop]
 
 # -----------------------------
 # LLM profile (optional, via Ollama HTTP)
@@ -107,6 +281,15 @@ Constraints:\n- allow/deny types must come from the allowed list.\n- Weights mus
 """
 
 
+def _json_loads(raw):
+    """str or bytes -> object (orjson when installed)."""
+    return orjson.loads(raw) if orjson is not None else json.loads(raw)
+
+
+def _json_dumps(obj) -> bytes:
+    return orjson.dumps(obj) if orjson is not None else json.dumps(obj).encode("utf-8")
+
+
 def ollama_generate_profile_json(model: str, url_base: str, prompt: str, temperature: float = 0.2, timeout: int = 60) -> Optional[Dict]:
     import requests
     try:
@@ -114,13 +297,104 @@ def ollama_generate_profile_json(model: str, url_base: str, prompt: str, tempera
             "model": model, "prompt": prompt, "stream": False,
             "temperature": max(0.0, min(1.0, float(temperature)))
         }, timeout=timeout)
-        resp.raise_for_status(); data = resp.json(); text = data.get("response") or ""
+        resp.raise_for_status(); data = _json_loads(resp.content); text = data.get("response") or ""
         m = re.search(r"\{[\s\S]*\}", text)
-        return json.loads(m.group(0)) if m else None
+        return _json_loads(m.group(0)) if m else None
+    except Exception:
+        return None
+
+
+# ---- On-disk profile cache: exact (model, industry, location, prompt) key, then semantic match ----
+PROFILE_CACHE_DIR = Path(os.getenv("PROFILE_CACHE_DIR", "~/.cache/peerview_profiles")).expanduser()
+PROFILE_EMBED_MODEL = os.getenv("PROFILE_EMBED_MODEL", "nomic-embed-text")
+PROFILE_SEMANTIC_MIN_COS = 0.92
+_PROFILE_INDEX = "_embeddings.json"
+
+
+def _profile_key(model: str, industry: str, location: str, prompt: str) -> str:
+    # the prompt is part of the key: editing build_profile_prompt or KNOWN_TYPES must not serve old profiles
+    raw = f"{model}|{(industry or '').strip().lower()}|{(location or '').strip().lower()}|{prompt}"
+    return hashlib.blake2b(raw.encode("utf-8"), digest_size=16).hexdigest()
+
+
+def _prompt_template_key(prompt: str, industry: str, location: str) -> str:
+    """Hash of the prompt with this query's industry/location blanked out: equal for two queries built
+    from the same template + type list, so semantic hits never cross a prompt change."""
+    t = prompt
+    for val, ph in sorted(((industry or "", "\x00I"), (location or "", "\x00L")), key=lambda x: -len(x[0])):
+        if val:
+            t = t.replace(val, ph)
+    return hashlib.blake2b(t.encode("utf-8"), digest_size=16).hexdigest()
+
+
+def _ollama_embed(url_base: str, text: str, timeout: int = 10) -> Optional[List[float]]:
+    import requests
+    try:
+        resp = requests.post(f"{url_base.rstrip('/')}/api/embed",
+                             json={"model": PROFILE_EMBED_MODEL, "input": text}, timeout=timeout)
+        resp.raise_for_status()
+        vecs = _json_loads(resp.content).get("embeddings") or []
+        return [float(x) for x in vecs[0]] if vecs else None
     except Exception:
         return None
 
 
+def _read_json(path: Path):
+    try:
+        return _json_loads(path.read_bytes())
+    except Exception:
+        return None
+
+
+def cached_profile_json(model: str, url_base: str, industry: str, location: str, prompt: str,
+                        temperature: float = 0.2, timeout: int = 60) -> Optional[Dict]:
+    """ollama_generate_profile_json with a disk cache (raw profile JSON; validate as usual).
+
+    1) exact hit on blake2b(model|industry|location|prompt) skips the LLM entirely;
+    2) otherwise, if the Ollama embedding model is available, reuse a cached profile for the
+       same model and prompt template whose "industry location" embedding has cosine >= 0.92 (paraphrases);
+    3) on a miss, generate and persist (plus its embedding for future semantic hits).
+    """
+    key = _profile_key(model, industry, location, prompt)
+    tmpl = _prompt_template_key(prompt, industry, location)
+    path = PROFILE_CACHE_DIR / f"{key}.json"
+    hit = _read_json(path) if path.exists() else None
+    if isinstance(hit, dict):
+        return hit
+
+    index_path = PROFILE_CACHE_DIR / _PROFILE_INDEX
+    index = _read_json(index_path) if index_path.exists() else None
+    index = index if isinstance(index, list) else []
+    vec = _ollama_embed(url_base, f"{industry} {location}")
+    if vec is not None:
+        q = np.asarray(vec, dtype=float)
+        qn = float(np.linalg.norm(q)) or 1.0
+        best_key, best_cos = None, PROFILE_SEMANTIC_MIN_COS
+        for ent in index:
+            if ent.get("model") != model or ent.get("prompt") != tmpl or len(ent.get("vec") or []) != len(q):
+                continue
+            v = np.asarray(ent["vec"], dtype=float)
+            cos_sim = float(q @ v) / (qn * (float(np.linalg.norm(v)) or 1.0))
+            if cos_sim >= best_cos:
+                best_key, best_cos = ent.get("key"), cos_sim
+        if best_key:
+            hit = _read_json(PROFILE_CACHE_DIR / f"{best_key}.json")
+            if isinstance(hit, dict):
+                return hit
+
+    prof = ollama_generate_profile_json(model, url_base, prompt, temperature=temperature, timeout=timeout)
+    if isinstance(prof, dict) and prof:
+        try:
+            PROFILE_CACHE_DIR.mkdir(parents=True, exist_ok=True)
+            path.write_bytes(_json_dumps(prof))
+            if vec is not None:
+                index.append({"key": key, "model": model, "prompt": tmpl, "vec": vec})
+                index_path.write_bytes(_json_dumps(index))
+        except Exception:
+            pass
+    return prof
+
+
 def validate_profile_json(profile: Dict, allowed_types: Set[str]) -> Dict:
     if not isinstance(profile, dict):
         return {}
@@ -188,7 +462,21 @@ def merge_profile(base: IndustrySettings, prof: Dict) -> IndustrySettings:
     if isinstance(prof.get("floor_ratio"),(int,float)):
         base.floor_ratio = float(prof["floor_ratio"])
     base.profile_source = "llm"
-    return base
+    return freeze_settings(base)
+
+_SET_FIELDS = ("allow_types", "soft_deny_types", "hard_deny_types", "include_keywords", "exclude_keywords", "name_positive", "name_negative")
+
+def freeze_settings(settings: IndustrySettings) -> IndustrySettings:
+    """Store the token/type sets as frozensets (hashable, cheap to reuse).
+
+    Scoring runs per candidate; frozen sets let it cache derived views (lowercased tokens)
+    instead of rebuilding them each call. Fields are replaced, never mutated, elsewhere.
+    """
+    for f in _SET_FIELDS:
+        v = getattr(settings, f, None)
+        if not isinstance(v, frozenset):
+            setattr(settings, f, frozenset(v or ()))
+    return settings
 
 # -----------------------------
 # Industry defaults (generic)
@@ -218,7 +506,7 @@ def default_settings_for_industry(industry: str) -> IndustrySettings:
     else:
         # neutral fallback: no allow_types → LLM or user overrides should fill in
         st.allow_types = set()
-    return st
+    return freeze_settings(st)
 
 # -----------------------------
 # Planning & scoring explanation
@@ -243,6 +531,28 @@ def compose_keyword(settings: IndustrySettings, focus_detail: Optional[str], foc
     return type_hint, keyword
 
 
+def coalesce_nearby_queries(nodes: Iterable[Tuple[float, float]], radii_m: Iterable[int],
+                            keywords: Iterable[str]) -> Tuple[List[Tuple[float, float, int, str]], int]:
+    """Distinct Nearby requests for nodes x radii x keywords, plus how many were coalesced away.
+
+    Nodes are keyed at 4 decimals (~11 m) and keywords case-insensitively; at the same point only the
+    largest radius is kept, since smaller circles with the same center are fully enclosed by it.
+    """
+    radii = sorted({int(r) for r in radii_m}, reverse=True)
+    kws = [k for k in keywords if k]
+    best: Dict[Tuple[int, int, str], Tuple[float, float, int, str]] = {}
+    total = 0
+    for lat, lng in nodes:
+        qlat, qlng = int(round(lat * 1e4)), int(round(lng * 1e4))
+        for kw in kws:
+            total += len(radii)
+            key = (qlat, qlng, kw.strip().lower())
+            if radii and key not in best:
+                best[key] = (lat, lng, radii[0], kw)
+    out = list(best.values())
+    return out, total - len(out)
+
+
 def plan_queries(center: Tuple[float,float]|None, params: DiscoveryParams, settings: IndustrySettings,
                  focus_detail: Optional[str]=None, focus_strict: bool=False,
                  sample_nodes: int = 10) -> Dict:
@@ -266,6 +576,9 @@ def plan_queries(center: Tuple[float,float]|None, params: DiscoveryParams, setti
     lat0, lon0 = center
     grid = generate_grid(lat0, lon0, params.max_radius_km, params.grid_step_km)
     plan["grid_nodes"] = len(grid)
+    distinct, coalesced = coalesce_nearby_queries(((la, lo) for la, lo, _ in grid), params.per_node_radius_m, [keyword])
+    plan["nearby_requests"] = len(distinct)
+    plan["coalesced_requests"] = coalesced
     preview = []
     for (lat, lon, rkm) in grid[:sample_nodes]:
         for rad in params.per_node_radius_m:
@@ -310,12 +623,16 @@ def assign_predicted_tier(score: int, tier1_threshold: int) -> int:
 
 
 def choose_tier1_threshold(scores: Iterable[int], target: int, floor_ratio: float, thresholds: List[int]) -> int:
-    scores = list(scores)
-    likely_eligible = sum(1 for s in scores if s >= 50)
+    sc = np.sort(np.fromiter(scores, dtype=float))
+    # sorted once: "how many scores >= t" is n - searchsorted(t, 'left'), O(log N) per threshold
+    likely_eligible = int(sc.size - np.searchsorted(sc, 50, side="left"))
     required = max(1, min(target, int(round(floor_ratio * max(0, likely_eligible)))))
+    ths = np.array(sorted(set(thresholds), reverse=True), dtype=float)
+    counts = sc.size - np.searchsorted(sc, ths, side="left")
+    ok = np.flatnonzero(counts >= required)
+    if ok.size:
+        return int(ths[ok[0]])
     best_t, best_count = thresholds[-1], -1
-    for t in sorted(set(thresholds), reverse=True):
-        cnt = sum(1 for s in scores if s >= t)
-        if cnt >= required: return t
-        if cnt > best_count or (cnt == best_count and t < best_t): best_t, best_count = t, cnt
-    return best_t
\ No newline at end of file
+    for t, cnt in zip(ths.tolist(), counts.tolist()):
+        if cnt > best_count or (cnt == best_count and t < best_t): best_t, best_count = int(t), cnt
+    return best_t
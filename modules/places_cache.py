@@ -0,0 +1,119 @@
+# ================================
+# FILE: modules/places_cache.py
+# PURPOSE: Persistent (SQLite, WAL) cache for Phase-1 network lookups
+# - details: Google Place Details keyed by place_id
+# - web:     scrape_site() output keyed by blake2b(url)
+# - nearby:  raw Nearby Search results keyed by blake2b(query params)
+# Entries older than the TTL (default 7 days; nearby 24h) are ignored and purged on open.
+# ================================
+
+from __future__ import annotations
+
+import os
+import json
+import time
+import sqlite3
+import hashlib
+import threading
+from typing import Any, Dict, List, Optional
+
+DEFAULT_TTL_S = 7 * 24 * 3600
+NEARBY_TTL_S = 24 * 3600  # listings churn faster than details
+
+
+def _url_key(url: str) -> str:
+    return hashlib.blake2b((url or "").encode("utf-8"), digest_size=16).hexdigest()
+
+
+class PlacesCache:
+    """Small thread-safe key/value cache; safe to share with the discovery worker pools."""
+
+    def __init__(self, path: str, ttl_s: int = DEFAULT_TTL_S, nearby_ttl_s: int = NEARBY_TTL_S):
+        self.path = path
+        self.ttl_s = int(ttl_s)
+        self.nearby_ttl_s = min(int(nearby_ttl_s), self.ttl_s)
+        self._lock = threading.Lock()
+        d = os.path.dirname(os.path.abspath(path))
+        os.makedirs(d, exist_ok=True)
+        self._db = sqlite3.connect(path, check_same_thread=False, timeout=30)
+        with self._lock:
+            self._db.execute("PRAGMA journal_mode=WAL")
+            self._db.execute("PRAGMA synchronous=NORMAL")
+            self._db.execute("CREATE TABLE IF NOT EXISTS details (place_id TEXT PRIMARY KEY, json TEXT, ts INTEGER)")
+            self._db.execute("CREATE TABLE IF NOT EXISTS web (url_hash TEXT PRIMARY KEY, text BLOB, ts INTEGER)")
+            self._db.execute("CREATE TABLE IF NOT EXISTS nearby (query_hash TEXT PRIMARY KEY, json TEXT, ts INTEGER)")
+            self._db.commit()
+        self.purge_expired()
+
+    # ---- internals ----
+    def _get(self, sql: str, key: str, ttl_s: Optional[int] = None) -> Optional[Dict[str, Any]]:
+        cutoff = int(time.time()) - (self.ttl_s if ttl_s is None else ttl_s)
+        with self._lock:
+            row = self._db.execute(sql, (key, cutoff)).fetchone()
+        if not row:
+            return None
+        try:
+            val = json.loads(row[0])
+            return val if isinstance(val, dict) else None
+        except Exception:
+            return None
+
+    def _put(self, sql: str, key: str, val: Dict[str, Any]) -> None:
+        payload = json.dumps(val, ensure_ascii=False)
+        with self._lock:
+            self._db.execute(sql, (key, payload, int(time.time())))
+            self._db.commit()
+
+    # ---- Place Details ----
+    def get_details(self, place_id: str) -> Optional[Dict[str, Any]]:
+        return self._get("SELECT json FROM details WHERE place_id=? AND ts>=?", place_id)
+
+    def get_details_many(self, place_ids: List[str]) -> Dict[str, Dict[str, Any]]:
+        """Fresh cached details for the ids that have them; one query per 500 ids, not one per id."""
+        cutoff = int(time.time()) - self.ttl_s
+        ids = list(dict.fromkeys(p for p in place_ids if p))
+        out: Dict[str, Dict[str, Any]] = {}
+        for i in range(0, len(ids), 500):
+            chunk = ids[i:i + 500]
+            sql = f"SELECT place_id, json FROM details WHERE ts>=? AND place_id IN ({','.join('?' * len(chunk))})"
+            with self._lock:
+                rows = self._db.execute(sql, (cutoff, *chunk)).fetchall()
+            for pid, raw in rows:
+                try:
+                    val = json.loads(raw)
+                except Exception:
+                    continue
+                if isinstance(val, dict):
+                    out[pid] = val
+        return out
+
+    def put_details(self, place_id: str, details: Dict[str, Any]) -> None:
+        self._put("INSERT OR REPLACE INTO details (place_id, json, ts) VALUES (?, ?, ?)", place_id, details)
+
+    # ---- website scrapes ----
+    def get_web(self, url: str) -> Optional[Dict[str, Any]]:
+        return self._get("SELECT text FROM web WHERE url_hash=? AND ts>=?", _url_key(url))
+
+    def put_web(self, url: str, scraped: Dict[str, Any]) -> None:
+        self._put("INSERT OR REPLACE INTO web (url_hash, text, ts) VALUES (?, ?, ?)", _url_key(url), scraped)
+
+    # ---- Nearby Search pages (params -> merged results) ----
+    def get_nearby(self, params: str) -> Optional[List[Dict[str, Any]]]:
+        val = self._get("SELECT json FROM nearby WHERE query_hash=? AND ts>=?", _url_key(params), self.nearby_ttl_s)
+        return val.get("results") if val else None
+
+    def put_nearby(self, params: str, results: List[Dict[str, Any]]) -> None:
+        self._put("INSERT OR REPLACE INTO nearby (query_hash, json, ts) VALUES (?, ?, ?)", _url_key(params), {"results": results})
+
+    def purge_expired(self) -> None:
+        now = int(time.time())
+        cutoff = now - self.ttl_s
+        with self._lock:
+            self._db.execute("DELETE FROM details WHERE ts<?", (cutoff,))
+            self._db.execute("DELETE FROM web WHERE ts<?", (cutoff,))
+            self._db.execute("DELETE FROM nearby WHERE ts<?", (now - self.nearby_ttl_s,))
+            self._db.commit()
+
+    def close(self) -> None:
+        with self._lock:
+            self._db.close()
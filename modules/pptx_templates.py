@@ -0,0 +1,37 @@
+# ================================
+# FILE: modules/pptx_templates.py
+# PURPOSE: Read each downloaded PPTX template from disk once per process
+# - template_bytes(path): cached raw bytes, re-read only if the file changes (mtime/size)
+# - open_template(path):  fresh Presentation parsed from the cached bytes
+# - copy_template(path, out): write the cached bytes to a new file
+# ================================
+
+from __future__ import annotations
+
+import io
+import os
+from functools import lru_cache
+
+from pptx import Presentation
+
+
+@lru_cache(maxsize=32)
+def _read(path: str, mtime_ns: int, size: int) -> bytes:
+    with open(path, "rb") as f:
+        return f.read()
+
+
+def template_bytes(path: str) -> bytes:
+    # templates are re-downloaded at the start of each export, so key on the file's stat
+    st = os.stat(path)
+    return _read(os.path.abspath(path), st.st_mtime_ns, st.st_size)
+
+
+def open_template(path: str) -> Presentation:
+    """Independent Presentation for `path` (callers mutate it), without re-reading the file."""
+    return Presentation(io.BytesIO(template_bytes(path)))
+
+
+def copy_template(path: str, out_path: str) -> None:
+    with open(out_path, "wb") as f:
+        f.write(template_bytes(path))
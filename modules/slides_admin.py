@@ -6,7 +6,7 @@ from datetime import datetime
 import os
 from typing import Dict, Optional
 
-from pptx import Presentation
+from modules.pptx_templates import open_template
 from pptx.util import Inches, Pt
 from pptx.enum.text import PP_ALIGN
 
@@ -120,7 +120,7 @@ def generate_title_slide(
     os.makedirs(project_output_dir, exist_ok=True)
     out_path = os.path.join(project_output_dir, "slide_1_title.pptx")
 
-    prs = Presentation(template_path)
+    prs = open_template(template_path)
     slide = prs.slides[0]
 
     # Optional background art
@@ -2,13 +2,19 @@
 # Uses the downloaded exhibit PPTX template so all charts inherit the same
 # header/footer/margins as the rest of the deck.
 
+import matplotlib
+matplotlib.use("Agg")  # headless; exhibits render on worker threads, each on its own Figure
 import matplotlib.pyplot as plt
+from matplotlib.figure import Figure
+from functools import lru_cache
 from modules.map_generator import generate_map_png_from_summaries
 from pptx import Presentation
+from modules.pptx_templates import open_template
 from pptx.util import Inches, Pt
 from pptx.enum.text import PP_ALIGN
 from pptx.dml.color import RGBColor
 from PIL import Image
+import numpy as np
 import os
 
 EXHIBIT_TEMPLATE = "modules/downloaded_exhibit_template.pptx"
@@ -17,10 +23,9 @@ EXHIBIT_TEMPLATE = "modules/downloaded_exhibit_template.pptx"
 # Style for matplotlib PNGs
 # ------------------------
 
-import matplotlib.pyplot as plt
-
+@lru_cache(maxsize=1)
 def apply_peerview_style():
-    """Apply PeerView style; fallback if Montserrat isn't installed."""
+    """Apply PeerView style (once per process); fallback if Montserrat isn't installed."""
     try:
         import matplotlib.font_manager as fm
         has_montserrat = any("Montserrat" in f.name for f in fm.fontManager.ttflist)
@@ -115,7 +120,7 @@ def generate_chart_slide(chart_title: str, image_path: str, summary_text: str) -
     """Open the exhibit template and fill: title, chart image, and analysis box.
     Keeps all typography and spacing from the template.
     """
-    ppt = Presentation(EXHIBIT_TEMPLATE)
+    ppt = open_template(EXHIBIT_TEMPLATE)
     slide = ppt.slides[0]
 
     # 1) Replace the header title placeholder (format-preserving)
@@ -168,12 +173,27 @@ def generate_chart_slide(chart_title: str, image_path: str, summary_text: str) -
 # Chart generators (unchanged except for light style)
 # ------------------------
 
+def _desc_order(values: np.ndarray) -> np.ndarray:
+    # same order as sorted(..., reverse=True): descending, ties keep input order
+    return np.argsort(-values, kind="stable")
+
+def _upper_median(values: np.ndarray) -> float:
+    # sorted(values)[n // 2] via introselect (O(N)) instead of a full sort
+    k = len(values) // 2
+    return float(np.partition(values, k)[k])
+
+def _trusted_ranked(summaries, key: str):
+    """Trusted rows with a value for `key`, ranked descending, plus that column as a float array."""
+    rows = [b for b in summaries if b.get("benchmark") == "trusted" and b.get(key) is not None]
+    vals = np.fromiter((b[key] for b in rows), dtype=np.float64, count=len(rows))
+    order = _desc_order(vals)
+    return [rows[i] for i in order], vals[order]
+
 def generate_revenue_chart(path, summaries, end_date: str):
     apply_peerview_style()
 
     # Sort trusted businesses by revenue
-    trusted = [b for b in summaries if b.get("benchmark") == "trusted"]
-    trusted = sorted(trusted, key=lambda x: x["annual_revenue"], reverse=True)
+    trusted, rev = _trusted_ranked(summaries, "annual_revenue")
 
     # Disambiguate duplicate names
     seen_names = {}
@@ -186,15 +206,16 @@ def generate_revenue_chart(path, summaries, end_date: str):
         return base if len(name) <= 20 else base[:19] + "…1"
 
     names = [disambiguate(b["name"]) for b in trusted]
-    values = [b["annual_revenue"] for b in trusted]
-    values_m = [v / 1_000_000 for v in values]
+    values = rev.tolist()
+    values_m = (rev / 1_000_000).tolist()
 
-    mean_val = sum(values) / len(values)
-    median_val = sorted(values)[len(values) // 2]
+    mean_val = float(rev.mean())
+    median_val = _upper_median(rev)
 
     colors = ["#D4AF37", "#C0C0C0", "#CD7F32"] + ["#A2D5AB"] * (len(values) - 3)
 
-    fig, ax = plt.subplots(figsize=(12, 5.5))
+    fig = Figure(figsize=(12, 5.5))
+    ax = fig.subplots()
     ax.bar(names, values_m, color=colors, width=0.6)
 
     for bar, val in zip(ax.patches, values_m):
@@ -212,17 +233,15 @@ def generate_revenue_chart(path, summaries, end_date: str):
     ax.tick_params(axis="y", labelsize=9, colors="#333333")
     ax.legend(loc="upper right", frameon=False)
 
-    plt.tight_layout()
-    plt.savefig(path)
-    plt.close()
+    fig.tight_layout()
+    fig.savefig(path)
     return True
 
 
 def generate_yoy_chart(path, summaries, end_date: str):
     apply_peerview_style()
 
-    trusted = [b for b in summaries if b.get("benchmark") == "trusted" and b.get("yoy_growth") is not None]
-    trusted = sorted(trusted, key=lambda x: x["yoy_growth"], reverse=True)
+    trusted, yoy = _trusted_ranked(summaries, "yoy_growth")
 
     seen_names = {}
     def disambiguate(name):
@@ -234,14 +253,16 @@ def generate_yoy_chart(path, summaries, end_date: str):
         return base if len(name) <= 20 else base[:19] + "…1"
 
     names = [disambiguate(b["name"]) for b in trusted]
-    values = [round(b["yoy_growth"] * 100) for b in trusted]
+    pct = np.round(yoy * 100)
+    values = pct.astype(int).tolist()
 
-    avg = sum(values) / len(values)
-    median = sorted(values)[len(values) // 2]
+    avg = float(pct.mean())
+    median = _upper_median(pct)
 
     colors = ["#4CAF50" if v >= 0 else "#E57373" for v in values]
 
-    fig, ax = plt.subplots(figsize=(12, 5.5))
+    fig = Figure(figsize=(12, 5.5))
+    ax = fig.subplots()
     ax.bar(names, values, color=colors, width=0.6)
 
     for bar, val in zip(ax.patches, values):
@@ -262,17 +283,15 @@ def generate_yoy_chart(path, summaries, end_date: str):
     ax.tick_params(axis="y", labelsize=9, colors="#333333")
     ax.legend(loc="upper right", frameon=False)
 
-    plt.tight_layout()
-    plt.savefig(path)
-    plt.close()
+    fig.tight_layout()
+    fig.savefig(path)
     return True
 
 
 def generate_ticket_chart(path, summaries, end_date: str):
     apply_peerview_style()
 
-    trusted = [b for b in summaries if b.get("benchmark") == "trusted" and b.get("ticket_size") is not None]
-    trusted = sorted(trusted, key=lambda x: x["ticket_size"], reverse=True)
+    trusted, ticket = _trusted_ranked(summaries, "ticket_size")
 
     seen_names = {}
     def disambiguate(name):
@@ -284,12 +303,14 @@ def generate_ticket_chart(path, summaries, end_date: str):
         return base if len(name) <= 20 else base[:19] + "…1"
 
     names = [disambiguate(b["name"]) for b in trusted]
-    values = [round(b["ticket_size"]) for b in trusted]
+    rounded = np.round(ticket)
+    values = rounded.astype(int).tolist()
 
-    mean_val = sum(values) / len(values)
-    median_val = sorted(values)[len(values) // 2]
+    mean_val = float(rounded.mean())
+    median_val = _upper_median(rounded)
 
-    fig, ax = plt.subplots(figsize=(12, 5.5))
+    fig = Figure(figsize=(12, 5.5))
+    ax = fig.subplots()
     ax.bar(names, values, color="#4CAF50", width=0.6)
 
     for bar, val in zip(ax.patches, values):
@@ -308,9 +329,8 @@ def generate_ticket_chart(path, summaries, end_date: str):
     ax.tick_params(axis="y", labelsize=9, colors="#333333")
     ax.legend(loc="upper right", frameon=False)
 
-    plt.tight_layout()
-    plt.savefig(path)
-    plt.close()
+    fig.tight_layout()
+    fig.savefig(path)
     return True
 
 
@@ -347,7 +367,8 @@ def generate_market_size_chart(path, summaries, end_date: str):
     upper_m = projected_total / 1_000_000
 
     # Plot
-    fig, ax = plt.subplots(figsize=(8, 5))
+    fig = Figure(figsize=(8, 5))
+    ax = fig.subplots()
     bars = ax.bar(["Verified Revenue", "Projected Total"], [lower_m, upper_m],
                   color=["#4CAF50", "#C0C0C0"], edgecolor="black", width=0.5)
     bars[1].set_hatch("//")  # distinguish projected even in grayscale prints
@@ -388,9 +409,8 @@ def generate_market_size_chart(path, summaries, end_date: str):
     ax.tick_params(axis='y', labelsize=9, colors="#333333")
     ax.margins(y=0.10)
 
-    plt.tight_layout()
-    plt.savefig(path)
-    plt.close()
+    fig.tight_layout()
+    fig.savefig(path)
     return True
 
 
@@ -406,7 +426,7 @@ def get_market_size_analysis():
 # Map anchor helpers (no duplicate imports)
 
 def _chart_anchor_dims_from_template(template_path: str):
-    ppt = Presentation(template_path)
+    ppt = open_template(template_path)
     slide = ppt.slides[0]
     anchor = _find_named(slide, "ChartAnchor", "Chart", "ImageAnchor")
     if anchor:
@@ -1,38 +1,48 @@
 # slides_summary.py
 
 import os
+import re
 import subprocess
 from datetime import datetime
 from io import BytesIO
 
-from pptx import Presentation
 from pptx.util import Inches, Pt
 from pptx.enum.text import PP_ALIGN
 from PIL import Image, ImageDraw
 
+from modules import llm_cache
+from modules.pptx_templates import open_template
+
 SUMMARY_TEMPLATE = "modules/downloaded_summary_template.pptx"
 INDIVIDUAL_TEMPLATE = "modules/downloaded_businessview_template.pptx"
+OLLAMA_URL = os.getenv("OLLAMA_URL", "http://localhost:11434")
+OLLAMA_TIMEOUT_S = int(os.getenv("OLLAMA_TIMEOUT_S", "600"))  # ~700-word completion on a local model
+
 
+def _placeholder_pattern(replacements: dict) -> "re.Pattern":
+    # one alternation over all tokens (longest first) so each run is scanned once
+    return re.compile("|".join(map(re.escape, sorted(replacements, key=len, reverse=True))))
 
-def _replace_text_preserve_format(shape, replacements: dict):
+
+def _replace_text_preserve_format(shape, replacements: dict, pattern: "re.Pattern | None" = None):
     """Replace placeholder substrings within runs so template formatting stays intact."""
     if not getattr(shape, "has_text_frame", False):
         return
+    pattern = pattern or _placeholder_pattern(replacements)
     tf = shape.text_frame
     for p in tf.paragraphs:
         for r in p.runs:
-            if not r.text:
-                continue
             txt = r.text
-            for k, v in replacements.items():
-                if k in txt:
-                    txt = txt.replace(k, v)
-            r.text = txt
+            if not txt or "{" not in txt:
+                continue
+            new = pattern.sub(lambda m: replacements[m.group(0)], txt)
+            if new != txt:
+                r.text = new
 
 
 def generate_summary_slide(output_path, trusted, end_date, summary_stats, summary_analysis,
                            city: str = "", industry: str = "", map_image_path: str | None = None):
-    ppt = Presentation(SUMMARY_TEMPLATE)
+    ppt = open_template(SUMMARY_TEMPLATE)
     slide = ppt.slides[0]
 
     # 1) Text replacements only (no hard-coded fonts for titles/stats)
@@ -49,8 +59,9 @@ def generate_summary_slide(output_path, trusted, end_date, summary_stats, summar
         "{TBD MEDIAN TICKET}": f"${summary_stats.get('median_ticket', 0):,.0f}",
     }
 
+    pattern = _placeholder_pattern(replacements)
     for shape in slide.shapes:
-        _replace_text_preserve_format(shape, replacements)
+        _replace_text_preserve_format(shape, replacements, pattern)
 
     # 1b) Normalize spacing in the stats/overview box if present (tighten leading and paragraph spacing)
     for shape in slide.shapes:
@@ -146,13 +157,36 @@ Write a professional, approximately 700-word summary about the market's attracti
 The tone should be {sentiment}. If growth is above 10%, highlight strong momentum. If it's below 0%, note concerning trends. If in-between, maintain a balanced tone.
 """.strip()
 
-    result = subprocess.run(
-        ["ollama", "run", model_name],
-        input=prompt.encode("utf-8"),
-        stdout=subprocess.PIPE,
-        stderr=subprocess.PIPE,
-    )
-    return result.stdout.decode("utf-8").strip()
+    # identical inputs (e.g. re-exports) reuse the last completion instead of re-running the model
+    key = llm_cache.cache_key(model_name, prompt)
+    cached = llm_cache.get(key)
+    if cached is not None:
+        return cached
+
+    # HTTP API on the already-running server (model stays loaded); any HTTP failure (server down,
+    # model not pulled, timeout, bad body) falls back to the CLI so the export never aborts here
+    import requests
+    try:
+        resp = requests.post(
+            f"{OLLAMA_URL.rstrip('/')}/api/generate",
+            json={"model": model_name, "prompt": prompt, "stream": False},
+            timeout=OLLAMA_TIMEOUT_S,
+        )
+        resp.raise_for_status()
+        text = (resp.json().get("response") or "").strip()
+        ok = True
+    except (requests.RequestException, ValueError):
+        result = subprocess.run(
+            ["ollama", "run", model_name],
+            input=prompt.encode("utf-8"),
+            stdout=subprocess.PIPE,
+            stderr=subprocess.PIPE,
+        )
+        text = result.stdout.decode("utf-8").strip()
+        ok = result.returncode == 0
+    if ok:
+        llm_cache.put(key, text)
+    return text
 
 
 def get_market_size_analysis():
@@ -167,7 +201,7 @@ def get_market_size_analysis():
 def generate_individual_business_slide(output_path, business: dict, end_date: str, industry: str, city: str):
     print(f"🧩 Generating business slide for: {business.get('name')}")
 
-    ppt = Presentation(INDIVIDUAL_TEMPLATE)
+    ppt = open_template(INDIVIDUAL_TEMPLATE)
     slide = ppt.slides[0]
 
     replacements = {
@@ -251,8 +285,13 @@ def get_latest_period_end(supabase: object, project_id: str) -> str:
         .limit(1)
         .execute()
     )
-    if resp.data:
-        return datetime.strptime(resp.data[0]["period_end_date"], "%Y-%m-%d").strftime("%B %Y")
+    return format_period_end(resp.data[0]["period_end_date"] if resp.data else None)
+
+
+def format_period_end(period_end_date: str | None) -> str:
+    """'2025-06-30' -> 'June 2025'; the current month when there is no metrics date."""
+    if period_end_date:
+        return datetime.strptime(period_end_date, "%Y-%m-%d").strftime("%B %Y")
     return datetime.now().strftime("%B %Y")
 
 
@@ -267,79 +306,85 @@ def _find_anchor(slide, name_lower: str):
     return None
 
 
+def _business_table_page(output_dir: str, batch: list, title: str, slide_number: int) -> str:
+    """Build and save one page of the appendix business table."""
+    ppt = open_template("modules/downloaded_businesstable_template.pptx")
+    slide = ppt.slides[0]
+
+    # Replace title
+    for shape in slide.shapes:
+        if getattr(shape, "has_text_frame", False) and any(tok in (shape.text or "") for tok in ["{TBD Title}", "{TBD TITLE}"]):
+            tf = shape.text_frame
+            tf.clear()
+            p = tf.paragraphs[0]
+            run = p.add_run()
+            run.text = title
+            run.font.size = Pt(26)
+            run.font.bold = True
+            run.font.name = "Montserrat"
+            from pptx.dml.color import RGBColor
+            run.font.color.rgb = RGBColor(255, 255, 255)  # match header style
+            p.alignment = PP_ALIGN.LEFT  # or CENTER if preferred
+            break
+
+    # Table anchor
+    anchor = _find_anchor(slide, "tableanchor")
+    if anchor is None:
+        left, top, width = Inches(0.3), Inches(1.7), Inches(8.0)
+    else:
+        left, top, width = anchor.left, anchor.top, anchor.width
+
+    rows = len(batch) + 1
+    cols = 5
+    table = slide.shapes.add_table(rows, cols, left, top, width, Inches(0.8)).table
+    table.columns[0].width = Inches(2.4)
+    table.columns[1].width = Inches(2.4)
+    table.columns[2].width = Inches(1.3)
+    table.columns[3].width = Inches(1.0)
+    table.columns[4].width = Inches(1.0)
+
+    headers = ["Business Name", "Address", "Revenue", "YoY Growth", "Ticket Size"]
+    # Header row
+    for c, header in enumerate(headers):
+        cell = table.cell(0, c)
+        cell.text = header
+        p = cell.text_frame.paragraphs[0]
+        p.font.bold = True
+        p.font.size = Pt(9)
+
+    # Body rows (slightly smaller)
+    for r, biz in enumerate(batch, start=1):
+        cells = [
+            biz.get("name", ""),
+            biz.get("address", ""),
+            f"${biz.get('annual_revenue', 0):,.0f}",
+            f"{biz.get('yoy_growth', 0) * 100:+.1f}%",
+            f"${biz.get('ticket_size', 0):,.0f}",
+        ]
+        for c, text in enumerate(cells):
+            cell = table.cell(r, c)
+            cell.text = text
+            for p in cell.text_frame.paragraphs:
+                p.font.size = Pt(8)
+        # tighten row height a touch
+        try:
+            table.rows[r].height = Inches(0.25)
+        except Exception:
+            pass
+
+    slide_path = os.path.join(output_dir, f"slide_{slide_number:02}_BusinessTable.pptx")
+    ppt.save(slide_path)
+    print(f"✅ Saved: {slide_path}")
+    return slide_path
+
+
 def generate_paginated_business_table_slides(output_dir: str, businesses: list, base_title: str):
     from math import ceil
 
     rows_per_slide = 15
     total_slides = max(1, ceil(len(businesses) / rows_per_slide))
-
+    # pages are a few ms of python-pptx each: built in-process (template bytes cached once)
     for i in range(total_slides):
         batch = businesses[i * rows_per_slide:(i + 1) * rows_per_slide]
-        ppt = Presentation("modules/downloaded_businesstable_template.pptx")
-        slide = ppt.slides[0]
-
-        # Replace title
-        for shape in slide.shapes:
-            if getattr(shape, "has_text_frame", False) and any(tok in (shape.text or "") for tok in ["{TBD Title}", "{TBD TITLE}"]):
-                tf = shape.text_frame
-                tf.clear()
-                p = tf.paragraphs[0]
-                run = p.add_run()
-                run.text = f"{base_title} (Page {i + 1} of {total_slides})"
-                run.font.size = Pt(26)
-                run.font.bold = True
-                run.font.name = "Montserrat"
-                from pptx.dml.color import RGBColor
-                run.font.color.rgb = RGBColor(255, 255, 255)  # match header style
-                p.alignment = PP_ALIGN.LEFT  # or CENTER if preferred
-                break
+        _business_table_page(output_dir, batch, f"{base_title} (Page {i + 1} of {total_slides})", 41 + i)
 
-        # Table anchor
-        anchor = _find_anchor(slide, "tableanchor")
-        if anchor is None:
-            left, top, width = Inches(0.3), Inches(1.7), Inches(8.0)
-        else:
-            left, top, width = anchor.left, anchor.top, anchor.width
-
-        rows = len(batch) + 1
-        cols = 5
-        table = slide.shapes.add_table(rows, cols, left, top, width, Inches(0.8)).table
-        table.columns[0].width = Inches(2.4)
-        table.columns[1].width = Inches(2.4)
-        table.columns[2].width = Inches(1.3)
-        table.columns[3].width = Inches(1.0)
-        table.columns[4].width = Inches(1.0)
-
-        headers = ["Business Name", "Address", "Revenue", "YoY Growth", "Ticket Size"]
-        # Header row
-        for c, header in enumerate(headers):
-            cell = table.cell(0, c)
-            cell.text = header
-            p = cell.text_frame.paragraphs[0]
-            p.font.bold = True
-            p.font.size = Pt(9)
-
-        # Body rows (slightly smaller)
-        for r, biz in enumerate(batch, start=1):
-            cells = [
-                biz.get("name", ""),
-                biz.get("address", ""),
-                f"${biz.get('annual_revenue', 0):,.0f}",
-                f"{biz.get('yoy_growth', 0) * 100:+.1f}%",
-                f"${biz.get('ticket_size', 0):,.0f}",
-            ]
-            for c, text in enumerate(cells):
-                cell = table.cell(r, c)
-                cell.text = text
-                for p in cell.text_frame.paragraphs:
-                    p.font.size = Pt(8)
-            # tighten row height a touch
-            try:
-                table.rows[r].height = Inches(0.25)
-            except Exception:
-                pass
-
-        slide_number = 41 + i
-        slide_path = os.path.join(output_dir, f"slide_{slide_number:02}_BusinessTable.pptx")
-        ppt.save(slide_path)
-        print(f"✅ Saved: {slide_path}")